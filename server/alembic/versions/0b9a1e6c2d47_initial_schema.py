@@ -0,0 +1,137 @@
+"""initial schema
+
+The tables as they were before migrations were kept: users, applications,
+contacts, notes, timeline_events and files. Databases created earlier with
+Base.metadata.create_all already have them, so tables that exist are left
+alone and `alembic upgrade head` works on those databases as well.
+
+Revision ID: 0b9a1e6c2d47
+Revises: 
+Create Date: 2026-10-19 13:52:41.093512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0b9a1e6c2d47'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+GUID = sa.Uuid(as_uuid=True)
+
+
+def _missing(table: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing('users'):
+        op.create_table(
+            'users',
+            sa.Column('id', GUID, primary_key=True),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('email', sa.String(255), nullable=False),
+            sa.Column('password_hash', sa.String(255), nullable=False),
+            sa.Column('reminder_time', sa.String(5)),
+            sa.Column('email_reminders_enabled', sa.Boolean()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index('ix_users_id', 'users', ['id'])
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    if _missing('applications'):
+        op.create_table(
+            'applications',
+            sa.Column('id', GUID, primary_key=True),
+            sa.Column('user_id', GUID, sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('role_title', sa.String(255), nullable=False),
+            sa.Column('company', sa.String(255), nullable=False),
+            sa.Column('location', sa.String(255)),
+            sa.Column('employment_type', sa.Enum(
+                'FULL_TIME', 'PART_TIME', 'CONTRACT', 'INTERNSHIP', 'FREELANCE', name='employmenttype'
+            )),
+            sa.Column('salary_range', sa.String(100)),
+            sa.Column('source', sa.Enum(
+                'REFERRAL', 'LINKEDIN', 'COMPANY_WEBSITE', 'JOB_BOARD', 'RECRUITER', 'OTHER',
+                name='applicationsource'
+            )),
+            sa.Column('stage', sa.Enum(
+                'DRAFT', 'APPLIED', 'INTERVIEW', 'OFFER', 'REJECTED', name='applicationstage'
+            )),
+            sa.Column('priority', sa.Enum('LOW', 'MEDIUM', 'HIGH', name='applicationpriority')),
+            sa.Column('next_action', sa.Text()),
+            sa.Column('next_action_due', sa.Date()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        for column in ('id', 'user_id', 'stage', 'priority', 'created_at'):
+            op.create_index(f'ix_applications_{column}', 'applications', [column])
+
+    if _missing('contacts'):
+        op.create_table(
+            'contacts',
+            sa.Column('id', GUID, primary_key=True),
+            sa.Column('user_id', GUID, sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('application_id', GUID, sa.ForeignKey('applications.id')),
+            sa.Column('name', sa.String(255), nullable=False),
+            sa.Column('role', sa.String(255)),
+            sa.Column('email', sa.String(255)),
+            sa.Column('phone', sa.String(50)),
+            sa.Column('linkedin', sa.String(500)),
+            sa.Column('notes', sa.Text()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        for column in ('id', 'user_id', 'application_id'):
+            op.create_index(f'ix_contacts_{column}', 'contacts', [column])
+
+    if _missing('notes'):
+        op.create_table(
+            'notes',
+            sa.Column('id', GUID, primary_key=True),
+            sa.Column('user_id', GUID, sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('application_id', GUID, sa.ForeignKey('applications.id'), nullable=False),
+            sa.Column('content', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        for column in ('id', 'user_id', 'application_id'):
+            op.create_index(f'ix_notes_{column}', 'notes', [column])
+
+    if _missing('timeline_events'):
+        op.create_table(
+            'timeline_events',
+            sa.Column('id', GUID, primary_key=True),
+            sa.Column('application_id', GUID, sa.ForeignKey('applications.id'), nullable=False),
+            sa.Column('type', sa.String(50), nullable=False),
+            sa.Column('payload', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        for column in ('id', 'application_id', 'created_at'):
+            op.create_index(f'ix_timeline_events_{column}', 'timeline_events', [column])
+
+    if _missing('files'):
+        op.create_table(
+            'files',
+            sa.Column('id', GUID, primary_key=True),
+            sa.Column('application_id', GUID, sa.ForeignKey('applications.id'), nullable=False),
+            sa.Column('filename', sa.String(255), nullable=False),
+            sa.Column('path', sa.String(500), nullable=False),
+            sa.Column('size_bytes', sa.Integer(), nullable=False),
+            sa.Column('content_type', sa.String(100)),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        for column in ('id', 'application_id'):
+            op.create_index(f'ix_files_{column}', 'files', [column])
+
+
+def downgrade() -> None:
+    for table in ('files', 'timeline_events', 'notes', 'contacts', 'applications', 'users'):
+        op.drop_table(table)
+    for enum in ('applicationpriority', 'applicationstage', 'applicationsource', 'employmenttype'):
+        sa.Enum(name=enum).drop(op.get_bind(), checkfirst=True)
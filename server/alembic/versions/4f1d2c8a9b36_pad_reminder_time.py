@@ -0,0 +1,36 @@
+"""pad users.reminder_time to HH:MM
+
+Reminder buckets compare reminder_time as a string, so "7:30" (accepted
+before the value was zero-padded on write) would sort after "23:45" and only
+match the bucket crossing local midnight. With SHARDS, run this against every
+shard by pointing DATABASE_URL at it.
+
+Revision ID: 4f1d2c8a9b36
+Revises: 7c3e5a91f0b8
+Create Date: 2026-10-19 14:05:12.481203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1d2c8a9b36'
+down_revision = '7c3e5a91f0b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The accepted pattern only allowed the hour to be unpadded
+    op.execute(
+        sa.text(
+            "UPDATE users SET reminder_time = '0' || reminder_time "
+            "WHERE reminder_time IS NOT NULL AND length(reminder_time) = 4"
+        )
+    )
+
+
+def downgrade() -> None:
+    # Padded values are valid input as well; nothing to undo
+    pass
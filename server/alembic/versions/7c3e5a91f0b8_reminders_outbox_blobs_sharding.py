@@ -0,0 +1,149 @@
+"""reminders, outbox, blobs and sharding
+
+Adds what the reminder scheduler, the email outbox, blob storage, the
+calendar feed and sharding need: new users columns, files.sha256, the
+partial indexes and the email_outbox, scheduler_checkpoints, blobs and
+user_shards tables. Objects that already exist are skipped, for databases
+created with Base.metadata.create_all after these models were added.
+
+Revision ID: 7c3e5a91f0b8
+Revises: 0b9a1e6c2d47
+Create Date: 2026-10-19 13:58:03.518827
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e5a91f0b8'
+down_revision = '0b9a1e6c2d47'
+branch_labels = None
+depends_on = None
+
+GUID = sa.Uuid(as_uuid=True)
+REMINDER_POLICY = sa.Enum('ALWAYS', 'ON_CHANGE', name='reminderpolicy')
+
+USERS_COLUMNS = [
+    sa.Column('timezone', sa.String(64), nullable=False, server_default='UTC'),
+    sa.Column('reminder_policy', REMINDER_POLICY, nullable=False, server_default='ALWAYS'),
+    sa.Column('reminder_resend_days', sa.Integer()),
+    sa.Column('last_digest_hash', sa.String(64)),
+    sa.Column('last_digest_date', sa.Date()),
+    sa.Column('calendar_token', sa.String(64)),
+    sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'),
+]
+
+
+def _missing(table: str, column: str = None, index: str = None) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return True
+    if column:
+        return column not in {c['name'] for c in inspector.get_columns(table)}
+    if index:
+        return index not in {i['name'] for i in inspector.get_indexes(table)}
+    return False
+
+
+def _where(condition: str) -> dict:
+    return {'postgresql_where': sa.text(condition), 'sqlite_where': sa.text(condition)}
+
+
+def upgrade() -> None:
+    REMINDER_POLICY.create(op.get_bind(), checkfirst=True)
+    for column in USERS_COLUMNS:
+        if _missing('users', column=column.name):
+            op.add_column('users', column)
+    if _missing('users', index='ix_users_calendar_token'):
+        op.create_index('ix_users_calendar_token', 'users', ['calendar_token'], unique=True)
+    if _missing('users', index='ix_users_reminder_bucket'):
+        op.create_index(
+            'ix_users_reminder_bucket', 'users', ['timezone', 'reminder_time'],
+            **_where('email_reminders_enabled = true'),
+        )
+
+    if _missing('files', column='sha256'):
+        op.add_column('files', sa.Column('sha256', sa.String(64)))
+    if _missing('files', index='ix_files_sha256'):
+        op.create_index('ix_files_sha256', 'files', ['sha256'])
+
+    if _missing('applications', index='ix_applications_due_actions'):
+        op.create_index(
+            'ix_applications_due_actions', 'applications', ['user_id', 'next_action_due'],
+            **_where("next_action IS NOT NULL AND next_action != ''"),
+        )
+
+    if _missing('email_outbox'):
+        op.create_table(
+            'email_outbox',
+            sa.Column('id', GUID, primary_key=True),
+            sa.Column('idempotency_key', sa.String(255), nullable=False, unique=True),
+            sa.Column('user_id', GUID, sa.ForeignKey('users.id', ondelete='CASCADE')),
+            sa.Column('to_email', sa.String(255), nullable=False),
+            sa.Column('subject', sa.String(998), nullable=False),
+            sa.Column('html_body', sa.Text(), nullable=False),
+            sa.Column('text_body', sa.Text(), nullable=False),
+            sa.Column('status', sa.Enum(
+                'PENDING', 'SENDING', 'SENT', 'DEAD', name='emailoutboxstatus'
+            ), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_error', sa.Text()),
+            sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.Column('claim_token', GUID),
+            sa.Column('locked_at', sa.DateTime(timezone=True)),
+            sa.Column('sent_at', sa.DateTime(timezone=True)),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index('ix_email_outbox_user_id', 'email_outbox', ['user_id'])
+        op.create_index('ix_email_outbox_ready', 'email_outbox', ['next_attempt_at'], **_where("status = 'PENDING'"))
+        op.create_index('ix_email_outbox_claim_token', 'email_outbox', ['claim_token'])
+        op.create_index('ix_email_outbox_sent', 'email_outbox', ['sent_at'], **_where("status = 'SENT'"))
+
+    if _missing('scheduler_checkpoints'):
+        op.create_table(
+            'scheduler_checkpoints',
+            sa.Column('job_id', sa.String(100), primary_key=True),
+            sa.Column('processed_until', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if _missing('blobs'):
+        op.create_table(
+            'blobs',
+            sa.Column('sha256', sa.String(64), primary_key=True),
+            sa.Column('size_bytes', sa.Integer(), nullable=False),
+            sa.Column('ref_count', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index('ix_blobs_unreferenced', 'blobs', ['updated_at'], **_where('ref_count <= 0'))
+
+    # The shard directory; on shard databases it stays empty
+    if _missing('user_shards'):
+        op.create_table(
+            'user_shards',
+            sa.Column('user_id', GUID, primary_key=True),
+            sa.Column('email', sa.String(255), nullable=False),
+            sa.Column('shard', sa.String(64), nullable=False),
+            sa.Column('moving', sa.Boolean(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index('ix_user_shards_email', 'user_shards', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    for table in ('user_shards', 'blobs', 'scheduler_checkpoints', 'email_outbox'):
+        op.drop_table(table)
+    sa.Enum(name='emailoutboxstatus').drop(op.get_bind(), checkfirst=True)
+
+    op.drop_index('ix_applications_due_actions', table_name='applications')
+    op.drop_index('ix_files_sha256', table_name='files')
+    op.drop_index('ix_users_reminder_bucket', table_name='users')
+    op.drop_index('ix_users_calendar_token', table_name='users')
+    with op.batch_alter_table('files') as batch:
+        batch.drop_column('sha256')
+    with op.batch_alter_table('users') as batch:
+        for column in reversed(USERS_COLUMNS):
+            batch.drop_column(column.name)
+    REMINDER_POLICY.drop(op.get_bind(), checkfirst=True)
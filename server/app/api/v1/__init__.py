@@ -7,6 +7,8 @@ from .timeline import router as timeline_router
 from .dashboard import router as dashboard_router
 from .csv import router as csv_router
 from .users import router as users_router
+from .calendar import router as calendar_router
+from .files import router as files_router
 
 api_router = APIRouter()
 
@@ -18,3 +20,5 @@ api_router.include_router(timeline_router, tags=["timeline"])
 api_router.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(csv_router, prefix="/csv", tags=["csv"])
 api_router.include_router(users_router, tags=["users"])
+api_router.include_router(calendar_router, prefix="/calendar", tags=["calendar"])
+api_router.include_router(files_router, tags=["files"])
@@ -1,3 +1,4 @@
+import os
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc, asc
@@ -5,6 +6,7 @@ from uuid import UUID
 from typing import Optional
 from datetime import datetime
 
+from ...core.config import settings
 from ...db.session import get_db
 from ...models.user import User
 from ...models.application import Application, ApplicationStage, ApplicationPriority, ApplicationSource
@@ -14,6 +16,7 @@ from ...schemas.application import (
     ApplicationList, ApplicationStageUpdate
 )
 from ...core.deps import get_current_user
+from ...utils.files import remove_file
 
 router = APIRouter()
 
@@ -226,7 +229,15 @@ def delete_application(
             detail="Application not found"
         )
     
+    # Attachment rows go with the application, releasing their blobs; content of
+    # files stored before the blob store is removed once committed
+    file_paths = [
+        os.path.join(settings.UPLOAD_DIR, record.path)
+        for record in application.files if record.sha256 is None
+    ]
     db.delete(application)
     db.commit()
+    for path in file_paths:
+        remove_file(path)
     
     return {"message": "Application deleted successfully"}
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from ...db.session import get_db
+from ...db.sharding import forget_user, place_user, route_to_email, route_to_user
 from ...models.user import User
 from ...schemas.auth import LoginRequest, TokenResponse, RefreshRequest, AccessTokenResponse
 from ...schemas.user import UserCreate, User as UserSchema
@@ -14,9 +15,18 @@ router = APIRouter()
 @router.post("/signup", response_model=UserSchema)
 def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
+    # With sharding, claim the email in the directory and use the new user's shard
+    user_id = uuid4()
+    if not place_user(db, user_id, user_data.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
     # Check if user already exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
+        forget_user(user_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -25,12 +35,17 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     hashed_password = get_password_hash(user_data.password)
     user = User(
+        id=user_id,
         name=user_data.name,
         email=user_data.email,
         password_hash=hashed_password
     )
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except Exception:
+        forget_user(user_id)
+        raise
     db.refresh(user)
     
     return user
@@ -39,7 +54,9 @@ def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=TokenResponse)
 def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """Authenticate user and return tokens."""
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = None
+    if route_to_email(db, login_data.email):
+        user = db.query(User).filter(User.email == login_data.email).first()
     if not user or not verify_password(login_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,7 +85,9 @@ def refresh_access_token(refresh_data: RefreshRequest, db: Session = Depends(get
         )
     
     # Verify user still exists
-    user = db.query(User).filter(User.id == UUID(user_id)).first()
+    user = None
+    if route_to_user(db, UUID(user_id), writable=False):
+        user = db.query(User).filter(User.id == UUID(user_id)).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
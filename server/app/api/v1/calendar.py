@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ...db.session import get_db
+from ...db.sharding import route_by_lookup
+from ...models.user import User
+from ...core.deps import get_current_user
+from ...services.calendar import build_calendar_feed, feed_etag, generate_calendar_token, get_feed_owner
+
+router = APIRouter()
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CALENDAR_MEDIA_TYPE = "text/calendar"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers the given ETag."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+@router.post("/token")
+def create_calendar_token(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create or rotate the secret calendar feed URL; the old URL stops working."""
+    current_user.calendar_token = generate_calendar_token()
+    db.commit()
+
+    return {
+        "calendar_url": str(request.url_for("get_calendar_feed", token=current_user.calendar_token))
+    }
+
+
+@router.delete("/token")
+def revoke_calendar_token(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Disable the calendar feed URL."""
+    current_user.calendar_token = None
+    db.commit()
+
+    return {"message": "Calendar feed disabled"}
+
+
+@router.get("/{token}.ics", name="get_calendar_feed")
+def get_calendar_feed(
+    token: str,
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
+):
+    """iCalendar feed of the user's upcoming next actions, for calendar subscriptions."""
+    # Feed URLs carry no user id; with sharding, the owner's shard is found by the token
+    owner = route_by_lookup(db, lambda shard_db: get_feed_owner(shard_db, token))
+    if owner is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calendar feed not found"
+        )
+
+    user_id, data_version = owner
+    headers = {
+        "ETag": feed_etag(user_id, data_version),
+        "Cache-Control": "private, no-cache"
+    }
+
+    # Polling clients that are up to date cost one indexed lookup
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    feed = build_calendar_feed(db, user_id, data_version)
+    return Response(content=feed, media_type=CALENDAR_MEDIA_TYPE, headers=headers)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 from typing import Optional
@@ -6,11 +7,20 @@ from typing import Optional
 from ...db.session import get_db
 from ...models.user import User
 from ...models.application import Application, ApplicationStage, ApplicationPriority, ApplicationSource
-from ...utils.csv_io import import_applications_from_csv, export_applications_to_csv
 from ...core.deps import get_current_user
+from ...core.tracing import span
 
 router = APIRouter()
 
+# The CSV and export utilities are imported inside the endpoints: imports and
+# exports are rare, and every API process would otherwise load them at startup
+
+# Rows fetched per round-trip from the server-side cursor during exports
+EXPORT_BATCH_SIZE = 1000
+
+# Content-Encoding values for compressed single-table exports
+CONTENT_ENCODINGS = {"gzip": "gzip", "zstd": "zstd"}
+
 
 @router.post("/import")
 def import_csv(
@@ -19,6 +29,8 @@ def import_csv(
     current_user: User = Depends(get_current_user)
 ):
     """Import applications from CSV file."""
+    from ...utils.csv_io import import_applications_from_csv
+
     if not file.filename.endswith('.csv'):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,14 +42,18 @@ def import_csv(
         content = file.file.read().decode('utf-8')
         
         # Import applications
-        import_result = import_applications_from_csv(content, current_user.id)
+        with span("csv parse") as parse_span:
+            import_result = import_applications_from_csv(content, current_user.id)
+            parse_span.set_attribute("csv.rows", import_result["total_rows"])
+            parse_span.set_attribute("csv.errors", len(import_result["errors"]))
         
         # Save successful applications to database
-        for app_data in import_result["applications"]:
-            application = Application(**app_data)
-            db.add(application)
-        
-        db.commit()
+        with span("csv insert", attributes={"csv.rows": import_result["successful_imports"]}):
+            for app_data in import_result["applications"]:
+                application = Application(**app_data)
+                db.add(application)
+            
+            db.commit()
         
         return {
             "message": "Import completed",
@@ -62,14 +78,68 @@ def export_csv(
     stage: Optional[ApplicationStage] = None,
     priority: Optional[ApplicationPriority] = None,
     source: Optional[ApplicationSource] = None,
+    export_format: str = Query(
+        "csv", alias="format", pattern="^(csv|ndjson|parquet)$",
+        description="Export format: csv, ndjson or parquet"
+    ),
+    compression: Optional[str] = Query(
+        None, pattern="^(gzip|zstd)$", description="Compression codec: gzip or zstd"
+    ),
+    tables: str = Query(
+        "applications",
+        description="Comma-separated tables to export: applications, timeline_events, notes"
+    ),
+    gzip: bool = Query(False, description="Same as compression=gzip"),
 ):
-    """Export applications to CSV with current filters."""
-    query = db.query(Application).filter(Application.user_id == current_user.id)
+    """Export applications, and optionally their timeline events and notes, with current filters."""
+    if gzip and not compression:
+        compression = "gzip"
+    return export_response(
+        db, current_user, search=search, stage=stage, priority=priority, source=source,
+        export_format=export_format, compression=compression, tables=tables
+    )
+
+
+def export_response(
+    db: Session,
+    current_user: User,
+    search: Optional[str] = None,
+    stage: Optional[ApplicationStage] = None,
+    priority: Optional[ApplicationPriority] = None,
+    source: Optional[ApplicationSource] = None,
+    export_format: str = "csv",
+    compression: Optional[str] = None,
+    tables: str = "applications",
+) -> StreamingResponse:
+    """The streaming export behind GET /export, callable without FastAPI's parameter defaults."""
+    from ...utils.export import (
+        EXPORT_TABLES, FORMAT_MEDIA_TYPES, EXPORT_ROW_GROUP_SIZE,
+        build_export_query, check_export_dependencies, export_filename,
+        iter_table_export, iter_zip
+    )
+
+    table_names = [name.strip() for name in tables.split(",") if name.strip()]
+    unknown = [name for name in table_names if name not in EXPORT_TABLES]
+    if not table_names or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown export tables: {', '.join(unknown) or tables}"
+        )
+    
+    try:
+        check_export_dependencies(export_format, compression)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    filters = [Application.user_id == current_user.id]
     
     # Apply the same filters as the applications list
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        filters.append(
             or_(
                 Application.role_title.ilike(search_term),
                 Application.company.ilike(search_term)
@@ -77,22 +147,50 @@ def export_csv(
         )
     
     if stage:
-        query = query.filter(Application.stage == stage)
+        filters.append(Application.stage == stage)
     
     if priority:
-        query = query.filter(Application.priority == priority)
+        filters.append(Application.priority == priority)
     
     if source:
-        query = query.filter(Application.source == source)
+        filters.append(Application.source == source)
     
-    applications = query.all()
+    # Stream column tuples through a server-side cursor instead of loading
+    # every ORM object up front
+    batch_size = EXPORT_ROW_GROUP_SIZE if export_format == "parquet" else EXPORT_BATCH_SIZE
     
-    # Generate CSV content
-    csv_content = export_applications_to_csv(applications)
+    def table_rows(table: str):
+        query = build_export_query(table, filters, export_format)
+        return db.execute(query.execution_options(yield_per=batch_size))
+    
+    if len(table_names) == 1:
+        table = table_names[0]
+        content = iter_table_export(table_rows(table), table, export_format, compression)
+        if table == "applications" and export_format == "csv":
+            filename = "job_applications.csv"
+        else:
+            filename = f"{table}.{export_format}"
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        if compression and export_format != "parquet":
+            headers["Content-Encoding"] = CONTENT_ENCODINGS[compression]
+        media_type = FORMAT_MEDIA_TYPES[export_format]
+    else:
+        # Several tables go out as one ZIP archive with a member per table;
+        # each query only runs once the archive reaches its member
+        members = (
+            (
+                export_filename(table, export_format, compression),
+                iter_table_export(table_rows(table), table, export_format, compression)
+            )
+            for table in table_names
+        )
+        content = iter_zip(members, deflate=compression is None and export_format != "parquet")
+        headers = {"Content-Disposition": "attachment; filename=job_tracker_export.zip"}
+        media_type = "application/zip"
     
     # Return as downloadable file
-    return Response(
-        content=csv_content,
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=job_applications.csv"}
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers=headers
     )
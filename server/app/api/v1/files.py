@@ -0,0 +1,187 @@
+import mimetypes
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc
+from uuid import UUID, uuid4
+
+from ...core.config import settings
+from ...core.deps import get_current_user
+from ...db.session import get_db
+from ...middleware.compression import no_compression
+from ...models.application import Application
+from ...models.file import File
+from ...models.timeline_event import TimelineEvent, TimelineEventType
+from ...models.user import User
+from ...schemas.file import File as FileSchema, FileList
+from ...services.blobs import blob_relative_path, ensure_blob, store_blob
+from ...utils.files import FileTooLarge, RangeFileResponse, remove_file
+
+router = APIRouter()
+
+
+def create_timeline_event(db: Session, application_id: UUID, event_type: str, payload: dict = None):
+    """Create a timeline event for an application."""
+    event = TimelineEvent(
+        application_id=application_id,
+        type=event_type,
+        payload=payload or {}
+    )
+    db.add(event)
+
+
+def get_owned_application(db: Session, application_id: UUID, user_id: UUID) -> Application:
+    application = db.query(Application).filter(
+        and_(Application.id == application_id, Application.user_id == user_id)
+    ).first()
+    if not application:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Application not found"
+        )
+    return application
+
+
+def get_owned_file(db: Session, application_id: UUID, file_id: UUID, user_id: UUID) -> File:
+    record = db.query(File).join(Application).filter(
+        and_(File.id == file_id, File.application_id == application_id, Application.user_id == user_id)
+    ).first()
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    return record
+
+
+def stored_path(record: File) -> str:
+    return os.path.join(settings.UPLOAD_DIR, record.path)
+
+
+def file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the {settings.MAX_FILE_SIZE} byte limit"
+    )
+
+
+@router.get("/applications/{application_id}/files", response_model=FileList)
+def get_application_files(
+    application_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List an application's attachments."""
+    get_owned_application(db, application_id, current_user.id)
+    files = db.query(File).filter(File.application_id == application_id).order_by(desc(File.created_at)).all()
+    return FileList(files=files, total=len(files))
+
+
+@router.post("/applications/{application_id}/files", response_model=FileSchema)
+async def upload_file(
+    application_id: UUID,
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255, description="Name of the uploaded file"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Attach a file sent as the raw request body (its Content-Type is kept).
+
+    The body is streamed into the content-addressed blob store, hashed on the
+    way, and rejected with 413 as soon as it passes MAX_FILE_SIZE, without
+    being buffered in memory first. Content already stored is kept once.
+    """
+    await run_in_threadpool(get_owned_application, db, application_id, current_user.id)
+
+    declared_size = request.headers.get("content-length", "")
+    if declared_size.isdigit() and int(declared_size) > settings.MAX_FILE_SIZE:
+        raise file_too_large()
+
+    filename = os.path.basename(filename.replace("\\", "/")).strip()
+    if not filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid filename"
+        )
+    content_type = request.headers.get("content-type") or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    try:
+        sha256, size = await store_blob(request.stream(), settings.MAX_FILE_SIZE)
+    except FileTooLarge:
+        raise file_too_large()
+
+    def create_record() -> File:
+        # The blob's reference count is raised when the File row is flushed;
+        # an unreferenced blob left by a failed commit is garbage-collected
+        ensure_blob(db, sha256, size)
+        file_id = uuid4()
+        record = File(
+            id=file_id,
+            application_id=application_id,
+            filename=filename,
+            path=blob_relative_path(sha256),
+            sha256=sha256,
+            size_bytes=size,
+            content_type=content_type[:100]
+        )
+        db.add(record)
+        create_timeline_event(
+            db,
+            application_id,
+            TimelineEventType.FILE_ADDED.value,
+            {"file_id": str(file_id), "filename": filename, "size_bytes": size}
+        )
+        db.commit()
+        db.refresh(record)
+        return record
+
+    return await run_in_threadpool(create_record)
+
+
+@router.get("/applications/{application_id}/files/{file_id}")
+@no_compression
+def download_file(
+    application_id: UUID,
+    file_id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download an attachment; supports single byte ranges (Range / If-Range)."""
+    record = get_owned_file(db, application_id, file_id, current_user.id)
+    path = stored_path(record)
+    if not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File content missing"
+        )
+
+    return RangeFileResponse(
+        path,
+        range_header=request.headers.get("range"),
+        if_range=request.headers.get("if-range"),
+        filename=record.filename,
+        media_type=record.content_type or "application/octet-stream",
+        method=request.method,
+        # Blob content never changes, so its hash is a strong validator across re-uploads
+        headers={"etag": f'"{record.sha256}"'} if record.sha256 else None,
+    )
+
+
+@router.delete("/applications/{application_id}/files/{file_id}")
+def delete_file(
+    application_id: UUID,
+    file_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete an attachment; its blob is garbage-collected once nothing references it."""
+    record = get_owned_file(db, application_id, file_id, current_user.id)
+    legacy_path = stored_path(record) if record.sha256 is None else None
+    db.delete(record)
+    db.commit()
+    if legacy_path:
+        remove_file(legacy_path)
+
+    return {"message": "File deleted successfully"}
@@ -7,6 +7,7 @@ from uuid import UUID
 from ..db.session import get_db
 from ..models.user import User
 from .security import verify_token
+from .tracing import span
 
 security = HTTPBearer()
 
@@ -15,7 +16,8 @@ def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> UUID:
     """Get current user ID from JWT token."""
-    token_data = verify_token(credentials.credentials)
+    with span("get_current_user_id"):
+        token_data = verify_token(credentials.credentials)
     user_id = token_data.get("sub")
     if not user_id:
         raise HTTPException(
@@ -36,7 +38,8 @@ def get_current_user(
     user_id: UUID = Depends(get_current_user_id)
 ) -> User:
     """Get current user from database."""
-    user = db.query(User).filter(User.id == user_id).first()
+    with span("get_current_user"):
+        user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,197 @@
+"""Sampling profiler producing collapsed stacks.
+
+A background thread snapshots every thread's Python stack with
+sys._current_frames() at a fixed interval and counts identical stacks. The
+output is the "collapsed" format (`frame;frame;frame count` per line) read by
+flamegraph.pl, speedscope and inferno. Nothing is hooked into the interpreter,
+so code runs at full speed between samples and not at all slower when no
+sampler is running.
+
+Samples cover every thread in the process, with the thread name as the root
+frame. Threads parked in a wait (idle pool workers, the event loop's select)
+are skipped, so the profile shows where time was actually spent.
+"""
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import logging
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Innermost Python frames of a thread that is waiting rather than working
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+}
+
+# Stack depth kept per sample; deeper frames are cut off at the root side
+MAX_STACK_DEPTH = 200
+
+_frame_labels: Dict[object, str] = {}
+
+
+def _frame_label(code) -> str:
+    label = _frame_labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        # Longest matching sys.path entry, so site-packages wins over the stdlib directory
+        for prefix in sorted(filter(None, sys.path), key=len, reverse=True):
+            if filename.startswith(prefix):
+                filename = filename[len(prefix):].lstrip(os.sep)
+                break
+        # co_qualname is new in Python 3.11
+        name = getattr(code, "co_qualname", code.co_name)
+        label = f"{name} ({filename})".replace(";", ":")
+        _frame_labels[code] = label
+    return label
+
+
+def collapse_stack(frame) -> Optional[str]:
+    """Root-first `a;b;c` for a frame, or None if the thread is idle."""
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+        return None
+
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class StackSampler:
+    """Count collapsed stacks of all other threads, sampled every `interval` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(exclude=own_ident)
+
+    def sample(self, exclude: Optional[int] = None):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude:
+                continue
+            stack = collapse_stack(frame)
+            if stack is not None:
+                stacks.append(f"{names.get(ident, 'thread')};{stack}")
+        with self._lock:
+            self.samples += 1
+            self._stacks.update(stacks)
+
+    def drain(self) -> Counter:
+        """Return the stacks counted so far and start a new count."""
+        with self._lock:
+            stacks, self._stacks = self._stacks, Counter()
+        return stacks
+
+
+def format_collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def profile_path(name: str) -> str:
+    """Timestamped file in PROFILE_DIR for a profile named e.g. after a request."""
+    name = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+    return os.path.join(settings.PROFILE_DIR, f"{timestamp}-{name}.collapsed")
+
+
+def write_profile(path: str, stacks: Counter):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(format_collapsed(stacks))
+
+
+class ContinuousProfiler:
+    """Low-rate sampling for the life of the process, appended to an hourly file.
+
+    Every `flush_seconds` the counts gathered so far are appended to
+    PROFILE_DIR/continuous-<pid>-<hour>.collapsed. Collapsed-stack tools sum
+    repeated lines, so a file can be rendered as-is to see that hour.
+    """
+
+    def __init__(self, interval: float, flush_seconds: float):
+        self.sampler = StackSampler(interval)
+        self.flush_seconds = flush_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        self.sampler.start()
+        self._thread = threading.Thread(target=self._run, name="profile-flush", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Continuous profiling every {self.sampler.interval * 1000:.0f}ms into {settings.PROFILE_DIR}"
+        )
+
+    def stop(self):
+        self._stop.set()
+        self.sampler.stop()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        stacks = self.sampler.drain()
+        if not stacks:
+            return
+        hour = datetime.now(timezone.utc).strftime("%Y%m%dT%H")
+        path = os.path.join(settings.PROFILE_DIR, f"continuous-{os.getpid()}-{hour}.collapsed")
+        try:
+            with open(path, "a") as f:
+                f.write(format_collapsed(stacks))
+        except OSError as e:
+            logger.error(f"Failed to write profile {path}: {e}")
+
+
+_continuous: Optional[ContinuousProfiler] = None
+
+
+def start_continuous_profiling():
+    global _continuous
+    if _continuous is None:
+        _continuous = ContinuousProfiler(
+            settings.PROFILE_CONTINUOUS_INTERVAL_MS / 1000, settings.PROFILE_CONTINUOUS_FLUSH_SECONDS
+        )
+        _continuous.start()
+
+
+def stop_continuous_profiling():
+    global _continuous
+    if _continuous is not None:
+        _continuous.stop()
+        _continuous = None
@@ -0,0 +1,331 @@
+"""Lightweight span tracing written to a local file in OTLP JSON.
+
+A trace starts at a root span (an HTTP request or a scheduled job, see
+start_trace) and collects child spans opened with span() or recorded after
+the fact with record_span() (SQL statements). The current span lives in a
+context variable, so spans follow work into FastAPI's threadpool and into
+threads started through contextvars.copy_context().run.
+
+Finished spans are appended to TRACE_FILE, one OTLP/JSON
+ExportTraceServiceRequest per line (the OpenTelemetry collector's file
+exporter format), rotated by size. No collector needs to be running; the
+file can be replayed into one later (e.g. with its otlpjsonfile receiver).
+Encoding and writing happen on a background thread, so ending a span never
+blocks the event loop or a request thread on the file.
+
+Sampling is decided once per trace at the root, honouring the sampled flag of
+an incoming W3C `traceparent`. Spans of unsampled traces are not created at
+all, but log lines still carry the root's trace id.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import settings
+
+# OTLP SpanKind values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP StatusCode values
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Spans buffered before they are written without waiting for the trace to end
+EXPORT_BATCH_SIZE = 512
+
+# Default format with the trace context of the current span, if any, before the message
+LOG_FORMAT = "%(levelname)s:%(name)s:%(trace_context)s%(message)s"
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_span_id", "name", "kind", "sampled",
+        "start_ns", "end_ns", "attributes", "status", "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        sampled: bool = True,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status:
+            span["status"] = {"code": self.status, "message": self.status_message}
+        return span
+
+
+class _NoopSpan:
+    """Stand-in yielded when nothing is being recorded, so callers need no checks."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class SpanExporter:
+    """Buffer finished spans and append them to a size-rotated file from a writer thread."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int, service_name: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._resource = {
+            "attributes": _otlp_attributes({"service.name": service_name, "process.pid": os.getpid()})
+        }
+        self._buffer: List[Span] = []
+        self._condition = threading.Condition()
+        # Writes asked of the writer thread, and the last one it has finished
+        self._requested = 0
+        self._completed = 0
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._writer.start()
+
+    def export(self, span: Span, flush: bool = False):
+        """Queue a finished span; flush (or a full batch) wakes the writer without waiting for it."""
+        with self._condition:
+            self._buffer.append(span)
+            if flush or len(self._buffer) >= EXPORT_BATCH_SIZE:
+                self._requested += 1
+                self._condition.notify_all()
+
+    def flush(self):
+        """Write every span queued so far and wait until it is on disk."""
+        with self._condition:
+            self._requested += 1
+            request = self._requested
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: self._completed >= request)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._requested > self._completed or self._closed)
+                request = self._requested
+                spans, self._buffer = self._buffer, []
+                closed = self._closed
+            try:
+                if spans:
+                    self._write(spans)
+            except Exception:
+                logging.getLogger(__name__).exception(f"Dropped {len(spans)} spans")
+            with self._condition:
+                self._completed = request
+                self._condition.notify_all()
+            if closed:
+                return
+
+    def _write(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": self._resource,
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+        record = logging.LogRecord("app.traces", logging.INFO, "", 0, json.dumps(request, separators=(",", ":")), None, None)
+        self._handler.handle(record)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self._handler.close()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_exporter: Optional[SpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> SpanExporter:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = SpanExporter(
+                    settings.TRACE_FILE,
+                    settings.TRACE_FILE_MAX_BYTES,
+                    settings.TRACE_FILE_BACKUPS,
+                    settings.TRACE_SERVICE_NAME,
+                )
+    return _exporter
+
+
+def shutdown_tracing():
+    """Write buffered spans and close the trace file."""
+    global _exporter
+    with _exporter_lock:
+        exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.close()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def parse_traceparent(value: str) -> Optional[Dict[str, Any]]:
+    """Trace id, parent span id and sampled flag from a W3C traceparent header."""
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return {"trace_id": parts[1], "parent_span_id": parts[2], "sampled": bool(flags & 1)}
+
+
+@contextmanager
+def start_trace(
+    name: str,
+    kind: int = SPAN_KIND_INTERNAL,
+    traceparent: Optional[str] = None,
+    attributes: Optional[Dict[str, Any]] = None,
+) -> Iterator[Any]:
+    """Open the root span of a trace (or continue the caller's, given a traceparent)."""
+    if not settings.TRACING_ENABLED:
+        yield NOOP_SPAN
+        return
+
+    parent = parse_traceparent(traceparent) if traceparent else None
+    if parent is not None:
+        root = Span(name, parent["trace_id"], parent["parent_span_id"], kind, parent["sampled"], attributes)
+    else:
+        sampled = random.random() < settings.TRACE_SAMPLE_RATE
+        root = Span(name, f"{random.getrandbits(128):032x}", None, kind, sampled, attributes)
+
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        if root.sampled:
+            root.end_ns = time.time_ns()
+            get_exporter().export(root, flush=True)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Time the block as a child of the current span; a no-op outside a sampled trace."""
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        yield NOOP_SPAN
+        return
+
+    child = Span(name, parent.trace_id, parent.span_id, kind, True, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end_ns = time.time_ns()
+        get_exporter().export(child)
+
+
+def record_span(
+    name: str, start_ns: int, end_ns: int, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None
+):
+    """Add an already timed operation as a child of the current span."""
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return
+    child = Span(name, parent.trace_id, parent.span_id, kind, True, attributes)
+    child.start_ns = start_ns
+    child.end_ns = end_ns
+    get_exporter().export(child)
+
+
+_default_record_factory = logging.getLogRecordFactory()
+
+
+def _record_factory(*args, **kwargs) -> logging.LogRecord:
+    record = _default_record_factory(*args, **kwargs)
+    current = _current_span.get()
+    record.trace_context = f"[trace={current.trace_id} span={current.span_id}] " if current is not None else ""
+    return record
+
+
+def install_log_correlation():
+    """Give every log record a `trace_context` field for LOG_FORMAT."""
+    if logging.getLogRecordFactory() is not _record_factory:
+        logging.setLogRecordFactory(_record_factory)
@@ -6,3 +6,6 @@ from ..models.contact import Contact  # noqa
 from ..models.note import Note  # noqa
 from ..models.timeline_event import TimelineEvent  # noqa
 from ..models.file import File  # noqa
+from ..models.blob import Blob  # noqa
+from ..models.scheduler_checkpoint import SchedulerCheckpoint  # noqa
+from ..models.email_outbox import EmailOutbox  # noqa
@@ -0,0 +1,175 @@
+"""Per-request and per-job SQL statistics from SQLAlchemy engine events.
+
+The current unit of work (an HTTP request or a scheduled job) keeps a
+QueryStats in a context variable; cursor events add every statement's
+duration to it. That gives query counts and DB time per request, slow-query
+logs that name the route, and N+1 detection (the same statement repeated many
+times in one unit of work).
+
+Threads started with threading.Thread do not inherit context variables; run
+their target through contextvars.copy_context().run to keep counting.
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..core.config import settings
+from ..core.tracing import SPAN_KIND_CLIENT, record_span
+
+logger = logging.getLogger(__name__)
+
+# Characters of SQL included in log lines
+STATEMENT_LOG_LENGTH = 500
+
+
+class QueryStats:
+    """Statements executed by one request or job."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.db_seconds += seconds
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, most repeated first."""
+        with self._lock:
+            return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def summary(self) -> str:
+        return f"{self.count} queries, {self.db_seconds * 1000:.1f}ms in the database"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A unit of work ran more queries, or repeated one more often, than allowed."""
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Callbacks notified with every finished QueryStats (see query_budget)
+_observers: List[Callable[[QueryStats], None]] = []
+_observers_lock = threading.Lock()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def _truncate(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= STATEMENT_LOG_LENGTH else statement[:STATEMENT_LOG_LENGTH] + "..."
+
+
+def instrument_engine(engine: Engine):
+    """Record statement timings for the active unit of work and log slow queries."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_query_started_at", None)
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+
+        end_ns = time.time_ns()
+        record_span(
+            statement.split(None, 1)[0].upper() if statement else "query",
+            end_ns - int(elapsed * 1e9),
+            end_ns,
+            kind=SPAN_KIND_CLIENT,
+            attributes={"db.system": conn.dialect.name, "db.statement": _truncate(statement)},
+        )
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+        if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            where = stats.name if stats is not None else "outside a request"
+            logger.warning(f"Slow query ({elapsed * 1000:.1f}ms) in {where}: {_truncate(statement)}")
+
+
+def report_query_stats(stats: QueryStats):
+    """Flag N+1 patterns and budget overruns, and notify observers."""
+    if settings.SQL_DETECT_N_PLUS_ONE:
+        for statement, count in stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+            logger.warning(f"Possible N+1 in {stats.name}: {count}x {_truncate(statement)}")
+
+    if settings.SQL_QUERY_BUDGET and stats.count > settings.SQL_QUERY_BUDGET:
+        logger.warning(
+            f"{stats.name} exceeded the query budget of {settings.SQL_QUERY_BUDGET}: {stats.summary()}"
+        )
+
+    with _observers_lock:
+        observers = list(_observers)
+    for observer in observers:
+        observer(stats)
+
+
+@contextmanager
+def track_queries(name: str) -> Iterator[QueryStats]:
+    """Collect statistics for the statements run inside the block."""
+    stats = QueryStats(name)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        report_query_stats(stats)
+
+
+@contextmanager
+def query_budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> Iterator[List[QueryStats]]:
+    """Fail when any unit of work in the block exceeds a query budget.
+
+    Covers requests served while the block runs (including through
+    TestClient, whose app runs in another thread) and statements run
+    directly in the block. Raises QueryBudgetExceeded on exit::
+
+        with query_budget(max_queries=5, max_repeats=2):
+            client.get("/api/v1/applications")
+    """
+    finished: List[QueryStats] = []
+
+    def observe(stats: QueryStats):
+        finished.append(stats)
+
+    with _observers_lock:
+        _observers.append(observe)
+    try:
+        if _current_stats.get() is None:
+            with track_queries("query_budget block"):
+                yield finished
+        else:
+            yield finished
+    finally:
+        with _observers_lock:
+            _observers.remove(observe)
+
+    problems = []
+    for stats in finished:
+        if max_queries is not None and stats.count > max_queries:
+            problems.append(f"{stats.name}: {stats.count} queries (budget {max_queries})")
+        if max_repeats is not None:
+            for statement, count in stats.repeated(max_repeats + 1):
+                problems.append(f"{stats.name}: {count}x {_truncate(statement)}")
+    if problems:
+        raise QueryBudgetExceeded("Query budget exceeded:\n" + "\n".join(problems))
@@ -1,18 +1,85 @@
+import threading
+from typing import Optional, Tuple
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
 from ..core.config import settings
+from .sqlite import RoutingSession, create_sqlite_engines, is_sqlite_file
+
+_engine: Optional[Engine] = None
+_read_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def create_engines(url: str) -> Tuple[Engine, Optional[Engine]]:
+    """The engine for a database URL, plus a reader engine for SQLite files."""
+    read_engine = None
+    if is_sqlite_file(url):
+        engine, read_engine = create_sqlite_engines(url)
+    else:
+        engine = create_engine(url)
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        from .instrumentation import instrument_engine
+        instrument_engine(engine)
+        if read_engine is not None:
+            instrument_engine(read_engine)
+    return engine, read_engine
+
+
+def get_engine() -> Engine:
+    """The application (for SQLite, the writer) engine, created on first use.
+
+    Creating it loads the database driver, so processes that never touch the
+    database (tooling, import-only tests) do not pay for it.
+    """
+    global _engine, _read_engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine, read_engine = create_engines(settings.DATABASE_URL)
+                if SessionLocal.kw.get("bind") is None:
+                    SessionLocal.configure(bind=engine)
+                    if read_engine is not None:
+                        SessionLocal.configure(info={"read_bind": read_engine})
+                _read_engine = read_engine
+                _engine = engine
+    return _engine
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_read_engine() -> Optional[Engine]:
+    """The SQLite reader engine paired with get_engine(), if any."""
+    get_engine()
+    return _read_engine
+
+
+class LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to the application engine on the first session."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and local_kw.get("bind") is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session."""
+def get_db(request: Request):
+    """Dependency to get database session.
+
+    With SHARDS configured, the session is bound to the shard of the user in
+    the request's bearer token, or to the directory database without one.
+    """
     db = SessionLocal()
     try:
+        if settings.SHARDS:
+            from .sharding import route_request
+            route_request(db, request)
         yield db
     finally:
         db.close()
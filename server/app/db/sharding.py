@@ -0,0 +1,314 @@
+"""Horizontal sharding of user data across several databases.
+
+Every table is scoped by user, so all of a user's rows live together on one
+shard (a database in SHARDS). The directory, table `user_shards` in
+DATABASE_URL, maps each user id and email to its shard. New users are placed
+by consistent hashing of their id, so a shard added to SHARDS takes its share
+of sign-ups without anyone being moved; existing users move with
+`python -m app.tools.shards move`.
+
+get_db binds request sessions to the shard of the bearer token's user.
+Endpoints without a token (sign-up, login, refresh, calendar feeds) route
+their session with place_user, route_to_email, route_to_user or
+route_by_lookup before its first query. Scheduled jobs run once per shard
+through for_each_shard.
+
+Directory entries are cached per process for SHARD_DIRECTORY_CACHE_SECONDS.
+While a user is being moved the directory marks them `moving`: their reads
+are served by the old shard and their writes are refused with 503.
+"""
+import bisect
+import contextvars
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Boolean, Column, DateTime, String, delete, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from starlette.requests import Request
+
+from ..core.config import settings
+from .session import SessionLocal, create_engines, get_engine, get_read_engine
+from .types import GUID
+
+# The directory has its own metadata: its table lives only in DATABASE_URL
+DirectoryBase = declarative_base()
+
+# Directory entries cached per process before the cache is reset
+DIRECTORY_CACHE_MAX_ENTRIES = 100_000
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class UserShard(DirectoryBase):
+    __tablename__ = "user_shards"
+
+    user_id = Column(GUID, primary_key=True)
+    email = Column(String(255), unique=True, nullable=False, index=True)
+    shard = Column(String(64), nullable=False)
+    moving = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring; each node owns `virtual_nodes` points to even out the split."""
+
+    def __init__(self, nodes, virtual_nodes: int):
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(virtual_nodes))
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def get(self, key: str) -> str:
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[index]
+
+
+class ShardRouter:
+    """Shard engines and the cached user -> shard directory."""
+
+    def __init__(self, shards: Dict[str, str], virtual_nodes: int, cache_seconds: float):
+        if not shards:
+            raise ValueError("No shards configured")
+        self.urls = dict(shards)
+        self.ring = HashRing(self.urls, virtual_nodes)
+        self.cache_seconds = cache_seconds
+        self._engines: Dict[str, Tuple[Engine, Optional[Engine]]] = {}
+        self._cache: Dict[uuid.UUID, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self):
+        return list(self.urls)
+
+    def engines(self, shard: str) -> Tuple[Engine, Optional[Engine]]:
+        """The (writer, SQLite reader) engines of a shard, created on first use."""
+        engines = self._engines.get(shard)
+        if engines is None:
+            if shard not in self.urls:
+                raise ValueError(f"Unknown shard {shard!r}")
+            with self._lock:
+                engines = self._engines.get(shard)
+                if engines is None:
+                    url = self.urls[shard]
+                    # A shard in the directory's database shares its engine
+                    if url == settings.DATABASE_URL:
+                        engines = (get_engine(), get_read_engine())
+                    else:
+                        engines = create_engines(url)
+                    self._engines[shard] = engines
+        return engines
+
+    def bind(self, db: Session, shard: str):
+        """Point a session that has not run anything yet at a shard."""
+        if db.in_transaction():
+            raise RuntimeError("Session already in use; route it before the first query")
+        engine, read_engine = self.engines(shard)
+        db.bind = engine
+        db.info.pop("read_bind", None)
+        if read_engine is not None:
+            db.info["read_bind"] = read_engine
+        db.info["shard"] = shard
+
+    def session(self, shard: str) -> Session:
+        db = SessionLocal()
+        self.bind(db, shard)
+        return db
+
+    def locate(self, user_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        """The user's shard and whether it is being moved, or None for unknown users."""
+        now = time.monotonic()
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        with SessionLocal() as db:
+            row = db.execute(
+                select(UserShard.shard, UserShard.moving).where(UserShard.user_id == user_id)
+            ).first()
+        location = {"shard": row.shard, "moving": row.moving} if row else None
+
+        if len(self._cache) >= DIRECTORY_CACHE_MAX_ENTRIES:
+            self._cache.clear()
+        self._cache[user_id] = (now + self.cache_seconds, location)
+        return location
+
+    def locate_email(self, email: str) -> Optional[Dict[str, Any]]:
+        with SessionLocal() as db:
+            row = db.execute(
+                select(UserShard.user_id, UserShard.shard, UserShard.moving).where(UserShard.email == email)
+            ).first()
+        return {"user_id": row.user_id, "shard": row.shard, "moving": row.moving} if row else None
+
+    def place(self, user_id: uuid.UUID, email: str) -> Optional[str]:
+        """Register a new user on its hash ring shard; None if the email is already taken."""
+        shard = self.ring.get(str(user_id))
+        with SessionLocal() as db:
+            db.add(UserShard(user_id=user_id, email=email, shard=shard, moving=False))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                return None
+        self._cache.pop(user_id, None)
+        return shard
+
+    def set_location(self, user_id: uuid.UUID, shard: str, moving: bool):
+        with SessionLocal() as db:
+            db.execute(
+                update(UserShard).where(UserShard.user_id == user_id).values(shard=shard, moving=moving)
+            )
+            db.commit()
+        self._cache.pop(user_id, None)
+
+    def forget(self, user_id: uuid.UUID):
+        with SessionLocal() as db:
+            db.execute(delete(UserShard).where(UserShard.user_id == user_id))
+            db.commit()
+        self._cache.pop(user_id, None)
+
+
+_router: Optional[ShardRouter] = None
+_router_lock = threading.Lock()
+
+
+def sharding_enabled() -> bool:
+    return bool(settings.SHARDS)
+
+
+def get_router() -> ShardRouter:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ShardRouter(
+                    settings.SHARDS, settings.SHARD_VIRTUAL_NODES, settings.SHARD_DIRECTORY_CACHE_SECONDS
+                )
+    return _router
+
+
+def _check_not_moving(location: Dict[str, Any], writable: bool):
+    if location["moving"] and writable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Account is being moved, try again shortly",
+            headers={"Retry-After": str(max(1, int(settings.SHARD_DIRECTORY_CACHE_SECONDS)))},
+        )
+
+
+def route_request(db: Session, request: Request):
+    """Bind a request's session to the shard of its bearer token's user, if it has one."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return
+
+    from ..core.security import verify_token
+    try:
+        user_id = uuid.UUID(verify_token(token).get("sub"))
+    except (HTTPException, TypeError, ValueError):
+        # Rejected by get_current_user_id on routes that need a user
+        return
+
+    if not route_to_user(db, user_id, writable=request.method not in READ_METHODS):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
+
+def route_to_user(db: Session, user_id: uuid.UUID, writable: bool = True) -> bool:
+    """Bind db to the user's shard; False for users not in the directory."""
+    if not sharding_enabled():
+        return True
+    router = get_router()
+    location = router.locate(user_id)
+    if location is None:
+        return False
+    _check_not_moving(location, writable)
+    router.bind(db, location["shard"])
+    return True
+
+
+def route_to_email(db: Session, email: str, writable: bool = False) -> bool:
+    """Bind db to the shard of the user with this email; False if there is none."""
+    if not sharding_enabled():
+        return True
+    router = get_router()
+    location = router.locate_email(email)
+    if location is None:
+        return False
+    _check_not_moving(location, writable)
+    router.bind(db, location["shard"])
+    return True
+
+
+def place_user(db: Session, user_id: uuid.UUID, email: str) -> bool:
+    """Claim the email for a new user and bind db to its shard; False if the email is taken."""
+    if not sharding_enabled():
+        return True
+    router = get_router()
+    shard = router.place(user_id, email)
+    if shard is None:
+        return False
+    router.bind(db, shard)
+    return True
+
+
+def forget_user(user_id: uuid.UUID):
+    """Drop a user placed by place_user whose creation failed."""
+    if sharding_enabled():
+        get_router().forget(user_id)
+
+
+def route_by_lookup(db: Session, lookup: Callable[[Session], Any]) -> Any:
+    """Run lookup on each shard until one returns something, and bind db to that shard.
+
+    For lookups by a key the directory does not hold (calendar feed tokens).
+    lookup should return plain values, not ORM objects, as its session is
+    closed afterwards.
+    """
+    if not sharding_enabled():
+        return lookup(db)
+    router = get_router()
+    for shard in router.names:
+        with router.session(shard) as shard_db:
+            result = lookup(shard_db)
+        if result is not None:
+            router.bind(db, shard)
+            return result
+    return None
+
+
+def session_factories() -> Dict[str, Callable[[], Session]]:
+    """A session factory per shard; just SessionLocal without sharding."""
+    if not sharding_enabled():
+        return {"default": SessionLocal}
+    router = get_router()
+    return {shard: partial(router.session, shard) for shard in router.names}
+
+
+def for_each_shard(job: Callable[[Callable[[], Session]], Any]) -> Dict[str, Any]:
+    """Run job(session_factory) once per shard, in parallel, and return its results by shard."""
+    factories = session_factories()
+    if len(factories) == 1:
+        return {shard: job(make_session) for shard, make_session in factories.items()}
+
+    # Each shard runs in a copy of this context so its queries count towards the calling job
+    with ThreadPoolExecutor(max_workers=len(factories), thread_name_prefix="shard") as pool:
+        futures = {
+            shard: pool.submit(contextvars.copy_context().run, job, make_session)
+            for shard, make_session in factories.items()
+        }
+    return {shard: future.result() for shard, future in futures.items()}
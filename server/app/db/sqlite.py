@@ -0,0 +1,115 @@
+"""Engine profile for single-node deployments on a SQLite file.
+
+SQLite allows one writer at a time, so each process gets two engines:
+
+- a writer with a single pooled connection. Sessions queue for it in the pool
+  instead of failing with "database is locked", and its transactions start
+  with BEGIN IMMEDIATE so writers in other processes (the scheduler worker)
+  wait on the busy timeout rather than deadlocking on a lock upgrade;
+- a pool of `query_only` readers. In WAL mode they read a consistent snapshot
+  while the writer commits.
+
+Both pools wait up to SQLITE_BUSY_TIMEOUT_MS for a free connection, the same
+time SQLite waits for another process's write lock, and then raise. A
+streaming export (GET /csv/export) holds its reader until the download
+finishes, so SQLITE_READER_POOL_SIZE also caps the exports that can be
+downloaded while other requests still read; size it for both.
+
+RoutingSession sends a session's reads to the readers until it first writes
+(flush, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, raw SQL or
+Session.connection()), and everything after that to the writer, so a
+transaction always sees its own writes.
+"""
+from typing import Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+from ..core.config import settings
+
+
+def is_sqlite_file(url: str) -> bool:
+    """True for a file-backed SQLite URL (in-memory databases cannot share connections)."""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _pragmas(query_only: bool):
+    def on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself (see _begin_immediate) instead of pysqlite
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return on_connect
+
+
+def _begin_immediate(connection):
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _begin_deferred(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+def create_sqlite_engines(url: str) -> Tuple[Engine, Engine]:
+    """The writer and reader engines for a SQLite database file."""
+    timeout = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    connect_args = {"check_same_thread": False, "timeout": timeout}
+
+    writer = create_engine(url, connect_args=connect_args, pool_size=1, max_overflow=0, pool_timeout=timeout)
+    event.listen(writer, "connect", _pragmas(query_only=False))
+    event.listen(writer, "begin", _begin_immediate)
+
+    reader = create_engine(
+        url, connect_args=connect_args, pool_size=settings.SQLITE_READER_POOL_SIZE, max_overflow=0,
+        pool_timeout=timeout
+    )
+    event.listen(reader, "connect", _pragmas(query_only=True))
+    event.listen(reader, "begin", _begin_deferred)
+    return writer, reader
+
+
+def _needs_writer(clause) -> bool:
+    if isinstance(clause, (UpdateBase, TextClause)):
+        return True
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(Session):
+    """Session that reads from the SQLite reader pool until it first writes.
+
+    `info["read_bind"]` holds the reader engine; without it (other databases,
+    in-memory SQLite) the session behaves like a plain Session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        reader = self.info.get("read_bind")
+        if reader is None or self.info.get("writing"):
+            return super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or _needs_writer(clause):
+            self.info["writing"] = True
+            return super().get_bind(mapper, clause=clause, **kw)
+        return reader
+
+    def connection(self, bind_arguments=None, execution_options=None):
+        # Callers take the connection to run bulk INSERTs and flush hooks
+        if self.info.get("read_bind") is not None:
+            self.info["writing"] = True
+        return super().connection(bind_arguments, execution_options)
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_routing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("writing", None)
@@ -0,0 +1,9 @@
+"""Column types that work on both PostgreSQL and SQLite."""
+from sqlalchemy import JSON, Uuid
+from sqlalchemy.dialects.postgresql import JSONB
+
+# Native UUID on PostgreSQL, CHAR(32) hex on SQLite; uuid.UUID in Python either way
+GUID = Uuid(as_uuid=True)
+
+# JSONB on PostgreSQL, JSON text (queryable with the JSON1 functions) on SQLite
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
@@ -1,14 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+from typing import Optional
 import logging
 
 from .core.config import settings
-from .api.v1 import api_router
-from .tasks.scheduler import setup_scheduler, start_scheduler, stop_scheduler
+from .core.tracing import LOG_FORMAT, install_log_correlation
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -17,43 +16,126 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     logger.info("Starting up Job Tracker API")
-    setup_scheduler()
-    start_scheduler()
-    
+    if settings.PROFILE_CONTINUOUS:
+        from .core.profiling import start_continuous_profiling
+        start_continuous_profiling()
+
+    # The scheduler (APScheduler, reminder and outbox services) is only
+    # imported by processes that run it
+    scheduler_started = settings.SCHEDULER_MODE == "embedded"
+    if scheduler_started:
+        from .tasks.scheduler import setup_scheduler, start_scheduler
+        setup_scheduler()
+        start_scheduler()
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down Job Tracker API")
-    stop_scheduler()
+    if scheduler_started:
+        from .tasks.scheduler import stop_scheduler
+        stop_scheduler()
+
+    from .core.profiling import stop_continuous_profiling
+    from .core.tracing import shutdown_tracing
+    from .services.email import close_email_service
+    close_email_service()
+    stop_continuous_profiling()
+    shutdown_tracing()
+
+
+def create_app() -> FastAPI:
+    """Build the API application.
+
+    Importing this module does no work; the app, its routers and the models
+    are built here, and the database engine and email service are created
+    on first use. Serve with `uvicorn app.main:create_app --factory`, or use
+    `app.main:app`, which calls this once on first access.
+    """
+    # Configure logging; records carry the current trace id when tracing is enabled
+    install_log_correlation()
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    from .db import base  # noqa: F401  registers every model before mappers configure
+    from .api.v1 import api_router
+
+    app = FastAPI(
+        title="Job Tracker API",
+        description="A comprehensive job application tracking system",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Inside tracing and metrics, so both see the compressed response and its cost
+    if settings.COMPRESSION_ENABLED:
+        from .middleware.compression import CompressionMiddleware
+        app.add_middleware(CompressionMiddleware)
+
+    # Per-request profiling exists only when an admin token is configured
+    if settings.PROFILING_TOKEN:
+        from .middleware.profiling import ProfilingMiddleware
+        app.add_middleware(ProfilingMiddleware)
+
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        from .middleware.query_stats import QueryStatsMiddleware
+        app.add_middleware(QueryStatsMiddleware)
+
+    if settings.TRACING_ENABLED:
+        from .middleware.tracing import TracingMiddleware
+        app.add_middleware(TracingMiddleware)
+
+    # Added last so it is outermost and times the whole stack
+    if settings.METRICS_ENABLED:
+        from .middleware.metrics import MetricsMiddleware
+        app.add_middleware(MetricsMiddleware)
+
+    # Include API router
+    app.include_router(api_router, prefix="/api/v1")
 
+    @app.get("/")
+    def read_root():
+        """Root endpoint."""
+        return {"message": "Job Tracker API", "version": "1.0.0", "docs": "/docs"}
 
-app = FastAPI(
-    title="Job Tracker API",
-    description="A comprehensive job application tracking system",
-    version="1.0.0",
-    lifespan=lifespan
-)
+    @app.get("/health")
+    def health_check():
+        """Health check endpoint."""
+        return {"status": "healthy", "message": "Job Tracker API is running"}
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    if settings.METRICS_ENABLED:
+        from .core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry, scrape_authorized
 
-# Include API router
-app.include_router(api_router, prefix="/api/v1")
+        @app.get("/metrics", include_in_schema=False)
+        def metrics(authorization: Optional[str] = Header(None)):
+            """Prometheus metrics for this process.
 
+            Without METRICS_TOKEN anyone who can reach the app can read them,
+            so only expose /metrics on an internal interface in that case.
+            """
+            if not scrape_authorized(authorization):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid metrics token",
+                    headers={"WWW-Authenticate": "Bearer"}
+                )
+            return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
 
-@app.get("/")
-def read_root():
-    """Root endpoint."""
-    return {"message": "Job Tracker API", "version": "1.0.0", "docs": "/docs"}
+    return app
 
 
-@app.get("/health")
-def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy", "message": "Job Tracker API is running"}
+def __getattr__(name: str):
+    """Build `app` on first access, so `app.main:app` keeps working without import-time work."""
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
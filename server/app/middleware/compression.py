@@ -0,0 +1,152 @@
+from typing import Optional, Tuple
+
+from ..core.config import settings
+from ..utils.compression import create_compressor, negotiate_encoding
+
+# Media types worth compressing; anything else (images, archives, already
+# compressed exports) is passed through
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+    "image/svg+xml",
+)
+
+
+def no_compression(endpoint):
+    """Mark an endpoint whose responses must never be compressed.
+
+    Place it under the route decorator:
+
+        @router.get("/events")
+        @no_compression
+        def events(...):
+    """
+    endpoint.no_compression = True
+    return endpoint
+
+
+def _compressible(headers: dict) -> bool:
+    if b"content-encoding" in headers:
+        return False
+    if b"no-transform" in headers.get(b"cache-control", b"").lower():
+        return False
+    content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Compress responses with the best codec the client accepts (zstd, br or gzip).
+
+    Complete responses smaller than COMPRESSION_MIN_SIZE are sent as-is.
+    Streaming responses (several body messages, e.g. CSV exports) are
+    compressed chunk by chunk as they are sent, never buffered. Responses that
+    already have a Content-Encoding, are not a text-like media type, carry
+    `Cache-Control: no-transform`, or come from an endpoint marked with
+    @no_compression are left alone.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.codecs = tuple(settings.COMPRESSION_CODECS)
+        self.levels = {
+            "gzip": settings.COMPRESSION_GZIP_LEVEL,
+            "br": settings.COMPRESSION_BROTLI_QUALITY,
+            "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = b""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value
+                break
+        codec = negotiate_encoding(accept_encoding.decode("latin-1"), self.codecs) if accept_encoding else None
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(scope, send, codec, self.levels.get(codec))
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Per-response state: holds the start message until the first body chunk decides."""
+
+    def __init__(self, scope, send, codec: str, level: int):
+        self.scope = scope
+        self._send = send
+        self.codec = codec
+        self.level = level
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _headers(self) -> Tuple[list, dict]:
+        raw = list(self.start_message.get("headers", []))
+        return raw, {name.lower(): value for name, value in raw}
+
+    async def _start(self, compressed: bool, content_length: Optional[int] = None):
+        raw, _ = self._headers()
+        if compressed:
+            raw = [(name, value) for name, value in raw if name.lower() != b"content-length"]
+            raw.append((b"content-encoding", self.codec.encode()))
+            if content_length is not None:
+                raw.append((b"content-length", str(content_length).encode()))
+        # Caches must key on Accept-Encoding whether or not this response was compressed
+        raw.append((b"vary", b"Accept-Encoding"))
+        self.start_message["headers"] = raw
+        await self._send(self.start_message)
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            _, headers = self._headers()
+            endpoint = self.scope.get("endpoint")
+            self.passthrough = (
+                message["status"] in (204, 304)
+                or getattr(endpoint, "no_compression", False)
+                or not _compressible(headers)
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body:
+                # Complete response in one message: compress only if it is worth it
+                if len(body) < settings.COMPRESSION_MIN_SIZE:
+                    self.passthrough = True
+                    await self._start(compressed=False)
+                    await self._send(message)
+                    return
+                compressor = create_compressor(self.codec, self.level)
+                data = compressor.compress(body) + compressor.flush()
+                await self._start(compressed=True, content_length=len(data))
+                await self._send({"type": "http.response.body", "body": data})
+                return
+
+            # Streaming: the total size is unknown, so compress as it goes
+            self.compressor = create_compressor(self.codec, self.level)
+            await self._start(compressed=True)
+
+        data = self.compressor.compress(body) if body else b""
+        if not more_body:
+            data += self.compressor.flush()
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,72 @@
+import time
+from typing import Dict
+
+from ..core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+    http_response_size_bytes,
+)
+
+# Label for requests that matched no route, so unknown paths cannot blow up cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope) -> str:
+    """Path template of the route that handled a request, e.g. /api/v1/applications/{application_id}.
+
+    The router stores the matched endpoint in the scope; its template is
+    looked up from the app's routes once and cached.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+
+    app = scope.get("app")
+    templates: Dict = getattr(app.state, "route_templates", None)
+    if templates is None:
+        templates = {}
+        for route in app.routes:
+            if hasattr(route, "endpoint") and hasattr(route, "path"):
+                templates.setdefault(route.endpoint, route.path)
+        app.state.route_templates = templates
+    return templates.get(endpoint, UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """Record request count, latency, response size and in-flight requests per route template.
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so streaming
+    responses pass through untouched and the per-request cost stays at a few
+    dictionary updates.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_progress.inc((method,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec((method,))
+            route = route_template(scope)
+            http_requests_total.inc((method, route, str(response["status"])))
+            http_request_duration_seconds.observe(elapsed, (method, route))
+            http_response_size_bytes.observe(response["size"], (method, route))
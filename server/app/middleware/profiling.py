@@ -0,0 +1,89 @@
+import hmac
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.profiling import StackSampler, format_collapsed, profile_path, write_profile
+
+PROFILE_HEADER = b"x-profile"
+TOKEN_HEADER = b"x-profile-token"
+
+
+def requested_profile(scope) -> str:
+    """Profile mode asked for by an authorized caller: "", "store" or "collapsed".
+
+    Requested with an `X-Profile` header or a `profile` query parameter
+    ("collapsed" returns the profile instead of the response, any other value
+    stores it). Both require `X-Profile-Token` to match PROFILING_TOKEN;
+    requests without a valid token are served normally.
+    """
+    headers = dict(scope["headers"])
+    mode = headers.get(PROFILE_HEADER, b"").decode("latin-1")
+    if not mode and scope["query_string"]:
+        mode = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0]
+    if not mode:
+        return ""
+
+    token = headers.get(TOKEN_HEADER, b"")
+    if not hmac.compare_digest(token, settings.PROFILING_TOKEN.encode()):
+        return ""
+    return "collapsed" if mode == "collapsed" else "store"
+
+
+class ProfilingMiddleware:
+    """Run individually requested requests under the sampling profiler.
+
+    Only added when PROFILING_TOKEN is set, so other deployments pay nothing.
+    A stored profile's path is returned in an `X-Profile-Path` header; the
+    file is written once the response body has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = requested_profile(scope)
+        if not mode:
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        path = profile_path(f"{scope['method']} {scope['path']}")
+        response = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-path", path.encode())]
+            # In collapsed mode the profile replaces the response
+            if mode == "store":
+                await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+
+        stacks = sampler.drain()
+        if mode == "store":
+            await run_in_threadpool(write_profile, path, stacks)
+            return
+
+        body = format_collapsed(stacks).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profiled-status", str(response["status"]).encode()),
+                (b"x-profile-samples", str(sampler.samples).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
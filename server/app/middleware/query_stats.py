@@ -0,0 +1,39 @@
+import time
+
+from ..db.instrumentation import track_queries
+from .metrics import route_template
+
+
+class QueryStatsMiddleware:
+    """Count SQL statements per request and report them in a Server-Timing header.
+
+    The header is written when the response starts, so statements issued
+    while a streaming body is sent are logged and checked but not included
+    in it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        with track_queries(scope["path"]) as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    # Routing has happened by now, so name the stats after the route template
+                    stats.name = f"{scope['method']} {route_template(scope)}"
+                    app_ms = (time.perf_counter() - start) * 1000
+                    timing = (
+                        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.count} queries", '
+                        f"app;dur={app_ms:.2f}"
+                    )
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+            stats.name = f"{scope['method']} {route_template(scope)}"
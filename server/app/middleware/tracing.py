@@ -0,0 +1,45 @@
+from ..core.tracing import SPAN_KIND_SERVER, STATUS_ERROR, start_trace
+from .metrics import route_template
+
+
+class TracingMiddleware:
+    """Open a root span per request, continuing the caller's trace from `traceparent`.
+
+    The trace id is returned in an `X-Trace-Id` header so a slow or failing
+    request can be found in the trace file.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = dict(scope["headers"]).get(b"traceparent")
+        attributes = {"http.request.method": scope["method"], "url.path": scope["path"]}
+
+        with start_trace(
+            f"{scope['method']} {scope['path']}",
+            kind=SPAN_KIND_SERVER,
+            traceparent=traceparent.decode("latin-1") if traceparent else None,
+            attributes=attributes,
+        ) as root:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        root.status = STATUS_ERROR
+                    trace_id = getattr(root, "trace_id", None)
+                    if trace_id:
+                        message["headers"] = [*message.get("headers", []), (b"x-trace-id", trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                if hasattr(root, "name"):
+                    root.name = f"{scope['method']} {route}"
+                root.set_attribute("http.route", route)
@@ -1,10 +1,11 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, DateTime, Date, Text, ForeignKey, Enum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Date, Text, ForeignKey, Enum, Index, and_, event, update
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 from ..db.session import Base
+from ..db.types import GUID
+from .user import User
 
 
 class ApplicationStage(str, enum.Enum):
@@ -41,8 +42,8 @@ class EmploymentType(str, enum.Enum):
 class Application(Base):
     __tablename__ = "applications"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
     
     # Job details
     role_title = Column(String(255), nullable=False)
@@ -70,3 +71,36 @@ class Application(Base):
     notes = relationship("Note", back_populates="application", cascade="all, delete-orphan")
     timeline_events = relationship("TimelineEvent", back_populates="application", cascade="all, delete-orphan")
     files = relationship("File", back_populates="application", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Partial index for the reminder batch: only rows with a pending action,
+        # ordered the way the batch query walks them
+        Index(
+            "ix_applications_due_actions",
+            user_id,
+            next_action_due,
+            postgresql_where=and_(next_action.isnot(None), next_action != ""),
+            sqlite_where=and_(next_action.isnot(None), next_action != ""),
+        ),
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def bump_user_data_version(session, flush_context):
+    """Bump data_version for users whose applications changed in this flush.
+
+    Cached per-user views such as the calendar feed are keyed by this
+    version, so they are invalidated in the same transaction as the change.
+    """
+    user_ids = {
+        obj.user_id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Application) and obj.user_id is not None
+        and (obj not in session.dirty or session.is_modified(obj))
+    }
+    if user_ids:
+        session.connection().execute(
+            update(User.__table__)
+            .where(User.__table__.c.id.in_(user_ids))
+            .values(data_version=User.__table__.c.data_version + 1)
+        )
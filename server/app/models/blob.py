@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, DateTime, Integer, Index
+from sqlalchemy.sql import func
+from ..db.session import Base
+
+
+class Blob(Base):
+    """Attachment content stored once under its SHA-256 (see app.services.blobs)."""
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size_bytes = Column(Integer, nullable=False)
+    # File rows on this database pointing at the blob
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Last reference change; garbage collection waits a grace period after it
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Only unreferenced blobs, the garbage collector's candidates
+        Index(
+            "ix_blobs_unreferenced",
+            updated_at,
+            postgresql_where=ref_count <= 0,
+            sqlite_where=ref_count <= 0,
+        ),
+    )
@@ -1,18 +1,18 @@
 import uuid
 from sqlalchemy import Column, String, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy import DateTime
 from sqlalchemy.orm import relationship
 from ..db.session import Base
+from ..db.types import GUID
 
 
 class Contact(Base):
     __tablename__ = "contacts"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    application_id = Column(UUID(as_uuid=True), ForeignKey("applications.id"), nullable=True, index=True)
+    id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
+    application_id = Column(GUID, ForeignKey("applications.id"), nullable=True, index=True)
     
     name = Column(String(255), nullable=False)
     role = Column(String(255))
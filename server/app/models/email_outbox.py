@@ -0,0 +1,56 @@
+import uuid
+import enum
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Integer, Enum, Index
+from sqlalchemy.sql import func
+from ..db.session import Base
+from ..db.types import GUID
+
+
+class EmailOutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    # Enqueueing the same key twice is a no-op, e.g. one reminder per user and day
+    idempotency_key = Column(String(255), unique=True, nullable=False)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)
+
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(998), nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=False)
+
+    status = Column(Enum(EmailOutboxStatus), nullable=False, default=EmailOutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Set while a worker owns the message; stale claims are released after a timeout
+    claim_token = Column(GUID)
+    locked_at = Column(DateTime(timezone=True))
+    sent_at = Column(DateTime(timezone=True))
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Pending messages in the order workers claim them
+        Index(
+            "ix_email_outbox_ready",
+            next_attempt_at,
+            postgresql_where=status == EmailOutboxStatus.PENDING,
+            sqlite_where=status == EmailOutboxStatus.PENDING,
+        ),
+        Index("ix_email_outbox_claim_token", claim_token),
+        # Sent messages in the order the retention job purges them
+        Index(
+            "ix_email_outbox_sent",
+            sent_at,
+            postgresql_where=status == EmailOutboxStatus.SENT,
+            sqlite_where=status == EmailOutboxStatus.SENT,
+        ),
+    )
@@ -1,19 +1,23 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, DateTime, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from collections import Counter
+from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, event
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 from ..db.session import Base
+from ..db.types import GUID
 
 
 class File(Base):
     __tablename__ = "files"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    application_id = Column(UUID(as_uuid=True), ForeignKey("applications.id"), nullable=False, index=True)
+    id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
+    application_id = Column(GUID, ForeignKey("applications.id"), nullable=False, index=True)
     
     filename = Column(String(255), nullable=False)
+    # Relative to UPLOAD_DIR: the blob for content-addressed files, `<user_id>/<file_id>` for older ones
     path = Column(String(500), nullable=False)
+    # Content hash of blob-backed files; NULL for files stored before the blob store
+    sha256 = Column(String(64), index=True)
     size_bytes = Column(Integer, nullable=False)
     content_type = Column(String(100))
     
@@ -21,3 +25,21 @@ class File(Base):
 
     # Relationships
     application = relationship("Application", back_populates="files")
+
+
+@event.listens_for(Session, "after_flush")
+def count_blob_references(session, flush_context):
+    """Keep blobs.ref_count in step with the File rows added and deleted in this flush.
+
+    Covers every ORM path, including files deleted with their application.
+    """
+    changes = Counter()
+    for obj in session.new:
+        if isinstance(obj, File) and obj.sha256:
+            changes[obj.sha256] += 1
+    for obj in session.deleted:
+        if isinstance(obj, File) and obj.sha256:
+            changes[obj.sha256] -= 1
+    if changes:
+        from ..services.blobs import adjust_references
+        adjust_references(session.connection(), changes)
@@ -1,17 +1,17 @@
 import uuid
 from sqlalchemy import Column, Text, ForeignKey, DateTime
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db.session import Base
+from ..db.types import GUID
 
 
 class Note(Base):
     __tablename__ = "notes"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    application_id = Column(UUID(as_uuid=True), ForeignKey("applications.id"), nullable=False, index=True)
+    id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
+    application_id = Column(GUID, ForeignKey("applications.id"), nullable=False, index=True)
     
     content = Column(Text, nullable=False)
     
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from ..db.session import Base
+
+
+class SchedulerCheckpoint(Base):
+    __tablename__ = "scheduler_checkpoints"
+
+    job_id = Column(String(100), primary_key=True)
+    # End of the last time bucket the job has fully processed
+    processed_until = Column(DateTime(timezone=True), nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,10 +1,10 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, ForeignKey, DateTime, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, ForeignKey, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db.session import Base
+from ..db.types import GUID, JSONDocument
 
 
 class TimelineEventType(str, enum.Enum):
@@ -19,11 +19,11 @@ class TimelineEventType(str, enum.Enum):
 class TimelineEvent(Base):
     __tablename__ = "timeline_events"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    application_id = Column(UUID(as_uuid=True), ForeignKey("applications.id"), nullable=False, index=True)
+    id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
+    application_id = Column(GUID, ForeignKey("applications.id"), nullable=False, index=True)
     
     type = Column(String(50), nullable=False)
-    payload = Column(JSON)  # Store additional event data
+    payload = Column(JSONDocument)  # Store additional event data
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
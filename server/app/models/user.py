@@ -1,20 +1,35 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+import enum
+from sqlalchemy import Column, String, DateTime, Date, Boolean, Integer, Enum, Index, true
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db.session import Base
+from ..db.types import GUID
+
+
+class ReminderPolicy(str, enum.Enum):
+    ALWAYS = "always"  # Send the digest every day
+    ON_CHANGE = "on_change"  # Send only when the digest changed, or after reminder_resend_days
 
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(GUID, primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     reminder_time = Column(String(5), default="07:30")  # HH:MM format
+    timezone = Column(String(64), nullable=False, default="UTC", server_default="UTC")  # IANA name
     email_reminders_enabled = Column(Boolean, default=True)
+    reminder_policy = Column(
+        Enum(ReminderPolicy), nullable=False, default=ReminderPolicy.ALWAYS, server_default=ReminderPolicy.ALWAYS.name
+    )
+    reminder_resend_days = Column(Integer, nullable=True)  # Resend an unchanged digest after this many days
+    last_digest_hash = Column(String(64), nullable=True)
+    last_digest_date = Column(Date, nullable=True)  # Local date the last digest was queued; cleared if it was dead-lettered
+    calendar_token = Column(String(64), unique=True, nullable=True, index=True)  # Secret for the .ics feed URL
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped when applications change
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -22,3 +37,14 @@ class User(Base):
     applications = relationship("Application", back_populates="user", cascade="all, delete-orphan")
     contacts = relationship("Contact", back_populates="user", cascade="all, delete-orphan")
     notes = relationship("Note", back_populates="user", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Selects the users whose reminder falls in a scheduler bucket
+        Index(
+            "ix_users_reminder_bucket",
+            timezone,
+            reminder_time,
+            postgresql_where=email_reminders_enabled == true(),
+            sqlite_where=email_reminders_enabled == true(),
+        ),
+    )
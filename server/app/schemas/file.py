@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+from typing import List, Optional
+
+
+class File(BaseModel):
+    id: UUID
+    application_id: UUID
+    filename: str
+    size_bytes: int
+    content_type: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class FileList(BaseModel):
+    files: List[File]
+    total: int
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
 from uuid import UUID
 from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from ..models.user import ReminderPolicy
 
 
 class UserBase(BaseModel):
@@ -16,7 +18,30 @@ class UserCreate(UserBase):
 class UserUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     reminder_time: Optional[str] = Field(None, pattern=r"^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$")
+    timezone: Optional[str] = Field(None, max_length=64)
     email_reminders_enabled: Optional[bool] = None
+    reminder_policy: Optional[ReminderPolicy] = None
+    reminder_resend_days: Optional[int] = Field(None, ge=1, le=365)
+
+    @field_validator("reminder_time")
+    @classmethod
+    def pad_reminder_time(cls, value: Optional[str]) -> Optional[str]:
+        # Stored zero-padded so reminder buckets can compare times as strings
+        if value is None:
+            return value
+        hours, minutes = value.split(":")
+        return f"{int(hours):02d}:{minutes}"
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError("Unknown time zone")
+        return value
 
 
 class UserPasswordUpdate(BaseModel):
@@ -27,7 +52,10 @@ class UserPasswordUpdate(BaseModel):
 class User(UserBase):
     id: UUID
     reminder_time: str
+    timezone: str
     email_reminders_enabled: bool
+    reminder_policy: ReminderPolicy
+    reminder_resend_days: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,206 @@
+"""Content-addressed attachment storage.
+
+Attachment content is stored once per distinct SHA-256, at
+UPLOAD_DIR/blobs/<ab>/<cd>/<sha256>, however many File rows point at it.
+The `blobs` table of each database counts the File rows referencing a blob;
+a flush listener on File keeps the counts in step, so every ORM path that
+adds or deletes files is covered.
+
+collect_garbage, run by the scheduler, deletes blobs that have had no
+references for BLOB_GC_GRACE_SECONDS. Uploads move the blob file into place
+before committing their File row, and a file modified within the grace
+period is never deleted, so content uploaded again while its blob is being
+collected survives. With SHARDS a blob file is only deleted once no shard
+has a row for it.
+"""
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+import anyio
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.sharding import for_each_shard
+from ..models.blob import Blob
+from ..utils.files import TEMP_SUFFIX, move_into_place, remove_file, stream_to_temp
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = "blobs"
+
+# Hashes per statement when updating or collecting blobs
+BLOB_BATCH_SIZE = 500
+
+
+def blob_relative_path(sha256: str) -> str:
+    """Path of a blob relative to UPLOAD_DIR; two directory levels keep directories small."""
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(settings.UPLOAD_DIR, blob_relative_path(sha256))
+
+
+def temp_dir() -> str:
+    return os.path.join(settings.UPLOAD_DIR, ".tmp")
+
+
+def _batches(items: Iterable, size: int = BLOB_BATCH_SIZE) -> Iterable[List]:
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+async def store_blob(chunks: AsyncIterator[bytes], max_bytes: int) -> Tuple[str, int]:
+    """Stream an upload into the blob store and return its (sha256, size).
+
+    The hash is computed while the data is written. Content already in the
+    store replaces the existing file with identical bytes, which also
+    refreshes its mtime so a pending garbage collection leaves it alone.
+    Raises FileTooLarge past max_bytes.
+    """
+    digest = hashlib.sha256()
+    temp_path, size = await stream_to_temp(chunks, max_bytes, temp_dir(), digest)
+    sha256 = digest.hexdigest()
+    await anyio.to_thread.run_sync(move_into_place, temp_path, blob_path(sha256))
+    return sha256, size
+
+
+def _upsert(connection: Connection):
+    """INSERT that refreshes updated_at of blobs already recorded instead."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        statement = pg_insert(Blob)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        statement = sqlite_insert(Blob)
+    else:
+        return insert(Blob)
+    return statement.on_conflict_do_update(
+        index_elements=["sha256"], set_={"updated_at": datetime.now(timezone.utc)}
+    )
+
+
+def ensure_blobs(connection: Connection, sizes: Dict[str, int]):
+    """Record blobs (sha256 -> size), new ones unreferenced.
+
+    A blob already recorded gets its updated_at refreshed, which also locks
+    its row until the caller commits: collect_garbage re-checks updated_at
+    when deleting, so it cannot drop the row between this call and the
+    commit of the File row that references it.
+    """
+    statement = _upsert(connection)
+    for batch in _batches(sizes.items()):
+        connection.execute(statement, [
+            {"sha256": sha256, "size_bytes": size, "ref_count": 0} for sha256, size in batch
+        ])
+
+
+def ensure_blob(db: Session, sha256: str, size: int):
+    """Record a blob before the first File row pointing at it is flushed; the caller commits."""
+    ensure_blobs(db.connection(), {sha256: size})
+
+
+def adjust_references(connection: Connection, changes: Dict[str, int]):
+    """Add each delta (sha256 -> +/-n) to the blobs' reference counts."""
+    by_delta: Dict[int, List[str]] = {}
+    for sha256, delta in changes.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(sha256)
+    now = datetime.now(timezone.utc)
+    for delta, hashes in by_delta.items():
+        for batch in _batches(hashes):
+            connection.execute(
+                update(Blob)
+                .where(Blob.sha256.in_(batch))
+                .values(ref_count=Blob.ref_count + delta, updated_at=now)
+            )
+
+
+def _release_unreferenced(make_session, cutoff: datetime) -> Set[str]:
+    """Delete a shard's blob rows unreferenced since before cutoff and return their hashes."""
+    released = set()
+    with make_session() as db:
+        while True:
+            candidates = db.scalars(
+                select(Blob.sha256)
+                .where(Blob.ref_count <= 0, Blob.updated_at < cutoff)
+                .limit(BLOB_BATCH_SIZE)
+            ).all()
+            if not candidates:
+                break
+            # Re-checked in the DELETE: an upload may have referenced the blob since
+            db.execute(
+                delete(Blob).where(
+                    Blob.sha256.in_(candidates), Blob.ref_count <= 0, Blob.updated_at < cutoff
+                )
+            )
+            kept = set(db.scalars(select(Blob.sha256).where(Blob.sha256.in_(candidates))))
+            db.commit()
+            released.update(set(candidates) - kept)
+    return released
+
+
+def _recorded(make_session, hashes: Set[str]) -> Set[str]:
+    """Hashes that still have a blob row on a shard."""
+    found = set()
+    with make_session() as db:
+        for batch in _batches(sorted(hashes)):
+            found.update(db.scalars(select(Blob.sha256).where(Blob.sha256.in_(batch))))
+    return found
+
+
+def _remove_if_older(path: str, cutoff: float) -> bool:
+    try:
+        if os.stat(path).st_mtime >= cutoff:
+            return False
+    except FileNotFoundError:
+        return False
+    remove_file(path)
+    return True
+
+
+def collect_garbage(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Delete blobs unreferenced for BLOB_GC_GRACE_SECONDS, and stale partial uploads."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=settings.BLOB_GC_GRACE_SECONDS)
+
+    released = set().union(
+        *for_each_shard(lambda make_session: _release_unreferenced(make_session, cutoff)).values()
+    )
+    if released:
+        # The blob directory is shared by the shards; keep files another shard still records
+        for found in for_each_shard(lambda make_session: _recorded(make_session, released)).values():
+            released -= found
+
+    cutoff_timestamp = cutoff.timestamp()
+    removed = sum(_remove_if_older(blob_path(sha256), cutoff_timestamp) for sha256 in released)
+
+    # Temp files left by uploads interrupted by a crash
+    partials = 0
+    if os.path.isdir(temp_dir()):
+        for entry in os.scandir(temp_dir()):
+            if entry.name.endswith(TEMP_SUFFIX):
+                partials += _remove_if_older(entry.path, cutoff_timestamp)
+
+    return {"released": len(released), "removed": removed, "partials_removed": partials}
+
+
+def collect_blob_garbage():
+    """Scheduled job: garbage-collect the attachment blob store."""
+    try:
+        result = collect_garbage()
+        if result["removed"] or result["partials_removed"]:
+            logger.info(
+                f"Blob store collected: {result['removed']} unreferenced blobs and "
+                f"{result['partials_removed']} partial uploads removed"
+            )
+    except Exception as e:
+        logger.error(f"Error collecting blob garbage: {str(e)}")
@@ -0,0 +1,174 @@
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Hashable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.application import Application
+from ..models.user import User
+from .reminders import pending_action_filters
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_PRODID = "-//Job Tracker//Next Actions//EN"
+CALENDAR_NAME = "Job Tracker next actions"
+
+
+class LRUCache:
+    """Small thread-safe LRU map."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+
+# Whole feeds keyed by user id, stored with the data_version they were built from
+feed_cache = LRUCache(settings.CALENDAR_FEED_CACHE_SIZE)
+# VEVENT blocks keyed by application id, stored with the row they were rendered from
+event_cache = LRUCache(settings.CALENDAR_EVENT_CACHE_SIZE)
+
+
+def generate_calendar_token() -> str:
+    """Unguessable secret for a feed URL."""
+    return secrets.token_urlsafe(32)
+
+
+def feed_etag(user_id, data_version: int) -> str:
+    return f'"{user_id}-{data_version}"'
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value (RFC 5545 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 sequences."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+
+    parts = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Back off to a character boundary
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start = end
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _utc_stamp(moment: Optional[datetime]) -> str:
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_event(
+    application_id, company: str, role_title: str, next_action: str, next_action_due: date, updated_at
+) -> str:
+    """Render one application's next action as an all-day VEVENT."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{application_id}@jobtracker",
+        f"DTSTAMP:{_utc_stamp(updated_at)}",
+        f"DTSTART;VALUE=DATE:{next_action_due.strftime('%Y%m%d')}",
+        f"DTEND;VALUE=DATE:{(next_action_due + timedelta(days=1)).strftime('%Y%m%d')}",
+        f"SUMMARY:{escape_text(f'{next_action} - {company}')}",
+        f"DESCRIPTION:{escape_text(f'{role_title} at {company}')}",
+        f"URL:{settings.APP_BASE_URL}/applications/{application_id}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    ]
+    return "\r\n".join(fold_line(line) for line in lines) + "\r\n"
+
+
+def get_feed_owner(db: Session, token: str) -> Optional[Tuple[Any, int]]:
+    """Look up (user_id, data_version) for a feed token with one indexed query."""
+    row = db.execute(
+        select(User.id, User.data_version).where(User.calendar_token == token)
+    ).first()
+    return tuple(row) if row else None
+
+
+def _event_rows(db: Session, user_id) -> List[Any]:
+    return db.execute(
+        select(
+            Application.id,
+            Application.company,
+            Application.role_title,
+            Application.next_action,
+            Application.next_action_due,
+            Application.updated_at
+        ).where(
+            Application.user_id == user_id,
+            *pending_action_filters()
+        ).order_by(Application.next_action_due, Application.id)
+    ).all()
+
+
+def build_calendar_feed(db: Session, user_id, data_version: int) -> str:
+    """Return the user's .ics feed, rebuilding only what changed.
+
+    A feed is reused as long as the user's data_version is unchanged. When it
+    has changed, events are re-rendered only for applications whose row
+    differs from the one the cached VEVENT was built from.
+    """
+    cached = feed_cache.get(user_id)
+    if cached is not None and cached[0] == data_version:
+        return cached[1]
+
+    rendered = 0
+    events = []
+    for row in _event_rows(db, user_id):
+        row = tuple(row)
+        entry = event_cache.get(row[0])
+        if entry is None or entry[0] != row:
+            entry = (row, render_event(*row))
+            event_cache.set(row[0], entry)
+            rendered += 1
+        events.append(entry[1])
+
+    feed = "".join([
+        "BEGIN:VCALENDAR\r\n",
+        "VERSION:2.0\r\n",
+        f"PRODID:{CALENDAR_PRODID}\r\n",
+        "CALSCALE:GREGORIAN\r\n",
+        f"X-WR-CALNAME:{CALENDAR_NAME}\r\n",
+        *events,
+        "END:VCALENDAR\r\n",
+    ])
+    feed_cache.set(user_id, (data_version, feed))
+    logger.debug(f"Built calendar feed for user {user_id}: {len(events)} events, {rendered} rendered")
+    return feed
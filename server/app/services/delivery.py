@@ -0,0 +1,219 @@
+import random
+import smtplib
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Generic, Iterable, Optional, Tuple, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def recipient_domain(email: str) -> str:
+    """Lower-cased domain part of an email address."""
+    return email.rsplit("@", 1)[-1].lower()
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """Whether retrying a failed send cannot help (5xx replies)."""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _ in error.recipients.values())
+    return False
+
+
+class DeliveryStats:
+    """Counters for one delivery run."""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def add(self, sent: int = 0, failed: int = 0, retried: int = 0):
+        with self._lock:
+            self.sent += sent
+            self.failed += failed
+            self.retried += retried
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Messages sent per second."""
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"sent={self.sent} failed={self.failed} retried={self.retried} "
+            f"elapsed={self.elapsed:.1f}s throughput={self.throughput:.1f}/s"
+        )
+
+
+class DeliveryEngine(Generic[T]):
+    """Deliver messages on a thread pool with bounded parallelism.
+
+    `send` is called once per job and must raise on failure. Transient
+    failures are retried with exponential backoff and jitter, at most
+    `per_domain_concurrency` sends run against one recipient domain at a time,
+    and jobs are pulled from the input lazily so a streamed source is never
+    fully materialized. `on_sent(job)` and `on_failed(job, error, permanent)`
+    let callers record per-job outcomes.
+
+    A job is only handed to the pool once its domain has a free slot; until
+    then it waits in a per-domain queue, and backoffs wait on a timer. Pool
+    threads are never parked, so a batch dominated by one domain does not hold
+    up mail to the others. Domain slots are shared by concurrent runs.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[T], None],
+        recipient: Callable[[T], str],
+        concurrency: int = 16,
+        per_domain_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_seconds: float = 2.0,
+        max_backoff_seconds: float = 60.0,
+        max_pending: Optional[int] = None,
+    ):
+        self.send = send
+        self.recipient = recipient
+        self.concurrency = concurrency
+        self.per_domain_concurrency = per_domain_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        # Jobs taken from the input and not yet settled; large enough that jobs
+        # for other domains are reached while one domain's jobs wait for slots
+        self.max_pending = max_pending or concurrency * 16
+
+        # Sends in progress per domain, and (submit, attempt) pairs waiting for a slot
+        self._domain_active: Dict[str, int] = defaultdict(int)
+        self._domain_waiting: Dict[str, Deque[Tuple[Callable, Any]]] = defaultdict(deque)
+        self._domain_lock = threading.Lock()
+
+    def _take_slot(self, domain: str, submit: Callable, attempt) -> bool:
+        """Take a slot on the domain, or queue the attempt until one is released."""
+        with self._domain_lock:
+            if self._domain_active[domain] < self.per_domain_concurrency:
+                self._domain_active[domain] += 1
+                return True
+            self._domain_waiting[domain].append((submit, attempt))
+            return False
+
+    def _release_slot(self, domain: str):
+        """Release a slot, handing it straight to the next attempt waiting on the domain."""
+        with self._domain_lock:
+            waiting = self._domain_waiting.get(domain)
+            if not waiting:
+                self._domain_active[domain] -= 1
+                if not self._domain_active[domain]:
+                    del self._domain_active[domain]
+                    self._domain_waiting.pop(domain, None)
+                return
+            submit, attempt = waiting.popleft()
+        submit(attempt)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_seconds * (2 ** attempt), self.max_backoff_seconds)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _send_once(
+        self,
+        job: T,
+        attempt: int,
+        stats: DeliveryStats,
+        on_sent: Optional[Callable[[T], None]],
+        on_failed: Optional[Callable[[T, Exception, bool], None]],
+    ) -> Optional[float]:
+        """Try one send; returns the delay before a retry, or None once the job is settled."""
+        email = self.recipient(job)
+        try:
+            self.send(job)
+        except Exception as e:
+            permanent = is_permanent_failure(e)
+            if permanent or attempt == self.max_retries:
+                logger.error(f"Failed to deliver to {email} after {attempt + 1} attempts: {str(e)}")
+                stats.add(failed=1)
+                if on_failed:
+                    on_failed(job, e, permanent)
+                return None
+            delay = self._backoff(attempt)
+            logger.warning(f"Delivery to {email} failed ({str(e)}), retrying in {delay:.1f}s")
+            stats.add(retried=1)
+            return delay
+        stats.add(sent=1)
+        if on_sent:
+            on_sent(job)
+        return None
+
+    def run(
+        self,
+        jobs: Iterable[T],
+        on_sent: Optional[Callable[[T], None]] = None,
+        on_failed: Optional[Callable[[T, Exception, bool], None]] = None,
+    ) -> DeliveryStats:
+        """Deliver every job and return the run's counters."""
+        stats = DeliveryStats()
+        # Cap jobs taken from the input and not yet settled (sending, waiting for
+        # their domain or backing off) so a streamed input is not read far ahead
+        in_flight = threading.BoundedSemaphore(self.max_pending)
+        settled = threading.Condition()
+        unsettled = 0
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="delivery")
+
+        def settle():
+            nonlocal unsettled
+            in_flight.release()
+            with settled:
+                unsettled -= 1
+                settled.notify_all()
+
+        def dispatch(attempt: Tuple[T, int]):
+            if self._take_slot(recipient_domain(self.recipient(attempt[0])), submit, attempt):
+                submit(attempt)
+
+        def submit(attempt: Tuple[T, int]):
+            executor.submit(deliver, attempt)
+
+        def deliver(attempt: Tuple[T, int]):
+            # Runs on a pool thread holding a slot on the job's domain
+            job, number = attempt
+            retry_in = None
+            try:
+                retry_in = self._send_once(job, number, stats, on_sent, on_failed)
+            except Exception as e:
+                logger.error(f"Delivery callback failed: {str(e)}")
+            finally:
+                self._release_slot(recipient_domain(self.recipient(job)))
+                if retry_in is None:
+                    settle()
+                else:
+                    timer = threading.Timer(retry_in, dispatch, args=((job, number + 1),))
+                    timer.daemon = True
+                    timer.start()
+
+        try:
+            for job in jobs:
+                in_flight.acquire()
+                with settled:
+                    unsettled += 1
+                dispatch((job, 0))
+        finally:
+            # Retries and queued attempts still need the pool
+            with settled:
+                settled.wait_for(lambda: unsettled == 0)
+            executor.shutdown(wait=True)
+
+        stats.finished_at = time.monotonic()
+        return stats
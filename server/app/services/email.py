@@ -1,11 +1,21 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from jinja2 import Template
-from typing import List, Dict, Any
+import functools
+import os
+import threading
+from itertools import islice
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Iterator, Optional, Tuple
 import logging
 
 from ..core.config import settings
+from ..core.tracing import span
+from .smtp_pool import SMTPConnectionPool
+
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
+    from jinja2 import Environment, Template
+
+# Jinja, the MIME classes and the process pool are imported where they are
+# used: API processes import this module (through the reminder services) but
+# only scheduler work renders or sends mail.
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +89,87 @@ Manage your job applications at {{ base_url }}
 Update your reminder preferences at {{ base_url }}/settings
 """
 
+HTML_TEMPLATE_NAME = "daily_reminders.html"
+TEXT_TEMPLATE_NAME = "daily_reminders.txt"
+
+
+def create_template_environment() -> "Environment":
+    """Build the Jinja environment used for all outgoing mail."""
+    from jinja2 import DictLoader, Environment, FileSystemBytecodeCache, select_autoescape
+
+    bytecode_cache = None
+    if settings.EMAIL_TEMPLATE_CACHE_DIR:
+        os.makedirs(settings.EMAIL_TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(settings.EMAIL_TEMPLATE_CACHE_DIR)
+
+    return Environment(
+        loader=DictLoader({
+            HTML_TEMPLATE_NAME: EMAIL_TEMPLATE,
+            TEXT_TEMPLATE_NAME: TEXT_TEMPLATE,
+        }),
+        autoescape=select_autoescape(["html"]),
+        # Templates are in-module constants, so there is nothing to reload
+        auto_reload=False,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_templates() -> Tuple["Template", "Template"]:
+    """HTML and text reminder templates, compiled on first use and shared by every render."""
+    template_env = create_template_environment()
+    return template_env.get_template(HTML_TEMPLATE_NAME), template_env.get_template(TEXT_TEMPLATE_NAME)
+
+
+def render_daily_reminders(
+    user_name: str, reminder_items: List[Dict[str, Any]], base_url: str
+) -> Tuple[str, str, str]:
+    """Render the daily reminder subject, HTML body and text body."""
+    # Prepare template data
+    template_data = {
+        'user_name': user_name,
+        'total_items': len(reminder_items),
+        'items': reminder_items,
+        'base_url': base_url
+    }
+
+    html_template, text_template = get_templates()
+    with span("render daily_reminders", attributes={"reminder.items": len(reminder_items)}):
+        html_content = html_template.render(**template_data)
+        text_content = text_template.render(**template_data)
+
+    subject = f"Daily Reminders - {len(reminder_items)} action{'s' if len(reminder_items) != 1 else ''} due"
+
+    return subject, html_content, text_content
+
+
+def _render_digest(digest: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Render a reminder digest; runs in worker processes."""
+    return render_daily_reminders(digest['name'], digest['items'], settings.APP_BASE_URL)
+
+
+def render_digests_in_processes(
+    digests: Iterable[Dict[str, Any]], processes: int, chunk_size: int = 64
+) -> Iterator[Dict[str, Any]]:
+    """Render reminder digests in a process pool, attaching the result as 'rendered'.
+
+    Digests are consumed in bounded windows so a streamed source is never
+    fully materialized.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    digests = iter(digests)
+    window = processes * chunk_size * 4
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        while True:
+            batch = list(islice(digests, window))
+            if not batch:
+                break
+            for digest, rendered in zip(batch, executor.map(_render_digest, batch, chunksize=chunk_size)):
+                digest['rendered'] = rendered
+                yield digest
+
 
 class EmailService:
     def __init__(self):
@@ -88,27 +179,57 @@ class EmailService:
         self.smtp_pass = settings.SMTP_PASS
         self.email_from = settings.EMAIL_FROM
         self.base_url = settings.APP_BASE_URL
+        self.pool = SMTPConnectionPool(
+            host=self.smtp_host,
+            port=self.smtp_port,
+            username=self.smtp_user,
+            password=self.smtp_pass,
+            size=settings.SMTP_POOL_SIZE,
+            max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            max_idle_seconds=settings.SMTP_MAX_IDLE_SECONDS,
+            use_tls=settings.SMTP_USE_TLS,
+            timeout=settings.SMTP_TIMEOUT,
+        )
 
-    def send_email(self, to_email: str, subject: str, html_content: str, text_content: str):
-        """Send an email."""
-        try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.email_from
-            msg['To'] = to_email
+    def close(self):
+        """Close pooled SMTP connections."""
+        self.pool.close()
+
+    def build_message(
+        self, to_email: str, subject: str, html_content: str, text_content: str, message_id: Optional[str] = None
+    ) -> "MIMEMultipart":
+        """Build a multipart text/HTML message."""
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.email_from
+        msg['To'] = to_email
+        if message_id:
+            msg['Message-ID'] = message_id
 
-            # Create text and HTML parts
-            text_part = MIMEText(text_content, 'plain')
-            html_part = MIMEText(html_content, 'html')
+        # Create text and HTML parts
+        text_part = MIMEText(text_content, 'plain')
+        html_part = MIMEText(html_content, 'html')
 
-            msg.attach(text_part)
-            msg.attach(html_part)
+        msg.attach(text_part)
+        msg.attach(html_part)
+        return msg
 
-            # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_pass)
-                server.send_message(msg)
+    def deliver(
+        self, to_email: str, subject: str, html_content: str, text_content: str, message_id: Optional[str] = None
+    ):
+        """Send an email, raising on failure so callers can decide whether to retry."""
+        msg = self.build_message(to_email, subject, html_content, text_content, message_id)
+
+        # Send email over a pooled, already authenticated connection
+        self.pool.send_message(msg)
+
+    def send_email(self, to_email: str, subject: str, html_content: str, text_content: str):
+        """Send an email."""
+        try:
+            self.deliver(to_email, subject, html_content, text_content)
 
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -117,29 +238,35 @@ class EmailService:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
 
+    def render_daily_reminders(self, user_name: str, reminder_items: List[Dict[str, Any]]) -> Tuple[str, str, str]:
+        """Render the daily reminder subject, HTML body and text body."""
+        return render_daily_reminders(user_name, reminder_items, self.base_url)
+
     def send_daily_reminders(self, user_email: str, user_name: str, reminder_items: List[Dict[str, Any]]):
         """Send daily reminder email."""
         if not reminder_items:
             return True
 
-        # Prepare template data
-        template_data = {
-            'user_name': user_name,
-            'total_items': len(reminder_items),
-            'items': reminder_items,
-            'base_url': self.base_url
-        }
+        subject, html_content, text_content = self.render_daily_reminders(user_name, reminder_items)
 
-        # Render templates
-        html_template = Template(EMAIL_TEMPLATE)
-        text_template = Template(TEXT_TEMPLATE)
+        return self.send_email(user_email, subject, html_content, text_content)
 
-        html_content = html_template.render(**template_data)
-        text_content = text_template.render(**template_data)
 
-        subject = f"Daily Reminders - {len(reminder_items)} action{'s' if len(reminder_items) != 1 else ''} due"
+_email_service: Optional[EmailService] = None
+_email_service_lock = threading.Lock()
 
-        return self.send_email(user_email, subject, html_content, text_content)
+
+def get_email_service() -> EmailService:
+    """The process-wide EmailService, created on first use."""
+    global _email_service
+    if _email_service is None:
+        with _email_service_lock:
+            if _email_service is None:
+                _email_service = EmailService()
+    return _email_service
 
 
-email_service = EmailService()
+def close_email_service():
+    """Close the EmailService's SMTP sessions if it was ever created."""
+    if _email_service is not None:
+        _email_service.close()
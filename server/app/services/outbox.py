@@ -0,0 +1,373 @@
+import contextvars
+import hashlib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.email_outbox import EmailOutbox, EmailOutboxStatus
+from .delivery import DeliveryEngine, DeliveryStats
+from .email import get_email_service
+from .reminders import REMINDER_KEY_PREFIX, forget_digests
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT when enqueueing
+ENQUEUE_BATCH_SIZE = 500
+
+# Rows per DELETE when purging sent messages
+PURGE_BATCH_SIZE = 1000
+
+
+def _insert_ignoring_duplicates(db: Session):
+    """INSERT that skips rows whose idempotency key is already queued."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(EmailOutbox).on_conflict_do_nothing(index_elements=["idempotency_key"])
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(EmailOutbox).on_conflict_do_nothing(index_elements=["idempotency_key"])
+    return insert(EmailOutbox)
+
+
+def enqueue_emails(db: Session, messages: Iterable[Dict[str, Any]]) -> int:
+    """Bulk-insert rendered messages into the outbox; the caller commits.
+
+    Each message needs idempotency_key, to_email, subject, html_body and
+    text_body, and may carry user_id. Messages whose key is already queued
+    are skipped, so re-running a job never sends twice. Returns the number
+    of new messages queued.
+    """
+    statement = _insert_ignoring_duplicates(db)
+    messages = iter(messages)
+    count = 0
+
+    while True:
+        batch = list(islice(messages, ENQUEUE_BATCH_SIZE))
+        if not batch:
+            break
+        for message in batch:
+            message.setdefault("id", uuid.uuid4())
+            message.setdefault("user_id", None)
+            message.setdefault("status", EmailOutboxStatus.PENDING)
+            message.setdefault("attempts", 0)
+        result = db.connection().execute(statement, batch)
+        count += result.rowcount if result.rowcount >= 0 else len(batch)
+
+    return count
+
+
+def release_stale_claims(db: Session) -> int:
+    """Return messages claimed by workers that died mid-send to the queue."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT_SECONDS)
+    result = db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.status == EmailOutboxStatus.SENDING, EmailOutbox.locked_at < cutoff)
+        .values(status=EmailOutboxStatus.PENDING, claim_token=None, locked_at=None)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def claim_batch(db: Session, batch_size: int) -> List[Any]:
+    """Claim up to batch_size due messages for this worker.
+
+    Uses FOR UPDATE SKIP LOCKED so concurrent workers claim disjoint batches
+    without waiting on each other.
+    """
+    now = datetime.now(timezone.utc)
+    token = uuid.uuid4()
+
+    due = (
+        select(EmailOutbox.id)
+        .where(EmailOutbox.status == EmailOutboxStatus.PENDING, EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(due))
+        .values(status=EmailOutboxStatus.SENDING, claim_token=token, locked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    return db.execute(
+        select(
+            EmailOutbox.id,
+            EmailOutbox.idempotency_key,
+            EmailOutbox.user_id,
+            EmailOutbox.to_email,
+            EmailOutbox.subject,
+            EmailOutbox.html_body,
+            EmailOutbox.text_body,
+            EmailOutbox.attempts,
+            EmailOutbox.claim_token
+        ).where(EmailOutbox.claim_token == token)
+    ).all()
+
+
+def message_id_for(idempotency_key: str) -> str:
+    """Stable Message-ID so a resent message can be deduplicated downstream."""
+    digest = hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest()[:32]
+    return f"<{digest}@jobtracker>"
+
+
+def _send_outbox_message(message):
+    get_email_service().deliver(
+        message.to_email,
+        message.subject,
+        message.html_body,
+        message.text_body,
+        message_id=message_id_for(message.idempotency_key)
+    )
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    seconds = settings.OUTBOX_RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1))
+    return timedelta(seconds=min(seconds, settings.OUTBOX_MAX_RETRY_DELAY_SECONDS))
+
+
+def _record_results(db: Session, sent: List[Any], failed: List[Any]) -> int:
+    """Mark a claimed batch as sent, rescheduled or dead-lettered; returns the number rescheduled."""
+    now = datetime.now(timezone.utc)
+
+    if sent:
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_([message.id for message in sent]))
+            .values(status=EmailOutboxStatus.SENT, sent_at=now, claim_token=None, locked_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    updates = []
+    undelivered_digests = []
+    for message, error, permanent in failed:
+        attempts = message.attempts + 1
+        dead = permanent or attempts >= settings.OUTBOX_MAX_ATTEMPTS
+        if dead:
+            logger.error(f"Dead-lettering email {message.idempotency_key} after {attempts} attempts: {error}")
+            if message.user_id and message.idempotency_key.startswith(REMINDER_KEY_PREFIX):
+                undelivered_digests.append(message.user_id)
+        updates.append({
+            "id": message.id,
+            "status": EmailOutboxStatus.DEAD if dead else EmailOutboxStatus.PENDING,
+            "attempts": attempts,
+            "last_error": str(error)[:2000],
+            "next_attempt_at": now + _retry_delay(attempts),
+            "claim_token": None,
+            "locked_at": None,
+        })
+    if updates:
+        db.execute(update(EmailOutbox), updates)
+    forget_digests(db, undelivered_digests)
+
+    db.commit()
+    return sum(row["status"] == EmailOutboxStatus.PENDING for row in updates)
+
+
+def refresh_claim(db: Session, claim_token: uuid.UUID) -> int:
+    """Renew locked_at on a claim's unsent messages so they are not released as stale."""
+    result = db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.claim_token == claim_token, EmailOutbox.status == EmailOutboxStatus.SENDING)
+        .values(locked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _send_batch(make_session, db: Session, engine: DeliveryEngine, batch: List[Any]) -> DeliveryStats:
+    """Send a claimed batch, writing outcomes while it is still being sent.
+
+    Every OUTBOX_HEARTBEAT_SECONDS the outcomes so far are recorded and the
+    claim on the rest is refreshed. A slow relay therefore never makes the
+    batch look stale to release_stale_claims (which would send it twice),
+    and a crash only resends messages whose outcome was not written yet.
+    Rescheduled messages are counted as retried in the returned stats.
+    """
+    sent, failed = [], []
+    rescheduled = []
+    lock = threading.Lock()
+    finished = threading.Event()
+
+    def on_sent(message):
+        with lock:
+            sent.append(message)
+
+    def on_failed(message, error, permanent):
+        with lock:
+            failed.append((message, error, permanent))
+
+    def take_outcomes():
+        with lock:
+            outcomes = (sent[:], failed[:])
+            sent.clear()
+            failed.clear()
+        return outcomes
+
+    def heartbeat():
+        heartbeat_db = make_session()
+        try:
+            while not finished.wait(settings.OUTBOX_HEARTBEAT_SECONDS):
+                done_sent, done_failed = take_outcomes()
+                try:
+                    rescheduled.append(_record_results(heartbeat_db, done_sent, done_failed))
+                    refresh_claim(heartbeat_db, batch[0].claim_token)
+                except Exception as e:
+                    heartbeat_db.rollback()
+                    with lock:
+                        sent[:0] = done_sent
+                        failed[:0] = done_failed
+                    logger.error(f"Outbox heartbeat failed: {str(e)}")
+        finally:
+            heartbeat_db.close()
+
+    # In a copy of this context so its queries count towards the calling job
+    heartbeat_thread = threading.Thread(
+        target=contextvars.copy_context().run, args=(heartbeat,), name="outbox-heartbeat", daemon=True
+    )
+    heartbeat_thread.start()
+    try:
+        stats = engine.run(batch, on_sent=on_sent, on_failed=on_failed)
+    finally:
+        finished.set()
+        heartbeat_thread.join()
+    rescheduled.append(_record_results(db, *take_outcomes()))
+    stats.add(retried=sum(rescheduled))
+    return stats
+
+
+def _drain_worker(make_session, engine: DeliveryEngine, batch_size: int, totals: DeliveryStats):
+    """Claim and send batches until the outbox has nothing due."""
+    db = make_session()
+    try:
+        while True:
+            batch = claim_batch(db, batch_size)
+            if not batch:
+                break
+
+            stats = _send_batch(make_session, db, engine, batch)
+            totals.add(sent=stats.sent, failed=stats.failed, retried=stats.retried)
+    except Exception as e:
+        # Claimed messages are picked up again once their claim goes stale
+        logger.error(f"Outbox worker stopped: {str(e)}")
+    finally:
+        db.close()
+
+
+def drain_outbox(workers: int = None, batch_size: int = None) -> DeliveryStats:
+    """Send every due outbox message using several parallel workers.
+
+    Each worker claims its own batches, so several processes can also drain
+    the same outbox at once. Retries are scheduled in the table rather than
+    in memory, so a crash never loses a message. With sharding, every shard
+    has its own outbox and gets `workers` workers.
+    """
+    from ..db.sharding import session_factories
+
+    workers = workers or settings.OUTBOX_DRAIN_WORKERS
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    factories = session_factories()
+
+    # One engine shared by all workers so the per-domain limit is global
+    engine = DeliveryEngine(
+        send=_send_outbox_message,
+        recipient=attrgetter('to_email'),
+        concurrency=max(1, settings.REMINDER_CONCURRENCY // (workers * len(factories))),
+        per_domain_concurrency=settings.REMINDER_PER_DOMAIN_CONCURRENCY,
+        # No in-memory retries: a failed send goes back to the table with
+        # next_attempt_at pushed out by _retry_delay (dead after
+        # OUTBOX_MAX_ATTEMPTS), so it survives a crash and is retried by
+        # whichever worker claims it next. stats.retried counts those.
+        max_retries=0,
+    )
+    totals = DeliveryStats()
+
+    for make_session in factories.values():
+        db = make_session()
+        try:
+            released = release_stale_claims(db)
+            if released:
+                logger.warning(f"Released {released} stale outbox claims")
+        finally:
+            db.close()
+
+    # Run each worker in a copy of this context so its queries count towards the calling job
+    threads = [
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(_drain_worker, make_session, engine, batch_size, totals),
+            name=f"outbox-{shard}-{i}",
+        )
+        for shard, make_session in factories.items()
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    totals.finished_at = time.monotonic()
+    return totals
+
+
+def purge_sent_messages(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete messages sent more than OUTBOX_SENT_RETENTION_DAYS ago, in batches."""
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.OUTBOX_SENT_RETENTION_DAYS)
+    purged = 0
+    while True:
+        expired = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == EmailOutboxStatus.SENT, EmailOutbox.sent_at < cutoff)
+            .limit(PURGE_BATCH_SIZE)
+        )
+        result = db.execute(
+            delete(EmailOutbox)
+            .where(EmailOutbox.id.in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        purged += result.rowcount
+        if result.rowcount < PURGE_BATCH_SIZE:
+            return purged
+
+
+def drain_email_outbox():
+    """Scheduled job: send due outbox messages, including retries."""
+    try:
+        stats = drain_outbox()
+        if stats.sent or stats.failed:
+            logger.info(f"Email outbox drained: {stats.summary()}")
+    except Exception as e:
+        logger.error(f"Error draining email outbox: {str(e)}")
+
+
+def purge_email_outbox():
+    """Scheduled job: delete sent messages past their retention, on every shard."""
+    from ..db.sharding import for_each_shard
+
+    def purge(make_session):
+        db = make_session()
+        try:
+            return purge_sent_messages(db)
+        finally:
+            db.close()
+
+    try:
+        purged = sum(for_each_shard(purge).values())
+        if purged:
+            logger.info(f"Purged {purged} sent emails from the outbox")
+    except Exception as e:
+        logger.error(f"Error purging email outbox: {str(e)}")
@@ -1,15 +1,58 @@
-from datetime import date, datetime
+import hashlib
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from itertools import chain, groupby, islice
+from operator import itemgetter
+from sqlalchemy import select, update, and_
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from ..core.config import settings
 from ..db.session import SessionLocal
-from ..models.user import User
+from ..models.user import User, ReminderPolicy
 from ..models.application import Application
-from .email import email_service
+from ..models.scheduler_checkpoint import SchedulerCheckpoint
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round-trip while streaming the reminder batch
+REMINDER_BATCH_SIZE = 1000
+
+REMINDER_BUCKETS_JOB_ID = "reminder_buckets"
+
+# Outbox idempotency keys of daily reminders start with this
+REMINDER_KEY_PREFIX = "daily-reminder:"
+
+
+def pending_action_filters() -> list:
+    """Conditions selecting applications with a dated next action."""
+    return [
+        Application.next_action_due.isnot(None),
+        Application.next_action.isnot(None),
+        Application.next_action != ""
+    ]
+
+
+def due_action_filters(today: date) -> list:
+    """Conditions selecting applications with an action due today or overdue."""
+    return [Application.next_action_due <= today, *pending_action_filters()]
+
+
+def build_reminder_item(
+    application_id, company: str, role_title: str, next_action: str, next_action_due: date, today: date
+) -> Dict[str, Any]:
+    """Build the template data for one due action."""
+    return {
+        'id': str(application_id),
+        'company': company,
+        'role_title': role_title,
+        'next_action': next_action,
+        'next_action_due': next_action_due.strftime('%Y-%m-%d'),
+        'is_overdue': next_action_due < today
+    }
+
 
 def get_reminder_items_for_user(db: Session, user: User) -> List[Dict[str, Any]]:
     """Get reminder items for a user."""
@@ -18,66 +61,328 @@ def get_reminder_items_for_user(db: Session, user: User) -> List[Dict[str, Any]]
     # Get applications with due actions (today or overdue)
     applications = db.query(Application).filter(
         Application.user_id == user.id,
-        Application.next_action_due <= today,
-        Application.next_action.isnot(None),
-        Application.next_action != ""
+        *due_action_filters(today)
     ).all()
     
-    reminder_items = []
-    for app in applications:
-        is_overdue = app.next_action_due < today
+    return [
+        build_reminder_item(
+            app.id, app.company, app.role_title, app.next_action, app.next_action_due, today
+        )
+        for app in applications
+    ]
+
+
+def digest_hash(items: List[Dict[str, Any]]) -> str:
+    """Fingerprint of a digest's content: item ids, actions and due dates."""
+    hasher = hashlib.sha256()
+    for item in sorted(items, key=itemgetter('id')):
+        hasher.update(f"{item['id']}\x1f{item['next_action']}\x1f{item['next_action_due']}\x1e".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def should_send_digest(
+    policy: ReminderPolicy,
+    resend_days: Optional[int],
+    last_hash: Optional[str],
+    last_date: Optional[date],
+    new_hash: str,
+    today: date
+) -> bool:
+    """Apply a user's reminder policy to a freshly built digest."""
+    if policy != ReminderPolicy.ON_CHANGE or new_hash != last_hash or last_date is None:
+        return True
+    return resend_days is not None and (today - last_date).days >= resend_days
+
+
+def iter_reminder_digests(
+    db: Session, today: Optional[date] = None, user_filters: Iterable = ()
+) -> Iterator[Dict[str, Any]]:
+    """Yield one digest per user with due actions, from a single streamed query.
+    
+    Rows come back ordered by user, so digests are grouped on the fly and only
+    one user's items are held in memory at a time. `user_filters` narrows the
+    users considered, e.g. to one scheduler bucket. Digests the user's policy
+    says not to resend are dropped here, before anything is rendered.
+    """
+    today = today or date.today()
+    
+    query = select(
+        User.id,
+        User.email,
+        User.name,
+        User.reminder_policy,
+        User.reminder_resend_days,
+        User.last_digest_hash,
+        User.last_digest_date,
+        Application.id,
+        Application.company,
+        Application.role_title,
+        Application.next_action,
+        Application.next_action_due
+    ).join(
+        Application, Application.user_id == User.id
+    ).where(
+        User.email_reminders_enabled,
+        *user_filters,
+        *due_action_filters(today)
+    ).order_by(User.id, Application.next_action_due)
+    
+    rows = db.execute(query.execution_options(yield_per=REMINDER_BATCH_SIZE))
+    
+    for user_id, user_rows in groupby(rows, key=itemgetter(0)):
+        items = []
+        for row in user_rows:
+            _, email, name, policy, resend_days, last_hash, last_date = row[:7]
+            app_id, company, role_title, next_action, next_action_due = row[7:]
+            items.append(build_reminder_item(
+                app_id, company, role_title, next_action, next_action_due, today
+            ))
+        
+        content_hash = digest_hash(items)
+        if not should_send_digest(policy, resend_days, last_hash, last_date, content_hash, today):
+            logger.debug(f"Skipping unchanged reminder digest for user {user_id}")
+            continue
+        
+        yield {
+            'user_id': user_id,
+            'email': email,
+            'name': name,
+            'today': today,
+            'digest_hash': content_hash,
+            'items': items
+        }
+
+
+def reminder_idempotency_key(digest: Dict[str, Any]) -> str:
+    """Outbox key allowing at most one reminder per user and local day."""
+    return f"{REMINDER_KEY_PREFIX}{digest['user_id']}:{digest['today'].isoformat()}"
+
+
+def forget_digests(db: Session, user_ids: Iterable[Any]):
+    """Clear the recorded digest of users whose reminder was never delivered; the caller commits.
+    
+    Without this, an ON_CHANGE user whose digest was dead-lettered would have
+    the same digest skipped as already sent until its content changed.
+    """
+    user_ids = list(user_ids)
+    if user_ids:
+        db.execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(last_digest_hash=None, last_digest_date=None)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def enqueue_reminder_digests(
+    db: Session, digests: Iterable[Dict[str, Any]], make_session: Optional[Callable[[], Session]] = None
+) -> int:
+    """Render digests and queue them in the email outbox; the caller commits.
+    
+    Each queued digest's hash is recorded on its user in the same
+    transaction, so the next run can skip it if nothing changed. The outbox
+    clears it again if the message is dead-lettered (see forget_digests).
+    
+    With make_session, each batch is instead written and committed in a
+    session of its own once it is rendered, so the write transaction (on
+    SQLite, the process's only writer connection) is never held while the
+    next batch renders. A run that fails part way leaves its earlier batches
+    queued; running it again skips them by idempotency key.
+    """
+    # Mail rendering and delivery are imported by the scheduler only; API
+    # processes import this module just for the reminder query helpers
+    from .email import get_email_service, render_digests_in_processes
+
+    if settings.REMINDER_RENDER_PROCESSES:
+        digests = render_digests_in_processes(digests, settings.REMINDER_RENDER_PROCESSES)
+    
+    digests = iter(digests)
+    queued = 0
+    while True:
+        batch = list(islice(digests, REMINDER_BATCH_SIZE))
+        if not batch:
+            break
         
-        reminder_items.append({
-            'id': str(app.id),
-            'company': app.company,
-            'role_title': app.role_title,
-            'next_action': app.next_action,
-            'next_action_due': app.next_action_due.strftime('%Y-%m-%d'),
-            'is_overdue': is_overdue
-        })
+        messages = []
+        for digest in batch:
+            subject, html_content, text_content = digest.get('rendered') or get_email_service().render_daily_reminders(
+                digest['name'], digest['items']
+            )
+            messages.append({
+                'idempotency_key': reminder_idempotency_key(digest),
+                'user_id': digest['user_id'],
+                'to_email': digest['email'],
+                'subject': subject,
+                'html_body': html_content,
+                'text_body': text_content
+            })
+        
+        if make_session is None:
+            queued += _write_batch(db, batch, messages)
+        else:
+            with make_session() as writer:
+                queued += _write_batch(writer, batch, messages)
+                writer.commit()
     
-    return reminder_items
+    return queued
+
+
+def _write_batch(db: Session, batch: List[Dict[str, Any]], messages: List[Dict[str, Any]]) -> int:
+    """Queue a rendered batch and record its digests on their users."""
+    from .outbox import enqueue_emails
+
+    queued = enqueue_emails(db, messages)
+    db.execute(update(User), [
+        {'id': digest['user_id'], 'last_digest_hash': digest['digest_hash'], 'last_digest_date': digest['today']}
+        for digest in batch
+    ])
+    return queued
+
+
+def queue_daily_reminders(make_session: Callable[[], Session] = SessionLocal) -> bool:
+    """Queue today's reminders for every user in one database; False on error."""
+    db = make_session()
+    try:
+        queued = enqueue_reminder_digests(db, iter_reminder_digests(db), make_session)
+        db.commit()
+        logger.info(f"Queued {queued} daily reminders")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in daily reminder job: {str(e)}")
+        return False
+    finally:
+        db.close()
 
 
 def send_daily_reminders():
-    """Send daily reminder emails to all users."""
+    """Send daily reminder emails to all users, on every shard in parallel."""
+    from ..db.sharding import for_each_shard
+    from .outbox import drain_outbox
+
     logger.info("Starting daily reminder job")
     
-    db = SessionLocal()
+    if not all(for_each_shard(queue_daily_reminders).values()):
+        return
+    
+    stats = drain_outbox()
+    logger.info(f"Daily reminder job completed: {stats.summary()}")
+
+
+def bucket_floor(moment: datetime, bucket_minutes: int) -> datetime:
+    """Start of the UTC time bucket containing a moment."""
+    moment = moment.astimezone(timezone.utc)
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    minutes = (moment - midnight) // timedelta(minutes=1)
+    return midnight + timedelta(minutes=minutes - minutes % bucket_minutes)
+
+
+def reminder_window_segments(
+    timezone_name: str, start: datetime, end: datetime
+) -> List[Tuple[date, Any]]:
+    """Split a UTC bucket into (local date, reminder_time condition) pairs for one time zone.
+    
+    reminder_time is a zero-padded local HH:MM string, so a bucket maps to a
+    string range; a bucket that crosses local midnight becomes two ranges on
+    consecutive local dates.
+    """
     try:
-        # Get all users with email reminders enabled
-        users = db.query(User).filter(User.email_reminders_enabled == True).all()
-        
-        sent_count = 0
-        total_users = len(users)
+        tz = ZoneInfo(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = timezone.utc
+    
+    local_start = start.astimezone(tz)
+    local_end = end.astimezone(tz)
+    start_time = local_start.strftime("%H:%M")
+    end_time = local_end.strftime("%H:%M")
+    
+    if local_start.date() == local_end.date():
+        return [(local_start.date(), and_(User.reminder_time >= start_time, User.reminder_time < end_time))]
+    
+    return [
+        (local_start.date(), User.reminder_time >= start_time),
+        (local_end.date(), User.reminder_time < end_time),
+    ]
+
+
+def iter_bucket_digests(db: Session, start: datetime, end: datetime) -> Iterator[Dict[str, Any]]:
+    """Yield digests for users whose local reminder time falls in [start, end)."""
+    timezones = [
+        name for (name,) in db.query(User.timezone).filter(
+            User.email_reminders_enabled
+        ).distinct()
+    ]
+    
+    return chain.from_iterable(
+        iter_reminder_digests(db, today, [User.timezone == timezone_name, condition])
+        for timezone_name in timezones
+        for today, condition in reminder_window_segments(timezone_name, start, end)
+    )
+
+
+def queue_reminder_buckets(now: datetime, make_session: Callable[[], Session] = SessionLocal):
+    """Queue reminders for the buckets that have ended by now in one database.
+    
+    A bucket is only processed once it is over, so nobody is emailed before
+    their reminder_time; reminders go out up to REMINDER_BUCKET_MINUTES late.
+    The end of the last fully processed bucket is checkpointed, so buckets
+    skipped while the scheduler was down are processed on the next run, up to
+    REMINDER_MAX_CATCHUP_HOURS back.
+    """
+    bucket = timedelta(minutes=settings.REMINDER_BUCKET_MINUTES)
+    current_start = bucket_floor(now, settings.REMINDER_BUCKET_MINUTES)
+    earliest = bucket_floor(
+        now - timedelta(hours=settings.REMINDER_MAX_CATCHUP_HOURS), settings.REMINDER_BUCKET_MINUTES
+    )
+    
+    db = make_session()
+    try:
+        checkpoint = db.get(SchedulerCheckpoint, REMINDER_BUCKETS_JOB_ID)
+        if checkpoint is None:
+            # Start from the current bucket, committed now so the next run
+            # picks up from here even if no bucket ends in this one
+            checkpoint = SchedulerCheckpoint(job_id=REMINDER_BUCKETS_JOB_ID, processed_until=current_start)
+            db.add(checkpoint)
+            db.commit()
         
-        for user in users:
-            try:
-                # Get reminder items for this user
-                reminder_items = get_reminder_items_for_user(db, user)
-                
-                if reminder_items:
-                    # Send reminder email
-                    success = email_service.send_daily_reminders(
-                        user.email,
-                        user.name,
-                        reminder_items
-                    )
-                    
-                    if success:
-                        sent_count += 1
-                        logger.info(f"Sent reminder to {user.email} with {len(reminder_items)} items")
-                    else:
-                        logger.error(f"Failed to send reminder to {user.email}")
-                else:
-                    logger.debug(f"No reminders for {user.email}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing reminders for {user.email}: {str(e)}")
+        processed_until = checkpoint.processed_until
+        if processed_until.tzinfo is None:
+            processed_until = processed_until.replace(tzinfo=timezone.utc)
+        if processed_until < earliest:
+            logger.warning(
+                f"Skipping reminder buckets between {processed_until.isoformat()} and "
+                f"{earliest.isoformat()}: older than the catch-up window"
+            )
+        start = max(processed_until, earliest)
         
-        logger.info(f"Daily reminder job completed. Sent {sent_count}/{total_users} emails")
+        while start + bucket <= now:
+            end = start + bucket
+            # Batches commit as they are queued and the checkpoint after the
+            # last one, so a crash redoes the bucket, skipping what was queued
+            queued = enqueue_reminder_digests(db, iter_bucket_digests(db, start, end), make_session)
+            checkpoint.processed_until = end
+            db.commit()
+            logger.info(f"Reminder bucket {start.isoformat()} queued {queued} reminders")
+            start = end
         
     except Exception as e:
-        logger.error(f"Error in daily reminder job: {str(e)}")
+        db.rollback()
+        logger.error(f"Error in reminder bucket job: {str(e)}")
     finally:
         db.close()
+
+
+def send_reminder_buckets(now: Optional[datetime] = None):
+    """Send reminders for the current time bucket, catching up on any missed ones.
+    
+    Each shard keeps its own checkpoint and is processed in parallel.
+    """
+    from ..db.sharding import for_each_shard
+    from .outbox import drain_outbox
+
+    now = now or datetime.now(timezone.utc)
+    for_each_shard(partial(queue_reminder_buckets, now))
+    
+    stats = drain_outbox()
+    if stats.sent or stats.failed:
+        logger.info(f"Reminder delivery completed: {stats.summary()}")
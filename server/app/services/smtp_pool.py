@@ -0,0 +1,159 @@
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from typing import Iterator, Optional
+import logging
+
+from ..core.tracing import SPAN_KIND_CLIENT, span
+
+logger = logging.getLogger(__name__)
+
+# SMTP reply code for "service not available, closing transmission channel"
+SERVICE_NOT_AVAILABLE = 421
+
+
+class _PooledConnection:
+    """An authenticated SMTP session and its usage bookkeeping."""
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Whether an error means the connection is dead and the send can be retried."""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == SERVICE_NOT_AVAILABLE
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(code == SERVICE_NOT_AVAILABLE for code, _ in error.recipients.values())
+    return False
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of persistent, authenticated SMTP sessions.
+
+    Sessions are reused across messages, retired after a configurable number of
+    messages or idle time, and replaced transparently when the server closes
+    them or answers 421.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        size: int = 4,
+        max_messages_per_connection: int = 100,
+        max_idle_seconds: float = 60.0,
+        use_tls: bool = True,
+        timeout: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.max_idle_seconds = max_idle_seconds
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connections_opened = 0
+
+    def _connect(self) -> _PooledConnection:
+        """Open and authenticate a new SMTP session."""
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._quit(smtp)
+            raise
+        self.connections_opened += 1
+        logger.debug(f"Opened SMTP connection to {self.host}:{self.port}")
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def _quit(smtp: smtplib.SMTP):
+        """Close a session, ignoring errors from an already dead connection."""
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _take_idle(self) -> Optional[_PooledConnection]:
+        """Get a reusable idle session, discarding stale ones."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if time.monotonic() - connection.last_used > self.max_idle_seconds:
+                self._quit(connection.smtp)
+                continue
+            return connection
+
+    def _release(self, connection: _PooledConnection):
+        """Return a session to the pool, or retire it once it hits the message cap."""
+        connection.last_used = time.monotonic()
+        if connection.messages_sent >= self.max_messages_per_connection:
+            self._quit(connection.smtp)
+        else:
+            self._idle.put(connection)
+
+    @contextmanager
+    def connection(self, fresh: bool = False) -> Iterator[_PooledConnection]:
+        """Check out a session, opening a new one if none is idle or fresh is set."""
+        self._slots.acquire()
+        try:
+            connection = None if fresh else self._take_idle()
+            connection = connection or self._connect()
+            try:
+                yield connection
+            except Exception as e:
+                # A rejected message leaves the session usable (smtplib resets
+                # it); anything else may have left it in an unknown state
+                if isinstance(e, smtplib.SMTPException) and not _is_connection_error(e):
+                    self._release(connection)
+                else:
+                    self._quit(connection.smtp)
+                raise
+            self._release(connection)
+        finally:
+            self._slots.release()
+
+    def send_message(self, msg: Message):
+        """Send a message, reconnecting once if the session turns out to be dead."""
+        with span("smtp send", kind=SPAN_KIND_CLIENT, attributes={"server.address": self.host}) as send_span:
+            try:
+                with self.connection() as connection:
+                    connection.smtp.send_message(msg)
+                    connection.messages_sent += 1
+            except Exception as e:
+                if not _is_connection_error(e):
+                    raise
+                logger.info(f"SMTP connection lost ({e}), reconnecting")
+                send_span.set_attribute("smtp.reconnected", True)
+                with self.connection(fresh=True) as connection:
+                    connection.smtp.send_message(msg)
+                    connection.messages_sent += 1
+
+    def close(self):
+        """Close all idle sessions."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(connection.smtp)
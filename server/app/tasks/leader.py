@@ -0,0 +1,111 @@
+import hashlib
+import os
+from typing import Optional
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..core.config import settings
+from ..db.session import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+def _lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a lock name."""
+    digest = hashlib.sha256(name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class AdvisoryLock:
+    """Postgres session-level advisory lock held on a dedicated connection.
+
+    The lock lives as long as the connection, so if the leader dies or loses
+    its database connection another process can take over.
+    """
+
+    def __init__(self, name: str):
+        self.key = _lock_key(name)
+        self._connection: Optional[Connection] = None
+
+    def acquire(self) -> bool:
+        if self._connection is not None:
+            return True
+        connection = get_engine().connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            ).scalar()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def is_held(self) -> bool:
+        if self._connection is None:
+            return False
+        try:
+            self._connection.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"Lost scheduler lock connection: {str(e)}")
+            self._connection.invalidate()
+            self._connection = None
+            return False
+
+    def release(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+        except Exception:
+            pass
+        finally:
+            self._connection.close()
+            self._connection = None
+
+
+class FileLock:
+    """Exclusive lock on a local file, for single-host deployments without Postgres."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        import fcntl
+
+        if self._file is not None:
+            return True
+        lock_file = open(self.path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def is_held(self) -> bool:
+        return self._file is not None
+
+    def release(self):
+        import fcntl
+
+        if self._file is None:
+            return
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def create_leader_lock():
+    """Pick the leader lock implementation for the configured database."""
+    if get_engine().dialect.name == "postgresql":
+        return AdvisoryLock(settings.SCHEDULER_LOCK_NAME)
+    return FileLock(os.path.abspath(settings.SCHEDULER_LOCK_FILE))
@@ -1,37 +1,147 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+import functools
+import threading
+import time
 import logging
 
-from ..services.reminders import send_daily_reminders
+from ..core.config import settings
+from ..core.metrics import scheduler_job_duration_seconds, scheduler_job_runs_total
+from ..core.tracing import start_trace
+from ..db.instrumentation import track_queries
+from ..services.blobs import collect_blob_garbage
+from ..services.outbox import drain_email_outbox, purge_email_outbox
+from ..services.reminders import send_reminder_buckets
+from .leader import create_leader_lock
 
 logger = logging.getLogger(__name__)
 
-scheduler = AsyncIOScheduler()
+# Jobs run on the scheduler's own thread pool, never on the API event loop
+scheduler = BackgroundScheduler(
+    executors={'default': ThreadPoolExecutor(settings.SCHEDULER_MAX_WORKERS)},
+    job_defaults={'coalesce': True, 'max_instances': 1},
+    timezone="UTC"
+)
+
+_stop_event = threading.Event()
+_election_thread = None
+
+
+def instrument_job(job_id: str, func):
+    """Wrap a job function to record its run time, outcome and SQL statistics."""
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        status = "success"
+        start = time.perf_counter()
+        try:
+            with start_trace(f"job {job_id}", attributes={"job.id": job_id}), \
+                    track_queries(f"job:{job_id}") as stats:
+                return func(*args, **kwargs)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            scheduler_job_duration_seconds.observe(time.perf_counter() - start, (job_id,))
+            scheduler_job_runs_total.inc((job_id, status))
+            logger.info(f"Job {job_id} finished ({status}): {stats.summary()}")
+    return run
 
 
 def setup_scheduler():
     """Set up the background scheduler."""
-    # Schedule daily reminders at 7:30 AM
+    # Process reminders in time buckets so each user is emailed at their own
+    # reminder_time and the load is spread over the day
+    bucket_minutes = settings.REMINDER_BUCKET_MINUTES
+    scheduler.add_job(
+        instrument_job('reminder_buckets', send_reminder_buckets),
+        CronTrigger(minute=f"*/{bucket_minutes}", timezone="UTC"),
+        id='reminder_buckets',
+        name='Send reminder emails for the current time bucket',
+        replace_existing=True
+    )
+
+    # Retries and anything left over from a crashed run
+    scheduler.add_job(
+        instrument_job('email_outbox', drain_email_outbox),
+        IntervalTrigger(seconds=settings.OUTBOX_DRAIN_INTERVAL_SECONDS),
+        id='email_outbox',
+        name='Send due emails from the outbox',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        instrument_job('email_outbox_purge', purge_email_outbox),
+        CronTrigger(hour=3, minute=0, timezone="UTC"),
+        id='email_outbox_purge',
+        name='Delete sent emails past their retention',
+        replace_existing=True
+    )
+
+    # Attachment blobs no File row references any more
     scheduler.add_job(
-        send_daily_reminders,
-        CronTrigger(hour=7, minute=30),  # 7:30 AM daily
-        id='daily_reminders',
-        name='Send daily reminder emails',
+        instrument_job('blob_gc', collect_blob_garbage),
+        IntervalTrigger(seconds=settings.BLOB_GC_INTERVAL_SECONDS),
+        id='blob_gc',
+        name='Delete unreferenced attachment blobs',
         replace_existing=True
     )
     
-    logger.info("Scheduler configured with daily reminder job at 7:30 AM")
+    logger.info(f"Scheduler configured with reminder job every {bucket_minutes} minutes")
+
+
+def _run_election():
+    """Hold scheduler leadership: run jobs only while this process owns the lock."""
+    lock = create_leader_lock()
+    is_leader = False
+
+    try:
+        while not _stop_event.is_set():
+            try:
+                if not is_leader and lock.acquire():
+                    is_leader = True
+                    if scheduler.running:
+                        scheduler.resume()
+                    else:
+                        scheduler.start()
+                    logger.info("Acquired scheduler leadership, running scheduled jobs")
+                elif is_leader and not lock.is_held():
+                    is_leader = False
+                    scheduler.pause()
+                    logger.warning("Lost scheduler leadership, pausing scheduled jobs")
+            except Exception as e:
+                logger.error(f"Scheduler leader election failed: {str(e)}")
+
+            _stop_event.wait(settings.SCHEDULER_LEADER_RETRY_SECONDS)
+    finally:
+        if scheduler.running:
+            scheduler.shutdown()
+        lock.release()
 
 
 def start_scheduler():
-    """Start the scheduler."""
-    if not scheduler.running:
-        scheduler.start()
+    """Start competing for scheduler leadership.
+
+    Every process may call this; only the one holding the leader lock runs
+    jobs, the others keep retrying in the background and take over if the
+    leader goes away.
+    """
+    global _election_thread
+    if _election_thread is None or not _election_thread.is_alive():
+        _stop_event.clear()
+        _election_thread = threading.Thread(
+            target=_run_election, name="scheduler-election", daemon=True
+        )
+        _election_thread.start()
         logger.info("Scheduler started")
 
 
 def stop_scheduler():
-    """Stop the scheduler."""
-    if scheduler.running:
-        scheduler.shutdown()
+    """Stop the scheduler and give up leadership."""
+    global _election_thread
+    if _election_thread is not None:
+        _stop_event.set()
+        _election_thread.join()
+        _election_thread = None
         logger.info("Scheduler stopped")
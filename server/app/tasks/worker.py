@@ -0,0 +1,45 @@
+"""Standalone scheduler process.
+
+Run scheduled jobs outside the API workers by setting SCHEDULER_MODE=worker
+for the API and starting one or more of these (only the leader runs jobs):
+
+    python -m app.tasks.worker
+"""
+import signal
+import threading
+import logging
+
+from ..core.config import settings
+from ..core.profiling import start_continuous_profiling, stop_continuous_profiling
+from ..core.tracing import LOG_FORMAT, install_log_correlation, shutdown_tracing
+from .scheduler import setup_scheduler, start_scheduler, stop_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    install_log_correlation()
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    shutdown = threading.Event()
+
+    def request_shutdown(signum, frame):
+        logger.info(f"Received signal {signum}, shutting down")
+        shutdown.set()
+
+    signal.signal(signal.SIGTERM, request_shutdown)
+    signal.signal(signal.SIGINT, request_shutdown)
+
+    logger.info("Starting Job Tracker scheduler worker")
+    if settings.PROFILE_CONTINUOUS:
+        start_continuous_profiling()
+    setup_scheduler()
+    start_scheduler()
+
+    shutdown.wait()
+    stop_scheduler()
+    stop_continuous_profiling()
+    shutdown_tracing()
+
+
+if __name__ == "__main__":
+    main()
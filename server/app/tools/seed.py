@@ -0,0 +1,379 @@
+"""Generate a production-shaped synthetic dataset for load testing.
+
+Creates users, applications, contacts, notes, timeline events and file
+records with skewed distributions: a few power users with very large
+pipelines, a long tail of light users, applications spread over several years
+that move through realistic stage transitions. Output is deterministic for a
+given --seed and --as-of date.
+
+Rows are generated one user at a time and written through bulk paths (COPY on
+PostgreSQL with psycopg, multi-row INSERTs elsewhere), so memory stays flat
+and tens of millions of rows load in minutes.
+
+    python -m app.tools.seed --users 20000 --power-users 5 --create-schema
+
+Every seeded user can log in with --password (default "password123").
+"""
+import argparse
+import enum
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List
+import logging
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Connection
+
+from ..core.config import settings
+from ..core.security import get_password_hash
+from ..db.base import Base
+from ..models.user import User
+from ..models.application import (
+    Application, ApplicationStage, ApplicationPriority, ApplicationSource, EmploymentType
+)
+from ..models.contact import Contact
+from ..models.note import Note
+from ..models.timeline_event import TimelineEvent, TimelineEventType
+from ..models.file import File
+
+logger = logging.getLogger(__name__)
+
+COMPANIES = [
+    "Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises",
+    "Wonka", "Cyberdyne", "Soylent", "Tyrell", "Aperture", "Black Mesa", "Vandelay", "Pied Piper",
+    "Massive Dynamic", "Oscorp", "Gringotts", "Monsters Inc", "Dunder Mifflin",
+]
+ROLES = [
+    "Backend Engineer", "Frontend Engineer", "Full Stack Engineer", "Data Scientist",
+    "Data Engineer", "Site Reliability Engineer", "Product Manager", "Engineering Manager",
+    "Machine Learning Engineer", "QA Engineer", "Security Engineer", "Designer",
+]
+LOCATIONS = ["Remote", "New York, NY", "San Francisco, CA", "London", "Berlin", "Toronto", "Austin, TX"]
+SALARY_RANGES = ["80k-100k", "100k-130k", "130k-160k", "160k-200k", "200k+", None]
+CONTACT_ROLES = ["Recruiter", "Hiring Manager", "Engineer", "Referrer", "HR"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Kim", "Müller", "Okafor", "Silva", "Novak", "Ito"]
+NOTE_TEXTS = [
+    "Phone screen went well, waiting to hear back.",
+    "Asked about team size and on-call rotation.",
+    "Take-home assignment due end of week.",
+    "Recruiter mentioned the role might be re-leveled.",
+    "Follow up if no response by Friday.",
+    "Compensation discussion scheduled.",
+]
+ACTIONS = {
+    ApplicationStage.DRAFT: ["Submit application", "Tailor resume", "Ask for referral"],
+    ApplicationStage.APPLIED: ["Follow up with recruiter", "Check application status"],
+    ApplicationStage.INTERVIEW: ["Prepare for interview", "Send thank-you note", "Finish take-home"],
+    ApplicationStage.OFFER: ["Negotiate offer", "Reply to offer"],
+}
+FILE_TYPES = [
+    ("resume.pdf", "application/pdf"),
+    ("cover_letter.pdf", "application/pdf"),
+    ("offer_letter.pdf", "application/pdf"),
+    ("portfolio.zip", "application/zip"),
+]
+
+# Insert order respects foreign keys; buffers are flushed in this order
+SEED_TABLES = [
+    User.__table__,
+    Application.__table__,
+    Contact.__table__,
+    Note.__table__,
+    TimelineEvent.__table__,
+    File.__table__,
+]
+
+
+class BulkWriter:
+    """Buffer generated rows per table and write them in bulk.
+
+    Uses COPY on PostgreSQL (psycopg 3) and executemany INSERTs elsewhere.
+    Buffers are flushed together in foreign-key order and committed, so
+    children never reach the database before their parents.
+    """
+
+    def __init__(self, connection: Connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.use_copy = connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg"
+        self.buffers: Dict[str, List[Dict[str, Any]]] = {table.name: [] for table in SEED_TABLES}
+        self.counts: Dict[str, int] = {table.name: 0 for table in SEED_TABLES}
+
+    def add(self, table, row: Dict[str, Any]):
+        buffer = self.buffers[table.name]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    @staticmethod
+    def _copy_value(value: Any) -> Any:
+        # SQLAlchemy's Enum type stores member names; JSON columns take text
+        if isinstance(value, enum.Enum):
+            return value.name
+        if isinstance(value, dict):
+            return json.dumps(value)
+        return value
+
+    def _copy(self, table, rows: List[Dict[str, Any]]):
+        columns = list(rows[0])
+        dbapi_connection = self.connection.connection.dbapi_connection
+        statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+        with dbapi_connection.cursor() as cursor, cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row([self._copy_value(row[column]) for column in columns])
+
+    def flush(self):
+        for table in SEED_TABLES:
+            rows = self.buffers[table.name]
+            if not rows:
+                continue
+            if self.use_copy:
+                self._copy(table, rows)
+            else:
+                self.connection.execute(insert(table), rows)
+            self.counts[table.name] += len(rows)
+            self.buffers[table.name] = []
+        self.connection.commit()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values()) + sum(len(rows) for rows in self.buffers.values())
+
+
+class SeedGenerator:
+    """Deterministic generator of per-user rows."""
+
+    def __init__(self, args: argparse.Namespace, password_hash: str):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.password_hash = password_hash
+        self.as_of = datetime.combine(args.as_of, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=12)
+        self.history_start = self.as_of - timedelta(days=365 * args.years)
+
+    def new_id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def application_count(self, index: int) -> int:
+        """Power users first, then a Pareto-distributed long tail."""
+        args = self.args
+        if index < args.power_users:
+            return args.power_user_apps
+        alpha = args.apps_alpha
+        scale = args.mean_apps * (alpha - 1) / alpha if alpha > 1 else args.mean_apps
+        return min(args.max_apps, int(scale * self.rng.paretovariate(alpha)))
+
+    def moment_between(self, start: datetime, end: datetime) -> datetime:
+        span = max((end - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.rng.random() * span)
+
+    def stage_history(self, created_at: datetime) -> List[Any]:
+        """Simulate an application's path through the pipeline up to as_of."""
+        rng = self.rng
+        moment = created_at
+        stage = ApplicationStage.DRAFT
+        transitions = []
+
+        def advance(new_stage, min_days, max_days) -> bool:
+            nonlocal moment, stage
+            when = moment + timedelta(days=rng.uniform(min_days, max_days))
+            if when > self.as_of:
+                return False
+            transitions.append((when, stage, new_stage))
+            moment, stage = when, new_stage
+            return True
+
+        if rng.random() < 0.9 and advance(ApplicationStage.APPLIED, 0, 7):
+            roll = rng.random()
+            if roll < 0.2:
+                if advance(ApplicationStage.INTERVIEW, 5, 30):
+                    roll = rng.random()
+                    if roll < 0.25:
+                        advance(ApplicationStage.OFFER, 7, 30)
+                    elif roll < 0.85:
+                        advance(ApplicationStage.REJECTED, 3, 30)
+            elif roll < 0.75:
+                advance(ApplicationStage.REJECTED, 7, 45)
+
+        return transitions
+
+    def user_row(self, index: int) -> Dict[str, Any]:
+        created_at = self.moment_between(self.history_start, self.as_of - timedelta(days=1))
+        return {
+            "id": self.new_id(),
+            "name": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+            "email": f"user{index}@seed{index % self.args.email_domains}.example.com",
+            "password_hash": self.password_hash,
+            "reminder_time": f"{self.rng.randint(6, 21):02d}:{self.rng.choice(['00', '15', '30', '45'])}",
+            "timezone": "UTC",
+            "email_reminders_enabled": self.rng.random() < 0.8,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def write_user(self, writer: BulkWriter, index: int):
+        rng = self.rng
+        user = self.user_row(index)
+        writer.add(User.__table__, user)
+
+        for _ in range(self.application_count(index)):
+            self.write_application(writer, user)
+
+        # Contacts not tied to any application
+        for _ in range(rng.randint(0, 3)):
+            writer.add(Contact.__table__, self.contact_row(user["id"], None, user["created_at"]))
+
+    def contact_row(self, user_id, application_id, created_at: datetime) -> Dict[str, Any]:
+        rng = self.rng
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        return {
+            "id": self.new_id(),
+            "user_id": user_id,
+            "application_id": application_id,
+            "name": f"{first} {last}",
+            "role": rng.choice(CONTACT_ROLES),
+            "email": f"{first.lower()}.{rng.randint(1, 9999)}@example.com",
+            "phone": None,
+            "linkedin": None,
+            "notes": None,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def write_application(self, writer: BulkWriter, user: Dict[str, Any]):
+        rng = self.rng
+        created_at = self.moment_between(user["created_at"], self.as_of)
+        application_id = self.new_id()
+        company = rng.choice(COMPANIES)
+        role_title = rng.choice(ROLES)
+
+        events = [(created_at, TimelineEventType.CREATED, {"role_title": role_title, "company": company})]
+        for when, old_stage, new_stage in self.stage_history(created_at):
+            events.append((when, TimelineEventType.STAGE_CHANGED, {
+                "old_stage": old_stage.value, "new_stage": new_stage.value
+            }))
+        stage = events[-1][2]["new_stage"] if len(events) > 1 else ApplicationStage.DRAFT.value
+        stage = ApplicationStage(stage)
+        last_activity = events[-1][0]
+
+        # Only recently active applications still carry a next action
+        next_action = next_action_due = None
+        if stage in ACTIONS and (self.as_of - last_activity).days < 60 and rng.random() < 0.7:
+            next_action = rng.choice(ACTIONS[stage])
+            next_action_due = (last_activity + timedelta(days=rng.randint(1, 14))).date()
+
+        children = []
+        for _ in range(min(10, int(rng.expovariate(1.0)))):
+            when = self.moment_between(created_at, self.as_of)
+            children.append((Note.__table__, {
+                "id": self.new_id(),
+                "user_id": user["id"],
+                "application_id": application_id,
+                "content": rng.choice(NOTE_TEXTS),
+                "created_at": when,
+                "updated_at": when,
+            }))
+            events.append((when, TimelineEventType.NOTE_ADDED, {"note_preview": children[-1][1]["content"][:50]}))
+        for _ in range(rng.choice((0, 0, 1, 1, 2))):
+            when = self.moment_between(created_at, self.as_of)
+            contact = self.contact_row(user["id"], application_id, when)
+            children.append((Contact.__table__, contact))
+            events.append((when, TimelineEventType.CONTACT_ADDED, {
+                "contact_name": contact["name"], "contact_role": contact["role"]
+            }))
+        if rng.random() < 0.3:
+            when = self.moment_between(created_at, self.as_of)
+            filename, content_type = rng.choice(FILE_TYPES)
+            file_id = self.new_id()
+            children.append((File.__table__, {
+                "id": file_id,
+                "application_id": application_id,
+                "filename": filename,
+                "path": f"seed/{file_id}/{filename}",
+                "size_bytes": int(rng.lognormvariate(11.5, 1.0)),
+                "content_type": content_type,
+                "created_at": when,
+            }))
+            events.append((when, TimelineEventType.FILE_ADDED, {"filename": filename}))
+
+        updated_at = max(when for when, _, _ in events)
+        writer.add(Application.__table__, {
+            "id": application_id,
+            "user_id": user["id"],
+            "role_title": role_title,
+            "company": company,
+            "location": rng.choice(LOCATIONS),
+            "employment_type": rng.choice(list(EmploymentType)),
+            "salary_range": rng.choice(SALARY_RANGES),
+            "source": rng.choice(list(ApplicationSource)),
+            "stage": stage,
+            "priority": rng.choices(list(ApplicationPriority), weights=(3, 5, 2))[0],
+            "next_action": next_action,
+            "next_action_due": next_action_due,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        })
+        for table, row in children:
+            writer.add(table, row)
+        for when, event_type, payload in events:
+            writer.add(TimelineEvent.__table__, {
+                "id": self.new_id(),
+                "application_id": application_id,
+                "type": event_type.value,
+                "payload": payload,
+                "created_at": when,
+            })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--power-users", type=int, default=1, help="Users with --power-user-apps applications")
+    parser.add_argument("--power-user-apps", type=int, default=50_000)
+    parser.add_argument("--mean-apps", type=float, default=40, help="Mean applications per regular user")
+    parser.add_argument("--apps-alpha", type=float, default=1.5, help="Pareto shape; lower is more skewed")
+    parser.add_argument("--max-apps", type=int, default=5000, help="Cap for regular users")
+    parser.add_argument("--years", type=float, default=3, help="Length of the generated history")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(), help="End of history (YYYY-MM-DD)")
+    parser.add_argument("--email-domains", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--batch-size", type=int, default=20_000, help="Rows buffered per table before writing")
+    parser.add_argument("--create-schema", action="store_true", help="Create missing tables first")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    engine = create_engine(args.database_url)
+    if args.create_schema:
+        Base.metadata.create_all(engine)
+
+    generator = SeedGenerator(args, get_password_hash(args.password))
+    start = time.perf_counter()
+    last_report = start
+
+    with engine.connect() as connection:
+        writer = BulkWriter(connection, args.batch_size)
+        for index in range(args.users):
+            generator.write_user(writer, index)
+            now = time.perf_counter()
+            if now - last_report >= 10:
+                logger.info(
+                    f"{index + 1}/{args.users} users, {writer.total} rows, "
+                    f"{writer.total / (now - start):,.0f} rows/s"
+                )
+                last_report = now
+        writer.flush()
+
+    elapsed = time.perf_counter() - start
+    total = sum(writer.counts.values())
+    summary = ", ".join(f"{name}={count}" for name, count in writer.counts.items())
+    logger.info(f"Seeded {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s): {summary}")
+
+
+if __name__ == "__main__":
+    main()
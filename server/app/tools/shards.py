@@ -0,0 +1,198 @@
+"""Set up sharded databases and move users between shards.
+
+`init` creates the directory table in DATABASE_URL and the schema on every
+shard in SHARDS, then registers users already present on a shard (e.g. the
+old single database, or shards loaded with app.tools.seed) in the directory.
+
+`move` relocates one user while the API keeps serving:
+
+1. the directory marks the user as moving; after SHARD_DIRECTORY_CACHE_SECONDS
+   every process has seen it, and the user's writes are refused with 503
+   while reads are still served by the old shard;
+2. the user's rows are copied to the target shard in one transaction;
+3. the directory points at the target shard and the flag is cleared;
+4. after another cache period, when no process still reads the old shard,
+   the rows are deleted from it.
+
+Blob reference counts (see app.services.blobs) move with the user's files;
+the blob content itself is shared by the shards and stays in place.
+
+Scheduled jobs are not paused, so avoid moving users while their reminder
+bucket is being processed.
+
+    SHARDS='{"a": "sqlite:///./a.db", "b": "sqlite:///./b.db"}' python -m app.tools.shards init
+    python -m app.tools.shards move 3f0c...e1 b
+"""
+import argparse
+import logging
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..core.config import settings
+from ..db.base import Base
+from ..db.session import SessionLocal, get_engine
+from ..db.sharding import DirectoryBase, UserShard, get_router
+from ..services.blobs import adjust_references, ensure_blobs
+
+logger = logging.getLogger(__name__)
+
+# Rows copied per INSERT when moving a user
+COPY_BATCH_SIZE = 1000
+
+
+def user_scope(table, user_id: uuid.UUID) -> Optional[ColumnElement]:
+    """Criteria selecting one user's rows from a table; None for tables not owned by users."""
+    applications = Base.metadata.tables["applications"]
+    if table.name == "users":
+        return table.c.id == user_id
+    if "user_id" in table.c:
+        return table.c.user_id == user_id
+    if "application_id" in table.c:
+        return table.c.application_id.in_(
+            select(applications.c.id).where(applications.c.user_id == user_id)
+        )
+    return None
+
+
+def user_tables(user_id: uuid.UUID):
+    """(table, criteria) for every table holding the user's rows, parents first."""
+    return [
+        (table, scope)
+        for table in Base.metadata.sorted_tables
+        if (scope := user_scope(table, user_id)) is not None
+    ]
+
+
+def user_blob_references(connection: Connection, user_id: uuid.UUID) -> Dict[str, Tuple[int, int]]:
+    """sha256 -> (size, number of the user's files) for the blobs the user's files use."""
+    files = Base.metadata.tables["files"]
+    rows = connection.execute(
+        select(files.c.sha256, func.max(files.c.size_bytes), func.count())
+        .where(user_scope(files, user_id), files.c.sha256.isnot(None))
+        .group_by(files.c.sha256)
+    )
+    return {sha256: (size, count) for sha256, size, count in rows}
+
+
+def delete_user_rows(connection: Connection, user_id: uuid.UUID):
+    # Core deletes bypass the File flush listener that counts blob references
+    blobs = user_blob_references(connection, user_id)
+    for table, scope in reversed(user_tables(user_id)):
+        connection.execute(delete(table).where(scope))
+    adjust_references(connection, {sha256: -count for sha256, (_, count) in blobs.items()})
+
+
+def copy_user_rows(source: Connection, target: Connection, user_id: uuid.UUID) -> Dict[str, int]:
+    counts = {}
+    for table, scope in user_tables(user_id):
+        result = source.execute(select(table).where(scope))
+        counts[table.name] = 0
+        while True:
+            rows = result.mappings().fetchmany(COPY_BATCH_SIZE)
+            if not rows:
+                break
+            target.execute(insert(table), [dict(row) for row in rows])
+            counts[table.name] += len(rows)
+    return counts
+
+
+def init():
+    router = get_router()
+    DirectoryBase.metadata.create_all(get_engine())
+    users = Base.metadata.tables["users"]
+
+    for shard in router.names:
+        engine, _ = router.engines(shard)
+        Base.metadata.create_all(engine)
+
+        registered = 0
+        with engine.connect() as connection, SessionLocal() as directory:
+            known = set(directory.scalars(select(UserShard.user_id)))
+            for user_id, email in connection.execute(select(users.c.id, users.c.email)):
+                if user_id in known:
+                    continue
+                directory.add(UserShard(user_id=user_id, email=email, shard=shard, moving=False))
+                try:
+                    directory.commit()
+                except IntegrityError:
+                    directory.rollback()
+                    logger.warning(f"{email} on shard {shard} is already registered to another user; skipped")
+                    continue
+                known.add(user_id)
+                registered += 1
+        logger.info(f"Shard {shard}: schema ready, {registered} users registered")
+
+
+def move(user_id: uuid.UUID, target: str, wait_seconds: float):
+    router = get_router()
+    router.engines(target)  # fail early on an unknown shard
+    with SessionLocal() as directory:
+        entry = directory.get(UserShard, user_id)
+        if entry is None:
+            raise SystemExit(f"User {user_id} is not in the shard directory")
+        source = entry.shard
+    if source == target:
+        logger.info(f"User {user_id} is already on shard {target}")
+        return
+
+    router.set_location(user_id, source, moving=True)
+    logger.info(f"Moving {user_id} from {source} to {target}; waiting {wait_seconds:.0f}s for caches")
+    time.sleep(wait_seconds)
+
+    try:
+        source_engine, source_reader = router.engines(source)
+        target_engine, _ = router.engines(target)
+        # Read through the SQLite reader pool so the copy does not hold the source's write lock
+        with (source_reader or source_engine).connect() as source_connection, \
+                target_engine.begin() as target_connection:
+            # Leftovers of an interrupted move would collide with the copy
+            delete_user_rows(target_connection, user_id)
+            counts = copy_user_rows(source_connection, target_connection, user_id)
+            blobs = user_blob_references(source_connection, user_id)
+            ensure_blobs(target_connection, {sha256: size for sha256, (size, _) in blobs.items()})
+            adjust_references(target_connection, {sha256: count for sha256, (_, count) in blobs.items()})
+    except Exception:
+        router.set_location(user_id, source, moving=False)
+        raise
+
+    router.set_location(user_id, target, moving=False)
+    summary = ", ".join(f"{name}={count}" for name, count in counts.items() if count)
+    logger.info(f"Copied {summary}; {user_id} now served by {target}")
+
+    time.sleep(wait_seconds)
+    with source_engine.begin() as source_connection:
+        delete_user_rows(source_connection, user_id)
+    logger.info(f"Removed {user_id} from {source}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("init", help="Create schemas and register existing users")
+    move_parser = commands.add_parser("move", help="Move a user to another shard")
+    move_parser.add_argument("user_id", type=uuid.UUID)
+    move_parser.add_argument("target")
+    move_parser.add_argument(
+        "--wait-seconds", type=float, default=settings.SHARD_DIRECTORY_CACHE_SECONDS,
+        help="Time for every process to see a directory change (the directory cache TTL)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if not settings.SHARDS:
+        raise SystemExit("SHARDS is not configured")
+
+    if args.command == "init":
+        init()
+    else:
+        move(args.user_id, args.target, args.wait_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Local stand-in SMTP server that accepts and discards mail.
+
+Speaks enough SMTP for smtplib (no TLS, any AUTH accepted) and can simulate a
+slow relay or one that drops connections with 421 after a number of messages.
+
+    python -m app.tools.smtp_sink --port 1025 --latency 0.05
+
+Point the app at it with SMTP_HOST=localhost SMTP_PORT=1025 SMTP_USE_TLS=false.
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Handle one SMTP session."""
+
+    def reply(self, line: str):
+        if self.server.sink.latency:
+            time.sleep(self.server.sink.latency)
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def read_data(self) -> bytes:
+        """Read a DATA payload up to the terminating dot line."""
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b"..") else line)
+        return b"".join(lines)
+
+    def handle(self):
+        sink = self.server.sink
+        sink._record_connection()
+        messages_on_connection = 0
+        self.reply("220 smtp-sink ready")
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode("utf-8", "replace").strip().split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self.wfile.write(b"250-smtp-sink\r\n250-8BITMIME\r\n")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif verb == "HELO":
+                self.reply("250 smtp-sink")
+            elif verb == "AUTH":
+                self.reply("235 Authentication successful")
+            elif verb == "MAIL":
+                if sink.disconnect_after and messages_on_connection >= sink.disconnect_after:
+                    self.reply("421 Too many messages on this connection")
+                    return
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                sink._record_message(self.read_data())
+                messages_on_connection += 1
+                self.reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            elif verb == "STARTTLS":
+                self.reply("454 TLS not available")
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """In-process SMTP server for tests and benchmarks.
+
+    `latency` is added before every reply to simulate a remote relay, and
+    `disconnect_after` makes the server answer 421 and hang up once a
+    connection has carried that many messages.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        disconnect_after: Optional[int] = None,
+        keep_messages: bool = False,
+    ):
+        self.latency = latency
+        self.disconnect_after = disconnect_after
+        self.keep_messages = keep_messages
+        self.messages: List[bytes] = []
+        self.message_count = 0
+        self.connection_count = 0
+        self._lock = threading.Lock()
+
+        self._server = _ThreadingServer((host, port), _SinkHandler)
+        self._server.sink = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _record_connection(self):
+        with self._lock:
+            self.connection_count += 1
+
+    def _record_message(self, data: bytes):
+        with self._lock:
+            self.message_count += 1
+            if self.keep_messages:
+                self.messages.append(data)
+
+    def start(self) -> "SMTPSink":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added before each reply")
+    parser.add_argument("--disconnect-after", type=int, help="Answer 421 after this many messages per connection")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sink = SMTPSink(args.host, args.port, args.latency, args.disconnect_after)
+    logger.info(f"SMTP sink listening on {sink.host}:{sink.port}")
+    try:
+        sink._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink._server.server_close()
+        logger.info(f"Received {sink.message_count} messages over {sink.connection_count} connections")
+
+
+if __name__ == "__main__":
+    main()
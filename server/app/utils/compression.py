@@ -0,0 +1,128 @@
+import functools
+import importlib.util
+import zlib
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+# Codecs accepted by streaming exports, mapped to their file suffix
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Optional packages providing a Content-Encoding; gzip needs only zlib
+CODEC_PACKAGES = {"br": "brotli", "zstd": "zstandard"}
+
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+
+
+def iter_encoded(chunks: Iterable[Union[str, bytes]], encoding: str = "utf-8") -> Iterator[bytes]:
+    """Encode a stream of text chunks to bytes, passing bytes through."""
+    for chunk in chunks:
+        yield chunk.encode(encoding) if isinstance(chunk, str) else chunk
+
+
+class _BrotliCompressor:
+    """Adapt brotli.Compressor to the compress()/flush() interface of the others."""
+
+    def __init__(self, quality: int):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def create_compressor(codec: str, level: Optional[int] = None):
+    """Incremental compressor for a Content-Encoding token (gzip, br or zstd).
+
+    compress(data) returns the output ready so far (possibly empty) and
+    flush() ends the stream.
+    """
+    if level is None:
+        level = DEFAULT_LEVELS.get(codec)
+    if codec == "gzip":
+        # wbits=16+MAX_WBITS makes zlib emit a gzip header and trailer
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if codec == "br":
+        return _BrotliCompressor(level)
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Unsupported compression codec: {codec}")
+
+
+@functools.lru_cache(maxsize=None)
+def codec_available(codec: str) -> bool:
+    """Whether the package for a codec is installed (gzip always is)."""
+    package = CODEC_PACKAGES.get(codec)
+    return package is None or importlib.util.find_spec(package) is not None
+
+
+@functools.lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: str, preferred: Sequence[str]) -> Optional[str]:
+    """Pick a codec from `preferred` (in server preference order) for an Accept-Encoding header.
+
+    The highest q-value wins, ties going to the earlier codec in `preferred`;
+    `*` covers codecs not listed and q=0 refuses one. Returns None when
+    nothing acceptable is available, meaning identity.
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.partition(";")
+        token = token.strip()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[token] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for codec in preferred:
+        quality = accepted.get(codec, wildcard)
+        if quality > best_quality and codec_available(codec):
+            best, best_quality = codec, quality
+    return best
+
+
+def iter_compressed(chunks: Iterable[Union[str, bytes]], codec: str, level: Optional[int] = None) -> Iterator[bytes]:
+    """Compress a stream of chunks incrementally."""
+    compressor = create_compressor(codec, level)
+
+    for chunk in iter_encoded(chunks):
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+def iter_gzip(chunks: Iterable[Union[str, bytes]], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a stream of chunks incrementally."""
+    return iter_compressed(chunks, "gzip", level)
+
+
+def iter_zstd(chunks: Iterable[Union[str, bytes]], level: int = 3) -> Iterator[bytes]:
+    """Zstandard-compress a stream of chunks incrementally."""
+    return iter_compressed(chunks, "zstd", level)
+
+
+def compress_stream(
+    chunks: Iterable[Union[str, bytes]], codec: Optional[str]
+) -> Iterator[bytes]:
+    """Compress a stream with the named codec, or just encode it when codec is None."""
+    if codec is None:
+        return iter_encoded(chunks)
+    if codec == "gzip":
+        return iter_gzip(chunks)
+    if codec == "zstd":
+        return iter_zstd(chunks)
+    raise ValueError(f"Unsupported compression codec: {codec}")
@@ -1,6 +1,6 @@
 import csv
 import io
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence
 from datetime import datetime, date
 from uuid import UUID
 
@@ -135,17 +135,64 @@ def import_applications_from_csv(
     return results
 
 
+EXPORT_FIELDNAMES = [
+    "role_title", "company", "location", "employment_type", "salary_range",
+    "source", "stage", "priority", "next_action", "next_action_due",
+    "created_at", "updated_at"
+]
+
+# Columns selected for streaming exports, in EXPORT_FIELDNAMES order
+EXPORT_COLUMNS = tuple(getattr(Application, name) for name in EXPORT_FIELDNAMES)
+
+# Size (in characters) at which buffered CSV output is flushed to the client
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def format_export_row(row: Sequence[Any]) -> List[str]:
+    """Convert a tuple of EXPORT_COLUMNS values to CSV cell values."""
+    (role_title, company, location, employment_type, salary_range, source,
+     stage, priority, next_action, next_action_due, created_at, updated_at) = row
+    return [
+        role_title,
+        company,
+        location or "",
+        employment_type.value if employment_type else "",
+        salary_range or "",
+        source.value if source else "",
+        stage.value if stage else "",
+        priority.value if priority else "",
+        next_action or "",
+        next_action_due.isoformat() if next_action_due else "",
+        created_at.isoformat() if created_at else "",
+        updated_at.isoformat() if updated_at else ""
+    ]
+
+
+def iter_applications_csv(
+    rows: Iterable[Sequence[Any]], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[str]:
+    """Stream CSV output for rows of EXPORT_COLUMNS, flushing in chunks."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(EXPORT_FIELDNAMES)
+    
+    for row in rows:
+        writer.writerow(format_export_row(row))
+        if output.tell() >= chunk_size:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    
+    remaining = output.getvalue()
+    if remaining:
+        yield remaining
+
+
 def export_applications_to_csv(applications: List[Application]) -> str:
     """Export applications to CSV format."""
     output = io.StringIO()
     
-    fieldnames = [
-        "role_title", "company", "location", "employment_type", "salary_range",
-        "source", "stage", "priority", "next_action", "next_action_due",
-        "created_at", "updated_at"
-    ]
-    
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
+    writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDNAMES)
     writer.writeheader()
     
     for app in applications:
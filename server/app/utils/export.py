@@ -0,0 +1,266 @@
+import csv
+import enum
+import io
+import json
+import uuid
+import zipfile
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, Enum, Integer, JSON, Select, select
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models.application import Application
+from ..models.note import Note
+from ..models.timeline_event import TimelineEvent
+from .compression import COMPRESSION_SUFFIXES, compress_stream
+from .csv_io import EXPORT_CHUNK_SIZE, EXPORT_COLUMNS, iter_applications_csv
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+
+# Tables that can be exported, keyed by the name used in the API
+EXPORT_TABLES = {
+    "applications": Application,
+    "timeline_events": TimelineEvent,
+    "notes": Note,
+}
+
+FORMAT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Rows per Parquet row group, which is also the unit of streaming for Parquet
+EXPORT_ROW_GROUP_SIZE = 50000
+
+
+class _ChunkSink:
+    """Write-only file object that buffers output until drained."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def size(self) -> int:
+        return len(self._buffer)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def check_export_dependencies(export_format: str, compression: Optional[str]):
+    """Raise RuntimeError if the libraries needed for an export are missing."""
+    if export_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Parquet export requires the pyarrow package")
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise RuntimeError("zstd compression requires the zstandard package")
+
+
+def build_export_query(table: str, application_filters: List[ColumnElement], export_format: str) -> Select:
+    """Build the select for one exported table, scoped to the filtered applications."""
+    if table == "applications":
+        # Keep the CSV layout import-compatible; other formats carry every column
+        columns = EXPORT_COLUMNS if export_format == "csv" else Application.__table__.columns
+        return select(*columns).where(*application_filters)
+
+    model = EXPORT_TABLES[table]
+    application_ids = select(Application.id).where(*application_filters)
+    return select(*model.__table__.columns).where(model.application_id.in_(application_ids))
+
+
+def export_column_names(table: str, export_format: str) -> List[str]:
+    """Names of the columns produced by build_export_query."""
+    if table == "applications" and export_format == "csv":
+        return [column.key for column in EXPORT_COLUMNS]
+    return [column.name for column in EXPORT_TABLES[table].__table__.columns]
+
+
+def _plain_value(value: Any) -> Any:
+    """Convert a column value to a JSON-compatible value."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_ndjson(rows: Iterable[Sequence[Any]], fieldnames: List[str]) -> Iterator[str]:
+    """Stream rows as newline-delimited JSON objects, flushing in chunks."""
+    buffer = []
+    size = 0
+
+    for row in rows:
+        line = json.dumps(
+            dict(zip(fieldnames, map(_plain_value, row))), separators=(",", ":")
+        ) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_csv(rows: Iterable[Sequence[Any]], fieldnames: List[str]) -> Iterator[str]:
+    """Stream rows as generic CSV, flushing in chunks."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(fieldnames)
+
+    for row in rows:
+        writer.writerow([
+            "" if value is None
+            else json.dumps(value) if isinstance(value, (dict, list))
+            else _plain_value(value)
+            for value in row
+        ])
+        if output.tell() >= EXPORT_CHUNK_SIZE:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+    remaining = output.getvalue()
+    if remaining:
+        yield remaining
+
+
+def _arrow_column(pa, column) -> Tuple[Any, Callable[[Any], Any]]:
+    """Map a table column to an Arrow type and a value converter."""
+    column_type = column.type
+    if isinstance(column_type, Enum):
+        return pa.dictionary(pa.int32(), pa.string()), _plain_value
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column_type.timezone else None), None
+    if isinstance(column_type, Date):
+        return pa.date32(), None
+    if isinstance(column_type, Boolean):
+        return pa.bool_(), None
+    if isinstance(column_type, Integer):
+        return pa.int64(), None
+    if isinstance(column_type, JSON):
+        return pa.string(), lambda value: None if value is None else json.dumps(value)
+    # Strings and UUIDs
+    return pa.string(), lambda value: None if value is None else str(value)
+
+
+def iter_parquet(
+    rows: Iterable[Sequence[Any]],
+    columns: Sequence[Any],
+    compression: Optional[str] = None,
+    row_group_size: int = EXPORT_ROW_GROUP_SIZE,
+) -> Iterator[bytes]:
+    """Stream rows as a Parquet file, one row group at a time."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_columns = [_arrow_column(pa, column) for column in columns]
+    schema = pa.schema([
+        (column.name, arrow_type) for column, (arrow_type, _) in zip(columns, arrow_columns)
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=compression or "none")
+
+    def write_row_group(batch):
+        arrays = []
+        for values, (arrow_type, convert) in zip(zip(*batch), arrow_columns):
+            if convert is not None:
+                values = [convert(value) for value in values]
+            arrays.append(pa.array(values, type=arrow_type))
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= row_group_size:
+            write_row_group(batch)
+            batch = []
+            yield sink.drain()
+
+    if batch:
+        write_row_group(batch)
+    writer.close()
+    yield sink.drain()
+
+
+def iter_table_export(
+    rows: Iterable[Sequence[Any]],
+    table: str,
+    export_format: str,
+    compression: Optional[str] = None,
+) -> Iterator[bytes]:
+    """Stream one exported table in the requested format and compression."""
+    if export_format == "parquet":
+        # Parquet compresses column chunks itself
+        columns = export_columns(table)
+        return iter_parquet(rows, columns, compression)
+
+    fieldnames = export_column_names(table, export_format)
+    if export_format == "ndjson":
+        chunks = iter_ndjson(rows, fieldnames)
+    elif table == "applications":
+        chunks = iter_applications_csv(rows)
+    else:
+        chunks = iter_csv(rows, fieldnames)
+    return compress_stream(chunks, compression)
+
+
+def export_columns(table: str) -> List[Any]:
+    """Table columns exported in non-CSV formats."""
+    return list(EXPORT_TABLES[table].__table__.columns)
+
+
+def export_filename(table: str, export_format: str, compression: Optional[str] = None) -> str:
+    """Archive member name for an exported table."""
+    filename = f"{table}.{export_format}"
+    if compression and export_format != "parquet":
+        filename += COMPRESSION_SUFFIXES[compression]
+    return filename
+
+
+def iter_zip(members: Iterable[Tuple[str, Iterable[bytes]]], deflate: bool = False) -> Iterator[bytes]:
+    """Stream a ZIP archive whose members are themselves streams of bytes."""
+    sink = _ChunkSink()
+    compression = zipfile.ZIP_DEFLATED if deflate else zipfile.ZIP_STORED
+
+    # The sink cannot seek, so zipfile writes sizes in data descriptors
+    with zipfile.ZipFile(sink, "w", compression=compression) as archive:
+        for name, chunks in members:
+            with archive.open(name, "w", force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk)
+                    if sink.size >= EXPORT_CHUNK_SIZE:
+                        yield sink.drain()
+            yield sink.drain()
+
+    yield sink.drain()
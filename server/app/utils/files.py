@@ -0,0 +1,192 @@
+"""Attachment storage on disk: streamed uploads and ranged downloads."""
+import os
+import uuid
+from typing import AsyncIterator, Optional, Tuple
+
+import anyio
+from starlette.responses import FileResponse
+
+# Bytes gathered from the request before each write, so a thread hop is not paid per network chunk
+WRITE_BUFFER_SIZE = 256 * 1024
+
+# Suffix of uploads still being written
+TEMP_SUFFIX = ".part"
+
+
+class FileTooLarge(Exception):
+    """The upload exceeded the size limit; nothing was stored."""
+
+
+def _write_all(handle, data: bytes, digest=None):
+    handle.write(data)
+    if digest is not None:
+        digest.update(data)
+
+
+def _finish(handle):
+    handle.flush()
+    os.fsync(handle.fileno())
+    handle.close()
+
+
+def _discard(handle, temp_path: str):
+    handle.close()
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def move_into_place(temp_path: str, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(temp_path, path)
+
+
+async def stream_to_temp(
+    chunks: AsyncIterator[bytes], max_bytes: int, temp_dir: str, digest=None
+) -> Tuple[str, int]:
+    """Write a stream of chunks to a new file in temp_dir and return its (path, size).
+
+    The file is fsynced and closed; the caller moves it into place. digest, a
+    hashlib object, is fed the data as it is written, off the event loop.
+    FileTooLarge is raised as soon as more than max_bytes arrive.
+    """
+    os.makedirs(temp_dir, exist_ok=True)
+    temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}{TEMP_SUFFIX}")
+    handle = await anyio.to_thread.run_sync(open, temp_path, "wb")
+    size = 0
+    buffer = bytearray()
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise FileTooLarge(f"Upload exceeds {max_bytes} bytes")
+            buffer += chunk
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                await anyio.to_thread.run_sync(_write_all, handle, bytes(buffer), digest)
+                buffer.clear()
+        if buffer:
+            await anyio.to_thread.run_sync(_write_all, handle, bytes(buffer), digest)
+        await anyio.to_thread.run_sync(_finish, handle)
+    except BaseException:
+        await anyio.to_thread.run_sync(_discard, handle, temp_path)
+        raise
+    return temp_path, size
+
+
+async def save_stream(chunks: AsyncIterator[bytes], path: str, max_bytes: int, temp_dir: str) -> int:
+    """Write a stream of chunks to path and return its size.
+
+    Data goes to a temporary file in temp_dir (on the same filesystem as path)
+    that is renamed into place once complete, so readers never see a partial
+    file. FileTooLarge is raised as soon as more than max_bytes arrive.
+    """
+    temp_path, size = await stream_to_temp(chunks, max_bytes, temp_dir)
+    await anyio.to_thread.run_sync(move_into_place, temp_path, path)
+    return size
+
+
+def remove_file(path: str):
+    """Delete a stored file; missing files are ignored."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single `bytes=` range, or None to send the whole file.
+
+    Malformed and multi-range headers are ignored, as RFC 9110 allows.
+    ValueError means the range cannot be satisfied (416).
+    """
+    unit, _, spec = header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or not dash or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        # Suffix range: the final N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - int(last)), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError("Range starts past the end of the file")
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(FileResponse):
+    """FileResponse that answers `Range` requests with 206 Partial Content.
+
+    `If-Range` is honoured against the ETag and Last-Modified headers. The body
+    goes through the ASGI zero-copy send extension (sendfile) when the server
+    offers it, and is read in chunks otherwise.
+    """
+
+    def __init__(self, path: str, range_header: Optional[str] = None, if_range: Optional[str] = None, **kwargs):
+        super().__init__(path, **kwargs)
+        self.range_header = range_header
+        self.if_range = if_range
+
+    async def __call__(self, scope, receive, send):
+        if self.stat_result is None:
+            self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            self.set_stat_headers(self.stat_result)
+        size = self.stat_result.st_size
+        self.headers["accept-ranges"] = "bytes"
+
+        start, end = 0, size - 1
+        if self.range_header and self._range_applies():
+            try:
+                requested = parse_range(self.range_header, size)
+            except ValueError:
+                self.status_code = 416
+                self.headers["content-range"] = f"bytes */{size}"
+                self.headers["content-length"] = "0"
+                await send({"type": "http.response.start", "status": 416, "headers": self.raw_headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            if requested is not None:
+                start, end = requested
+                self.status_code = 206
+                self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+                self.headers["content-length"] = str(end - start + 1)
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        count = end - start + 1
+        if self.send_header_only or count <= 0:
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": start,
+                    "count": count,
+                })
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = count
+                while remaining:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining:
+                    await send({"type": "http.response.body", "body": b""})
+        if self.background is not None:
+            await self.background()
+
+    def _range_applies(self) -> bool:
+        if not self.if_range:
+            return True
+        return self.if_range in (self.headers.get("etag"), self.headers.get("last-modified"))
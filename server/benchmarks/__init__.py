@@ -0,0 +1,7 @@
+# Benchmarks package
+#
+# Benchmarks run against a local SQLite database unless DATABASE_URL is set,
+# so this must happen before any app module builds its engine.
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
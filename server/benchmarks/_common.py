@@ -0,0 +1,136 @@
+import json
+import random
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.user import User
+from app.models.application import (
+    Application, ApplicationStage, ApplicationPriority, ApplicationSource
+)
+
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka"]
+ROLES = ["Backend Engineer", "Data Scientist", "SRE", "Product Manager", "Frontend Engineer"]
+ACTIONS = ["Follow up with recruiter", "Send thank-you note", "Prepare for interview", ""]
+
+
+def make_engine(url: str = "sqlite://") -> Engine:
+    """Create an engine with the schema in place."""
+    if url == "sqlite://":
+        # Share one in-memory database across threads
+        engine = create_engine(
+            url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+    else:
+        engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def seed_users(
+    engine: Engine,
+    user_count: int,
+    apps_per_user: int,
+    due_ratio: float = 0.3,
+    seed: int = 42,
+    batch_size: int = 10000,
+) -> List[uuid.UUID]:
+    """Bulk-insert users with applications, a share of which have due actions."""
+    rng = random.Random(seed)
+    today = date.today()
+    now = datetime.now(timezone.utc)
+    user_ids = []
+
+    with engine.begin() as conn:
+        users = []
+        for i in range(user_count):
+            user_id = uuid.UUID(int=rng.getrandbits(128))
+            user_ids.append(user_id)
+            users.append({
+                "id": user_id,
+                "name": f"User {i}",
+                "email": f"user{i}@example{i % 50}.com",
+                "password_hash": "x",
+                "reminder_time": "07:30",
+                "email_reminders_enabled": True,
+            })
+            if len(users) >= batch_size:
+                conn.execute(insert(User), users)
+                users = []
+        if users:
+            conn.execute(insert(User), users)
+
+        apps = []
+        for user_id in user_ids:
+            for _ in range(apps_per_user):
+                due = rng.random() < due_ratio
+                apps.append({
+                    "id": uuid.UUID(int=rng.getrandbits(128)),
+                    "user_id": user_id,
+                    "role_title": rng.choice(ROLES),
+                    "company": rng.choice(COMPANIES),
+                    "location": "Remote",
+                    "source": rng.choice(list(ApplicationSource)),
+                    "stage": rng.choice(list(ApplicationStage)),
+                    "priority": rng.choice(list(ApplicationPriority)),
+                    "next_action": rng.choice(ACTIONS[:-1]) if due else rng.choice(ACTIONS),
+                    "next_action_due": today - timedelta(days=rng.randint(0, 10)) if due
+                    else today + timedelta(days=rng.randint(1, 30)),
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                if len(apps) >= batch_size:
+                    conn.execute(insert(Application), apps)
+                    apps = []
+        if apps:
+            conn.execute(insert(Application), apps)
+
+    return user_ids
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[Dict[str, int]]:
+    """Count statements executed on an engine inside the block."""
+    counter = {"queries": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def timer() -> Iterator[Dict[str, float]]:
+    """Measure wall-clock time of the block in seconds."""
+    result = {"seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def report(name: str, results: Dict[str, Any]):
+    """Print benchmark results as one JSON line."""
+    print(json.dumps({"benchmark": name, **results}, default=str))
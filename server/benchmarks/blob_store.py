@@ -0,0 +1,121 @@
+"""Storage saved and upload throughput of the content-addressed blob store.
+
+Simulates users who attach the same resume to most of their applications,
+plus a share of unique files, and uploads them concurrently twice: once with
+one copy per attachment (the previous layout, save_stream) and once through
+the blob store (SHA-256 while streaming, one copy per distinct content).
+Reports bytes on disk, the share saved and uploads/MB per second:
+
+    python -m benchmarks.blob_store --users 50 --files-per-user 40 --unique-ratio 0.1
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from typing import AsyncIterator, List
+
+import anyio
+
+from app.core.config import settings
+from app.services.blobs import store_blob
+from app.utils.files import save_stream
+
+from ._common import report
+
+SEED = 42
+# Network chunk size a server hands to the upload stream
+CHUNK_SIZE = 64 * 1024
+
+
+def build_uploads(users: int, files_per_user: int, unique_ratio: float, size_kb: int) -> List[bytes]:
+    """Each user's resume repeated across their applications, with unique files mixed in."""
+    rng = random.Random(SEED)
+    uploads = []
+    for _ in range(users):
+        resume = rng.randbytes(size_kb * 1024)
+        for _ in range(files_per_user):
+            if rng.random() < unique_ratio:
+                uploads.append(rng.randbytes(size_kb * 1024))
+            else:
+                uploads.append(resume)
+    rng.shuffle(uploads)
+    return uploads
+
+
+async def chunked(data: bytes) -> AsyncIterator[bytes]:
+    for offset in range(0, len(data), CHUNK_SIZE):
+        yield data[offset:offset + CHUNK_SIZE]
+
+
+def disk_usage(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(path)
+        for name in names
+    )
+
+
+async def run_uploads(uploads: List[bytes], concurrency: int, upload) -> float:
+    """Upload everything with at most `concurrency` uploads in flight; returns seconds taken."""
+    limiter = anyio.CapacityLimiter(concurrency)
+
+    async def one(data: bytes):
+        async with limiter:
+            await upload(data)
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tasks:
+        for data in uploads:
+            tasks.start_soon(one, data)
+    return time.perf_counter() - start
+
+
+def measure(name: str, uploads: List[bytes], concurrency: int, upload_dir: str, upload):
+    settings.UPLOAD_DIR = upload_dir
+    seconds = anyio.run(run_uploads, uploads, concurrency, upload)
+    logical = sum(len(data) for data in uploads)
+    stored = disk_usage(upload_dir)
+    report("blob_store", {
+        "layout": name,
+        "uploads": len(uploads),
+        "logical_mb": round(logical / 1_000_000, 1),
+        "stored_mb": round(stored / 1_000_000, 1),
+        "saved_pct": round((1 - stored / logical) * 100, 1),
+        "uploads_per_s": round(len(uploads) / seconds, 1),
+        "mb_per_s": round(logical / seconds / 1_000_000, 1),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--files-per-user", type=int, default=40)
+    parser.add_argument("--unique-ratio", type=float, default=0.1, help="Share of uploads with unique content")
+    parser.add_argument("--size-kb", type=int, default=200, help="Size of each file")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--dir", help="Directory for the stores (default: a temporary directory)")
+    args = parser.parse_args()
+
+    uploads = build_uploads(args.users, args.files_per_user, args.unique_ratio, args.size_kb)
+    root = tempfile.mkdtemp(prefix="blob-store-", dir=args.dir)
+    try:
+        per_file_dir = os.path.join(root, "per_file")
+
+        async def per_file(data: bytes):
+            path = os.path.join(per_file_dir, uuid.uuid4().hex)
+            await save_stream(chunked(data), path, len(data), os.path.join(per_file_dir, ".tmp"))
+
+        async def content_addressed(data: bytes):
+            await store_blob(chunked(data), len(data))
+
+        measure("per_file", uploads, args.concurrency, per_file_dir, per_file)
+        measure("content_addressed", uploads, args.concurrency, os.path.join(root, "blobs"), content_addressed)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""CPU cost versus bytes saved for response compression codecs and levels.
+
+Compresses representative payloads (an ApplicationList page, a timeline, a
+CSV export) with every available codec at several levels, timing the best of
+--repeat runs. `net_ms_saved` weighs compression time against the transfer
+time saved on a link of --bandwidth-mbps, so the break-even level for slow
+mobile clients is visible:
+
+    python -m benchmarks.compression --bandwidth-mbps 5
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from app.models.timeline_event import TimelineEventType
+from app.schemas.application import ApplicationList
+from app.schemas.timeline import TimelineEventList
+from app.utils.compression import codec_available, create_compressor
+from app.utils.csv_io import export_applications_to_csv
+
+from ._common import report
+from .micro import SEED, make_applications
+
+LEVELS = {
+    "gzip": (1, 6, 9),
+    "br": (1, 4, 6, 11),
+    "zstd": (1, 3, 9, 19),
+}
+
+
+def application_page(page_size: int) -> bytes:
+    page = ApplicationList.model_validate({
+        "applications": make_applications(page_size),
+        "total": 1000,
+        "page": 1,
+        "page_size": page_size,
+        "total_pages": 1000 // page_size,
+    }, from_attributes=True)
+    return page.model_dump_json().encode()
+
+
+def timeline(events: int) -> bytes:
+    rng = random.Random(SEED)
+    application_id = uuid.UUID(int=rng.getrandbits(128))
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    types = list(TimelineEventType)
+    return TimelineEventList.model_validate({
+        "events": [
+            {
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "application_id": application_id,
+                "type": rng.choice(types).value,
+                "payload": {"from": "applied", "to": "interview", "note": "Recruiter call scheduled"},
+                "created_at": now - timedelta(hours=i * 7),
+            }
+            for i in range(events)
+        ],
+        "total": events,
+    }).model_dump_json().encode()
+
+
+def build_payloads() -> Dict[str, bytes]:
+    return {
+        "applications_page_20": application_page(20),
+        "applications_page_100": application_page(100),
+        "timeline_200": timeline(200),
+        "csv_export_5000": export_applications_to_csv(make_applications(5000)).encode(),
+    }
+
+
+def compress_seconds(codec: str, level: int, data: bytes, repeat: int) -> Tuple[float, int]:
+    """Best compression time in seconds and the compressed size."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressor = create_compressor(codec, level)
+        output = compressor.compress(data) + compressor.flush()
+        best = min(best, time.perf_counter() - start)
+        size = len(output)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--bandwidth-mbps", type=float, default=5.0, help="Client link speed for net_ms_saved")
+    args = parser.parse_args()
+
+    bytes_per_ms = args.bandwidth_mbps * 1_000_000 / 8 / 1000
+    skipped: List[str] = [codec for codec in LEVELS if not codec_available(codec)]
+
+    for payload_name, data in build_payloads().items():
+        for codec, levels in LEVELS.items():
+            if codec in skipped:
+                continue
+            for level in levels:
+                seconds, size = compress_seconds(codec, level, data, args.repeat)
+                compress_ms = seconds * 1000
+                transfer_ms_saved = (len(data) - size) / bytes_per_ms
+                report("compression", {
+                    "payload": payload_name,
+                    "codec": codec,
+                    "level": level,
+                    "bytes": len(data),
+                    "compressed_bytes": size,
+                    "ratio": round(len(data) / size, 2),
+                    "saved_pct": round((1 - size / len(data)) * 100, 1),
+                    "compress_ms": round(compress_ms, 3),
+                    "mb_per_s": round(len(data) / seconds / 1_000_000, 1),
+                    "net_ms_saved": round(transfer_ms_saved - compress_ms, 2),
+                })
+
+    if skipped:
+        report("compression", {"skipped_codecs": skipped})
+
+
+if __name__ == "__main__":
+    main()
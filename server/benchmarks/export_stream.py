@@ -0,0 +1,97 @@
+"""Time-to-first-byte and peak RSS of the CSV export.
+
+Compares the streaming export endpoint with the previous approach of loading
+every application and building the whole file in memory. Each mode runs in
+its own process so peak RSS figures do not leak between them.
+
+    python -m benchmarks.export_stream --rows 1000000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.csv import export_response
+from app.models.application import Application
+from app.models.user import User
+from app.utils.csv_io import export_applications_to_csv
+
+from ._common import make_engine, peak_rss_mb, report, seed_users
+
+
+async def _drain(body_iterator):
+    """Consume a streaming body, returning (ttfb, total_seconds, bytes)."""
+    start = time.perf_counter()
+    ttfb = None
+    size = 0
+    async for chunk in body_iterator:
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+        size += len(chunk)
+    return ttfb, time.perf_counter() - start, size
+
+
+def run_mode(db_url: str, mode: str, gzip: bool):
+    engine = make_engine(db_url)
+    db = sessionmaker(bind=engine)()
+    user = db.query(User).first()
+    baseline_rss = peak_rss_mb()
+
+    if mode == "stream":
+        start = time.perf_counter()
+        response = export_response(db, user, compression="gzip" if gzip else None)
+        setup = time.perf_counter() - start
+        ttfb, total, size = asyncio.run(_drain(response.body_iterator))
+        ttfb += setup
+        total += setup
+    else:
+        start = time.perf_counter()
+        applications = db.query(Application).filter(Application.user_id == user.id).all()
+        content = export_applications_to_csv(applications).encode("utf-8")
+        total = ttfb = time.perf_counter() - start
+        size = len(content)
+
+    db.close()
+    report("export_stream", {
+        "mode": mode,
+        "gzip": gzip,
+        "ttfb_ms": round(ttfb * 1000, 1),
+        "total_s": round(total, 2),
+        "bytes": size,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - baseline_rss, 1),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["stream", "buffered"])
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--db-url", help="Existing seeded database to use")
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.db_url, args.mode, args.gzip)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = args.db_url or f"sqlite:///{os.path.join(tmp, 'export.db')}"
+        if not args.db_url:
+            seed_users(make_engine(db_url), user_count=1, apps_per_user=args.rows)
+
+        for mode in ("buffered", "stream"):
+            cmd = [sys.executable, "-m", "benchmarks.export_stream",
+                   "--mode", mode, "--db-url", db_url]
+            if args.gzip:
+                cmd.append("--gzip")
+            subprocess.run(cmd, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Cold-start cost of the API: importing app.main and building the app.
+
+Runs a fresh interpreter per sample with `-X importtime`, so nothing is
+cached in-process, and reports the best of several runs: time to import
+app.main, time for create_app(), the whole process, and the packages with the
+largest share of import time. Fails (exit 1) when create_app takes longer
+than --budget-ms or loads a module that should stay deferred until used
+(scheduler, mail rendering, database driver, export utilities).
+
+    python -m benchmarks.import_time --runs 5 --budget-ms 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from ._common import report
+
+# Loaded on first use only; an API worker importing any of these at startup is a regression
+DEFERRED_MODULES = (
+    "apscheduler",
+    "jinja2",
+    "psycopg",
+    "psycopg2",
+    "email.mime.multipart",
+    "app.tasks.scheduler",
+    "app.services.outbox",
+    "app.utils.export",
+    "app.utils.csv_io",
+)
+
+CHILD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+app.main.create_app()
+built = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (built - imported) * 1000,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Self time in microseconds per top-level package from `-X importtime` output."""
+    self_us: Dict[str, int] = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        package = "app." + name.split(".")[1] if name.startswith("app.") else name.split(".")[0]
+        self_us[package] += int(own)
+    return self_us
+
+
+def run_once(env: Dict[str, str]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_ms"] = process_ms
+    sample["packages"] = parse_importtime(result.stderr)
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Max import + create_app time")
+    parser.add_argument("--top", type=int, default=10, help="Packages listed by import time")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    samples: List[Dict[str, Any]] = [run_once(env) for _ in range(args.runs)]
+    best = min(samples, key=lambda sample: sample["import_ms"] + sample["create_app_ms"])
+
+    startup_ms = best["import_ms"] + best["create_app_ms"]
+    packages = sorted(best["packages"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    loaded = set(best["modules"])
+    deferred_loaded = [name for name in DEFERRED_MODULES if name in loaded]
+
+    report("import_time", {
+        "runs": args.runs,
+        "import_ms": round(best["import_ms"], 1),
+        "create_app_ms": round(best["create_app_ms"], 1),
+        "startup_ms": round(startup_ms, 1),
+        "process_ms": round(best["process_ms"], 1),
+        "modules": len(loaded),
+        "top_packages_ms": {name: round(us / 1000, 1) for name, us in packages},
+        "deferred_loaded": deferred_loaded,
+        "budget_ms": args.budget_ms,
+    })
+
+    failures = []
+    if startup_ms > args.budget_ms:
+        failures.append(f"startup took {startup_ms:.0f}ms, budget {args.budget_ms:.0f}ms")
+    if deferred_loaded:
+        failures.append(f"loaded at startup: {', '.join(deferred_loaded)}")
+    if failures:
+        print("FAIL: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
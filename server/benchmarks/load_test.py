@@ -0,0 +1,373 @@
+"""HTTP load test of the API with per-route latency percentiles.
+
+Virtual users log in through /api/v1/auth/login as seeded accounts (see
+`python -m app.tools.seed`) and issue a weighted mix of list, search,
+dashboard, stage-change, note-create and export requests for a fixed
+duration. Results are written as JSON with p50/p95/p99 latency, a latency
+histogram and throughput for each route template.
+
+    python -m app.tools.seed --users 2000 --database-url postgresql+psycopg://... --create-schema
+    python -m benchmarks.load_test run --base-url http://127.0.0.1:8000 --vus 50 --duration 60 \\
+        --mix list=40,search=20,dashboard=15,stage=10,note=10,export=5 --output before.json
+    python -m benchmarks.load_test compare before.json after.json --threshold 0.1
+
+`run --serve` starts uvicorn on --base-url's port (with --database-url)
+instead of targeting a server that is already running.
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+DEFAULT_MIX = "list=40,search=20,dashboard=15,stage=10,note=10,export=5"
+
+# Upper bounds (ms) of the reported latency histogram buckets
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+SEARCH_TERMS = ["Acme", "Glo", "Ini", "Hooli", "Engineer", "Data", "Manager", "Wonka"]
+STAGES = ["Applied", "Interview", "Offer", "Rejected"]
+
+
+class RouteStats:
+    """Latencies and outcomes for one route template."""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+        self.bytes = 0
+
+    def record(self, latency_ms: float, ok: bool, size: int):
+        self.latencies_ms.append(latency_ms)
+        self.bytes += size
+        if not ok:
+            self.errors += 1
+
+    @staticmethod
+    def percentile(ordered: List[float], fraction: float) -> float:
+        """Nearest-rank percentile of pre-sorted values."""
+        if not ordered:
+            return 0.0
+        index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+        return ordered[index]
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies_ms)
+        histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        for value in ordered:
+            histogram[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, value)] += 1
+        return {
+            "count": len(ordered),
+            "errors": self.errors,
+            "rps": round(len(ordered) / duration, 2) if duration else 0.0,
+            "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "p50_ms": round(self.percentile(ordered, 0.50), 2),
+            "p95_ms": round(self.percentile(ordered, 0.95), 2),
+            "p99_ms": round(self.percentile(ordered, 0.99), 2),
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+            "bytes": self.bytes,
+            "histogram_ms": {
+                **{f"le_{bound}": count for bound, count in zip(HISTOGRAM_BOUNDS_MS, histogram)},
+                "le_inf": histogram[-1],
+            },
+        }
+
+
+class VirtualUser:
+    """One logged-in client issuing a weighted mix of requests."""
+
+    def __init__(self, client: httpx.AsyncClient, email: str, password: str, stats: Dict[str, RouteStats]):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.stats = stats
+        self.headers: Dict[str, str] = {}
+        self.application_ids: List[str] = []
+        self.recording = False
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request, re-authenticating once if the access token expired."""
+        for attempt in range(2):
+            start = time.perf_counter()
+            try:
+                async with self.client.stream(method, url, headers=self.headers, **kwargs) as response:
+                    body = await response.aread()
+            except httpx.HTTPError:
+                if self.recording:
+                    self.stats.setdefault(route, RouteStats()).record(
+                        (time.perf_counter() - start) * 1000, False, 0
+                    )
+                return None
+            latency_ms = (time.perf_counter() - start) * 1000
+
+            if response.status_code == 401 and attempt == 0 and route != "POST /auth/login":
+                await self.login()
+                continue
+            if self.recording:
+                self.stats.setdefault(route, RouteStats()).record(latency_ms, response.status_code < 400, len(body))
+            return response
+        return None
+
+    async def login(self):
+        response = await self.request(
+            "POST /auth/login", "POST", "/api/v1/auth/login",
+            json={"email": self.email, "password": self.password}
+        )
+        if response is None or response.status_code != 200:
+            raise RuntimeError(f"Login failed for {self.email}")
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def list_applications(self, rng: random.Random):
+        response = await self.request(
+            "GET /applications", "GET", "/api/v1/applications",
+            params={"page": rng.randint(1, 3), "page_size": 20}
+        )
+        if response is not None and response.status_code == 200:
+            ids = [app["id"] for app in response.json()["applications"]]
+            if ids:
+                self.application_ids = ids
+
+    async def search(self, rng: random.Random):
+        await self.request(
+            "GET /applications?search", "GET", "/api/v1/applications",
+            params={"search": rng.choice(SEARCH_TERMS), "page_size": 20}
+        )
+
+    async def dashboard(self, rng: random.Random):
+        await self.request("GET /dashboard", "GET", "/api/v1/dashboard")
+
+    async def change_stage(self, rng: random.Random):
+        if not self.application_ids:
+            return await self.list_applications(rng)
+        await self.request(
+            "PATCH /applications/{application_id}/stage", "PATCH",
+            f"/api/v1/applications/{rng.choice(self.application_ids)}/stage",
+            json={"stage": rng.choice(STAGES)}
+        )
+
+    async def create_note(self, rng: random.Random):
+        if not self.application_ids:
+            return await self.list_applications(rng)
+        await self.request(
+            "POST /applications/{application_id}/notes", "POST",
+            f"/api/v1/applications/{rng.choice(self.application_ids)}/notes",
+            json={"content": f"Load test note {rng.random():.6f}"}
+        )
+
+    async def export(self, rng: random.Random):
+        await self.request("GET /csv/export", "GET", "/api/v1/csv/export")
+
+
+OPERATIONS = {
+    "list": VirtualUser.list_applications,
+    "search": VirtualUser.search,
+    "dashboard": VirtualUser.dashboard,
+    "stage": VirtualUser.change_stage,
+    "note": VirtualUser.create_note,
+    "export": VirtualUser.export,
+}
+
+
+def parse_mix(mix: str) -> Tuple[List[str], List[float]]:
+    names, weights = [], []
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+async def run_virtual_user(
+    vu: VirtualUser, names: List[str], weights: List[float], rng: random.Random,
+    warmup_until: float, stop_at: float, think_time: float
+):
+    await vu.login()
+    await vu.list_applications(rng)
+    while True:
+        now = time.perf_counter()
+        if now >= stop_at:
+            return
+        vu.recording = now >= warmup_until
+        operation = OPERATIONS[rng.choices(names, weights)[0]]
+        await operation(vu, rng)
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    names, weights = parse_mix(args.mix)
+    stats: Dict[str, RouteStats] = {}
+    limits = httpx.Limits(max_connections=args.vus, max_keepalive_connections=args.vus)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        warmup_until = start + args.warmup
+        stop_at = warmup_until + args.duration
+        tasks = []
+        for i in range(args.vus):
+            account = args.account_offset + i % args.accounts
+            vu = VirtualUser(
+                client,
+                args.email_template.format(i=account, domain=account % args.email_domains),
+                args.password,
+                stats
+            )
+            rng = random.Random(args.seed * 1_000_003 + i)
+            tasks.append(run_virtual_user(vu, names, weights, rng, warmup_until, stop_at, args.think_time))
+        await asyncio.gather(*tasks)
+        measured = time.perf_counter() - warmup_until
+
+    routes = {route: route_stats.summary(measured) for route, route_stats in sorted(stats.items())}
+    total = RouteStats()
+    for route_stats in stats.values():
+        total.latencies_ms.extend(route_stats.latencies_ms)
+        total.errors += route_stats.errors
+        total.bytes += route_stats.bytes
+
+    return {
+        "benchmark": "load_test",
+        "base_url": args.base_url,
+        "vus": args.vus,
+        "duration_s": round(measured, 2),
+        "mix": args.mix,
+        "seed": args.seed,
+        "total": total.summary(measured),
+        "routes": routes,
+    }
+
+
+def wait_for_server(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise SystemExit(f"Server at {base_url} did not become healthy")
+
+
+def start_server(args: argparse.Namespace) -> subprocess.Popen:
+    """Run uvicorn for the duration of the test."""
+    url = urlparse(args.base_url)
+    env = {**os.environ, "SCHEDULER_MODE": "disabled"}
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory",
+            "--host", url.hostname, "--port", str(url.port or 80),
+            "--workers", str(args.workers), "--no-access-log", "--log-level", "warning",
+        ],
+        env=env,
+    )
+    try:
+        wait_for_server(args.base_url)
+    except BaseException:
+        server.terminate()
+        raise
+    return server
+
+
+def run(args: argparse.Namespace):
+    server = start_server(args) if args.serve else None
+    try:
+        results = asyncio.run(run_load(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+def compare(args: argparse.Namespace):
+    """Print per-route changes between two runs; exit 1 on regressions."""
+    with open(args.baseline) as f:
+        before = json.load(f)
+    with open(args.candidate) as f:
+        after = json.load(f)
+
+    regressions = []
+    rows = []
+    for route in sorted(set(before["routes"]) | set(after["routes"])):
+        old, new = before["routes"].get(route), after["routes"].get(route)
+        if old is None or new is None:
+            rows.append({"route": route, "only_in": "baseline" if new is None else "candidate"})
+            continue
+        row = {"route": route}
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            row[metric] = [old[metric], new[metric]]
+            if old[metric]:
+                row[f"{metric}_change"] = round(new[metric] / old[metric] - 1, 3)
+        row["errors"] = [old["errors"], new["errors"]]
+        slower = row.get(f"{args.metric}_change", 0) > args.threshold
+        if slower or new["errors"] > old["errors"]:
+            row["regression"] = True
+            regressions.append(route)
+        rows.append(row)
+
+    for row in rows:
+        print(json.dumps(row))
+    if regressions:
+        print(
+            f"{len(regressions)} route(s) regressed ({args.metric} > +{args.threshold:.0%} or more errors): "
+            f"{', '.join(regressions)}",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Generate load and report latencies")
+    run_parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run_parser.add_argument("--vus", type=int, default=20, help="Concurrent virtual users")
+    run_parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before measuring")
+    run_parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, e.g. list=40,export=5")
+    run_parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between requests, seconds")
+    run_parser.add_argument("--timeout", type=float, default=60.0)
+    run_parser.add_argument("--accounts", type=int, default=100, help="Distinct seeded accounts to log in as")
+    run_parser.add_argument("--account-offset", type=int, default=1, help="First account (0 is the seed power user)")
+    run_parser.add_argument("--email-template", default="user{i}@seed{domain}.example.com")
+    run_parser.add_argument("--email-domains", type=int, default=50)
+    run_parser.add_argument("--password", default="password123")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--output", help="Also write the JSON report here")
+    run_parser.add_argument("--serve", action="store_true", help="Start uvicorn for the run")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --serve")
+    run_parser.add_argument("--database-url", help="DATABASE_URL for --serve")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two JSON reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms"])
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Per-request cost of the metrics middleware.
+
+Calls ASGI apps directly (no sockets), with and without MetricsMiddleware:
+a no-op app to isolate the middleware itself, and a FastAPI app with a
+parameterized route to show the cost relative to a realistic request.
+
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app.middleware.metrics import MetricsMiddleware
+
+from ._common import report
+
+
+def make_fastapi_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id, "name": "item"}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def drive(app, requests: int) -> float:
+    """Seconds per request when calling the ASGI app in a loop."""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/items/{i}",
+            "raw_path": f"/items/{i}".encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+            "server": ("127.0.0.1", 8000),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+async def run(requests: int, repeat: int):
+    cases = {
+        "noop": (noop_app, MetricsMiddleware(noop_app)),
+        "fastapi_route": (make_fastapi_app(False), make_fastapi_app(True)),
+    }
+    for name, (plain, instrumented) in cases.items():
+        # Warm up route caches and lazy initialization
+        await drive(plain, 100)
+        await drive(instrumented, 100)
+
+        baseline = min([await drive(plain, requests) for _ in range(repeat)])
+        with_metrics = min([await drive(instrumented, requests) for _ in range(repeat)])
+        report("metrics_overhead", {
+            "app": name,
+            "requests": requests,
+            "baseline_us": round(baseline * 1e6, 2),
+            "with_metrics_us": round(with_metrics * 1e6, 2),
+            "overhead_us": round((with_metrics - baseline) * 1e6, 2),
+            "overhead_pct": round((with_metrics / baseline - 1) * 100, 1),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
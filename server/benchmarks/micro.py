@@ -0,0 +1,287 @@
+"""Microbenchmarks for hot functions, compared against saved baselines.
+
+Each case runs on deterministic fixtures (SQLite in-memory, fixed seeds) and
+reports the best per-call time over several repeats. Results are compared
+with benchmarks/baselines/micro.json and the run fails if any case is slower
+than the baseline by more than --threshold.
+
+    python -m benchmarks.micro                 # compare with the baseline
+    python -m benchmarks.micro --save          # record a new baseline
+    python -m benchmarks.micro -k csv -k token # run matching cases only
+
+Baselines are machine-specific: record them on the machine that runs the
+comparison. A baseline recorded on another machine, Python or platform is
+not compared against (the run warns instead) unless --ignore-environment
+is given.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token, verify_token
+from app.models.application import (
+    Application, ApplicationStage, ApplicationPriority, ApplicationSource, EmploymentType
+)
+from app.models.user import User
+from app.schemas.application import ApplicationList
+from app.services.email import EmailService
+from app.services.reminders import get_reminder_items_for_user
+from app.utils.csv_io import (
+    EXPORT_FIELDNAMES, export_applications_to_csv, import_applications_from_csv, validate_csv_row
+)
+
+from ._common import COMPANIES, ROLES, ACTIONS, make_engine, report, seed_users
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+
+SEED = 1234
+
+
+def make_applications(count: int, seed: int = SEED) -> List[Application]:
+    """Transient Application objects with every exported field populated."""
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    user_id = uuid.UUID(int=rng.getrandbits(128))
+    return [
+        Application(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            user_id=user_id,
+            role_title=rng.choice(ROLES),
+            company=rng.choice(COMPANIES),
+            location="Remote",
+            employment_type=rng.choice(list(EmploymentType)),
+            salary_range="100k-150k",
+            source=rng.choice(list(ApplicationSource)),
+            stage=rng.choice(list(ApplicationStage)),
+            priority=rng.choice(list(ApplicationPriority)),
+            next_action=rng.choice(ACTIONS) or None,
+            next_action_due=date(2024, 1, 1) + timedelta(days=rng.randint(0, 60)),
+            created_at=now - timedelta(days=rng.randint(0, 365)),
+            updated_at=now,
+        )
+        for _ in range(count)
+    ]
+
+
+def make_csv(rows: int, seed: int = SEED) -> str:
+    """Import CSV content in the export column layout."""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDNAMES)
+    writer.writeheader()
+    for app in make_applications(rows, seed):
+        writer.writerow({
+            "role_title": app.role_title,
+            "company": app.company,
+            "location": app.location,
+            "employment_type": app.employment_type.value,
+            "salary_range": app.salary_range,
+            "source": app.source.value,
+            "stage": app.stage.value,
+            "priority": app.priority.value,
+            "next_action": app.next_action or "",
+            "next_action_due": app.next_action_due.strftime("%m/%d/%Y"),
+            "created_at": app.created_at.isoformat(),
+            "updated_at": app.updated_at.isoformat(),
+        })
+    return output.getvalue()
+
+
+def application_list_case(page_size: int) -> Callable[[], Any]:
+    applications = make_applications(page_size)
+
+    def serialize():
+        page = ApplicationList.model_validate({
+            "applications": applications,
+            "total": 1000,
+            "page": 1,
+            "page_size": page_size,
+            "total_pages": 1000 // page_size,
+        }, from_attributes=True)
+        return page.model_dump_json()
+
+    return serialize
+
+
+def reminder_items_case() -> Callable[[], Any]:
+    engine = make_engine("sqlite://")
+    user_ids = seed_users(engine, user_count=200, apps_per_user=20, seed=SEED)
+    db = sessionmaker(bind=engine)()
+    user = db.get(User, user_ids[0])
+    return lambda: get_reminder_items_for_user(db, user)
+
+
+def render_case() -> Callable[[], Any]:
+    service = EmailService()
+    today = date(2024, 1, 15)
+    items = [
+        {
+            "id": str(app.id),
+            "company": app.company,
+            "role_title": app.role_title,
+            "next_action": app.next_action or "Follow up",
+            "next_action_due": app.next_action_due.isoformat(),
+            "is_overdue": app.next_action_due < today,
+        }
+        for app in make_applications(5)
+    ]
+    return lambda: service.render_daily_reminders("User 0", items)
+
+
+def build_cases() -> Dict[str, Callable[[], Callable[[], Any]]]:
+    """Case name -> factory returning the function to time (setup excluded)."""
+    token = create_access_token({"sub": str(uuid.UUID(int=SEED))})
+    csv_row = next(csv.DictReader(io.StringIO(make_csv(1))))
+    csv_1000 = make_csv(1000)
+    applications_1000 = make_applications(1000)
+    user_id = uuid.UUID(int=SEED)
+
+    return {
+        "csv.validate_csv_row": lambda: (lambda: validate_csv_row(csv_row, 2)),
+        "csv.import_applications_from_csv[1000]": lambda: (
+            lambda: import_applications_from_csv(csv_1000, user_id)
+        ),
+        "csv.export_applications_to_csv[1000]": lambda: (
+            lambda: export_applications_to_csv(applications_1000)
+        ),
+        "security.create_access_token": lambda: (lambda: create_access_token({"sub": str(user_id)})),
+        "security.verify_token": lambda: (lambda: verify_token(token)),
+        "schemas.ApplicationList[20]": lambda: application_list_case(20),
+        "schemas.ApplicationList[100]": lambda: application_list_case(100),
+        "reminders.get_reminder_items_for_user": reminder_items_case,
+        "email.render_daily_reminders": render_case,
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Tuple[float, int]:
+    """Best seconds per call over `repeat` runs of an auto-calibrated loop."""
+    func()  # warm up caches and lazy imports
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best, number
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def environment() -> Dict[str, str]:
+    """What a baseline's timings depend on besides the code."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def environment_differences(baseline: Dict[str, Any]) -> List[str]:
+    """Descriptions of how this environment differs from the baseline's."""
+    return [
+        f"{key} {baseline.get(key)!r} != {value!r}"
+        for key, value in environment().items()
+        if baseline.get(key) != value
+    ]
+
+
+def save_baseline(path: str, results: Dict[str, float]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            **environment(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "results_us": {name: round(seconds * 1e6, 3) for name, seconds in results.items()},
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="patterns", action="append", default=[], help="Run cases containing this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing loop")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Write results as the new baseline")
+    parser.add_argument(
+        "--ignore-environment", action="store_true",
+        help="Compare even with a baseline recorded on another machine, Python or platform"
+    )
+    args = parser.parse_args()
+
+    baseline = None if args.save else load_baseline(args.baseline)
+    differences = environment_differences(baseline) if baseline else []
+    if differences and not args.ignore_environment:
+        print(
+            f"Not comparing with {args.baseline}, recorded in another environment "
+            f"({'; '.join(differences)}); run with --save to record a baseline here",
+            file=sys.stderr
+        )
+        baseline = None
+    baseline_us = (baseline or {}).get("results_us", {})
+
+    results: Dict[str, float] = {}
+    regressions = []
+    for name, factory in build_cases().items():
+        if args.patterns and not any(pattern in name for pattern in args.patterns):
+            continue
+        seconds, number = measure(factory(), args.repeat, args.min_time)
+        results[name] = seconds
+
+        entry = {"case": name, "us_per_call": round(seconds * 1e6, 3), "loops": number}
+        if name in baseline_us:
+            ratio = seconds * 1e6 / baseline_us[name]
+            entry["baseline_us"] = baseline_us[name]
+            entry["ratio"] = round(ratio, 3)
+            if ratio > 1 + args.threshold:
+                entry["regression"] = True
+                regressions.append(name)
+        report("micro", entry)
+
+    if args.save:
+        if args.patterns and os.path.exists(args.baseline):
+            # Keep the cases that were not re-run
+            previous = load_baseline(args.baseline)["results_us"]
+            results = {**{name: us / 1e6 for name, us in previous.items()}, **results}
+        save_baseline(args.baseline, results)
+        print(f"Saved baseline for {len(results)} cases to {args.baseline}", file=sys.stderr)
+    elif baseline is None and not differences:
+        print(f"No baseline at {args.baseline}; run with --save to record one", file=sys.stderr)
+
+    if regressions:
+        print(
+            f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}: "
+            f"{', '.join(regressions)}",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
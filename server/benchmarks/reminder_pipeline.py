@@ -0,0 +1,101 @@
+"""End-to-end throughput of the daily reminder job against a local SMTP sink.
+
+Seeds users with due applications, points the email service at an in-process
+SMTP sink with configurable per-reply latency, then runs send_daily_reminders
+(query, render, enqueue, drain) and reports where the time went.
+
+    python -m benchmarks.reminder_pipeline --users 5000 --apps-per-user 3 --latency 0.005
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import reminders
+from app.services.email import get_email_service
+from app.services.smtp_pool import SMTPConnectionPool
+from app.tools.smtp_sink import SMTPSink
+
+from ._common import count_queries, make_engine, peak_rss_mb, report, seed_users, timer
+
+
+class _Timed:
+    """Wrap a callable and accumulate the time spent in it across threads."""
+
+    def __init__(self, func):
+        self.func = func
+        self.seconds = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds += elapsed
+                self.calls += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--apps-per-user", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.005, help="Sink delay per SMTP reply, seconds")
+    parser.add_argument("--disconnect-after", type=int, default=0, help="Sink drops connections after N messages")
+    parser.add_argument("--workers", type=int, default=settings.OUTBOX_DRAIN_WORKERS)
+    args = parser.parse_args()
+
+    settings.OUTBOX_DRAIN_WORKERS = args.workers
+
+    with tempfile.TemporaryDirectory() as tmp, SMTPSink(
+        latency=args.latency, disconnect_after=args.disconnect_after, keep_messages=False
+    ) as sink:
+        # A file database so outbox workers get their own connections
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'pipeline.db')}")
+        seed_users(engine, args.users, args.apps_per_user, due_ratio=1.0)
+        SessionLocal.configure(bind=engine)
+
+        email_service = get_email_service()
+        email_service.pool.close()
+        email_service.pool = SMTPConnectionPool(
+            host=sink.host,
+            port=sink.port,
+            size=settings.SMTP_POOL_SIZE,
+            max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            use_tls=False,
+        )
+
+        render = _Timed(email_service.render_daily_reminders)
+        send = _Timed(email_service.pool.send_message)
+        email_service.render_daily_reminders = render
+        email_service.pool.send_message = send
+
+        with count_queries(engine) as counter, timer() as elapsed:
+            reminders.send_daily_reminders()
+
+        email_service.pool.close()
+        sent = sink.message_count
+        report("reminder_pipeline", {
+            "users": args.users,
+            "apps_per_user": args.apps_per_user,
+            "latency": args.latency,
+            "workers": args.workers,
+            "emails": sent,
+            "queries": counter["queries"],
+            "render_seconds": round(render.seconds, 2),
+            "smtp_seconds": round(send.seconds, 2),  # summed over sender threads
+            "smtp_connections": sink.connection_count,
+            "seconds": round(elapsed["seconds"], 2),
+            "emails_per_second": round(sent / elapsed["seconds"], 1) if elapsed["seconds"] else 0.0,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Query count and wall-clock time for building the daily reminder batch.
+
+Compares the single streamed reminder query with the previous approach of
+loading every reminder-enabled user and querying their applications one user
+at a time. No email is sent; only the digests are built.
+
+    python -m benchmarks.reminder_query --users 100000 --apps-per-user 3
+"""
+import argparse
+import os
+import tempfile
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User
+from app.services.reminders import get_reminder_items_for_user, iter_reminder_digests
+
+from ._common import count_queries, make_engine, peak_rss_mb, report, seed_users, timer
+
+
+def per_user_batch(db):
+    """The previous reminder batch: one applications query per user."""
+    users = db.query(User).filter(User.email_reminders_enabled).all()
+    digests = 0
+    for user in users:
+        if get_reminder_items_for_user(db, user):
+            digests += 1
+    return digests
+
+
+def streamed_batch(db):
+    return sum(1 for _ in iter_reminder_digests(db))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--apps-per-user", type=int, default=3)
+    parser.add_argument("--db-url", help="Existing seeded database to use")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = args.db_url or f"sqlite:///{os.path.join(tmp, 'reminders.db')}"
+        engine = make_engine(db_url)
+        if not args.db_url:
+            seed_users(engine, args.users, args.apps_per_user)
+        Session = sessionmaker(bind=engine)
+
+        for name, batch in (("per_user", per_user_batch), ("streamed", streamed_batch)):
+            db = Session()
+            with count_queries(engine) as counter, timer() as elapsed:
+                digests = batch(db)
+            db.close()
+            report("reminder_query", {
+                "mode": name,
+                "users": args.users,
+                "digests": digests,
+                "queries": counter["queries"],
+                "seconds": round(elapsed["seconds"], 2),
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+            })
+
+
+if __name__ == "__main__":
+    main()
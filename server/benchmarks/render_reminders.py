@@ -0,0 +1,89 @@
+"""Reminder email render throughput in emails/sec.
+
+Compares compiling both templates per recipient (the previous behaviour) with
+the shared precompiled environment, and the process-pool renderer.
+
+    python -m benchmarks.render_reminders --emails 20000 --processes 4
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from jinja2 import Template
+
+from app.core.config import settings
+from app.services.email import (
+    EMAIL_TEMPLATE, TEXT_TEMPLATE, render_daily_reminders, render_digests_in_processes
+)
+
+from ._common import report
+
+
+def make_digests(count: int, items_per_digest: int):
+    today = date.today()
+    for i in range(count):
+        yield {
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "items": [
+                {
+                    "id": f"00000000-0000-0000-0000-{j:012d}",
+                    "company": "Acme",
+                    "role_title": "Backend Engineer",
+                    "next_action": "Follow up with recruiter",
+                    "next_action_due": (today - timedelta(days=j)).isoformat(),
+                    "is_overdue": j > 0,
+                }
+                for j in range(items_per_digest)
+            ],
+        }
+
+
+def render_per_call(digests):
+    for digest in digests:
+        data = {
+            "user_name": digest["name"],
+            "total_items": len(digest["items"]),
+            "items": digest["items"],
+            "base_url": settings.APP_BASE_URL,
+        }
+        Template(EMAIL_TEMPLATE).render(**data)
+        Template(TEXT_TEMPLATE).render(**data)
+
+
+def render_cached(digests):
+    for digest in digests:
+        render_daily_reminders(digest["name"], digest["items"], settings.APP_BASE_URL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=3, help="Items per digest")
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    modes = [
+        ("per_call_template", render_per_call),
+        ("cached_environment", render_cached),
+    ]
+    if args.processes:
+        modes.append((
+            f"process_pool_{args.processes}",
+            lambda digests: sum(1 for _ in render_digests_in_processes(digests, args.processes)),
+        ))
+
+    for name, render in modes:
+        start = time.perf_counter()
+        render(make_digests(args.emails, args.items))
+        elapsed = time.perf_counter() - start
+        report("render_reminders", {
+            "mode": name,
+            "emails": args.emails,
+            "seconds": round(elapsed, 2),
+            "emails_per_sec": round(args.emails / elapsed, 1),
+        })
+
+
+if __name__ == "__main__":
+    main()
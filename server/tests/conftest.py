@@ -0,0 +1,73 @@
+"""Shared fixtures: a fresh in-memory SQLite database per test and an API client."""
+import os
+
+# Settings are read when app.core.config is first imported
+os.environ.setdefault("SCHEDULER_MODE", "disabled")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db import session as db_session  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.instrumentation import instrument_engine  # noqa: E402
+from app.main import create_app  # noqa: E402
+
+
+def use_engine(engine, read_engine=None):
+    """Make engine the application engine that get_engine() and SessionLocal use."""
+    db_session._engine = engine
+    db_session._read_engine = read_engine
+    db_session.SessionLocal.configure(bind=engine, info={"read_bind": read_engine} if read_engine else {})
+
+
+@pytest.fixture
+def engine():
+    # One shared connection, so every thread of the test client sees the same database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    instrument_engine(engine)
+    Base.metadata.create_all(engine)
+    use_engine(engine)
+    yield engine
+    use_engine(None)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = db_session.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    path = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def client(engine, upload_dir):
+    with TestClient(create_app()) as client:
+        yield client
+
+
+@pytest.fixture
+def register(client):
+    """Sign up and log in a user; returns their auth headers."""
+    def register(email: str = "user@example.com", password: str = "password123") -> dict:
+        response = client.post("/api/v1/auth/signup", json={"email": email, "password": password, "name": "Test User"})
+        assert response.status_code == 200, response.text
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return register
+
+
+@pytest.fixture
+def auth_headers(register):
+    return register()
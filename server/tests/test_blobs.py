@@ -0,0 +1,109 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.models.blob import Blob
+from app.services.blobs import blob_path, collect_garbage, ensure_blob
+
+CONTENT = b"%PDF-1.4 resume" * 100
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def application_id(client, auth_headers):
+    response = client.post("/api/v1/applications", json={"role_title": "Engineer", "company": "Acme"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def upload(client, auth_headers, application_id):
+    def upload(filename: str, content: bytes = CONTENT) -> str:
+        response = client.post(
+            f"/api/v1/applications/{application_id}/files", params={"filename": filename}, content=content,
+            headers=auth_headers,
+        )
+        assert response.status_code == 200, response.text
+        return f"/api/v1/applications/{application_id}/files/{response.json()['id']}"
+    return upload
+
+
+def ref_count(db, sha256: str = SHA256):
+    db.expire_all()
+    return db.scalar(select(Blob.ref_count).where(Blob.sha256 == sha256))
+
+
+def age_blob(db, hours: float):
+    """Pretend the blob row was last touched some hours ago."""
+    db.execute(update(Blob).values(updated_at=datetime.now(timezone.utc) - timedelta(hours=hours)))
+    db.commit()
+
+
+def test_identical_uploads_share_one_blob(db, client, auth_headers, upload, upload_dir):
+    first, second = upload("resume.pdf"), upload("resume-copy.pdf")
+    upload("other.txt", b"other content")
+
+    assert db.scalars(select(Blob.sha256)).all() == sorted([SHA256, hashlib.sha256(b"other content").hexdigest()])
+    assert ref_count(db) == 2
+    assert sorted(path.name for path in (upload_dir / "blobs").rglob("*") if path.is_file()) == sorted(
+        [SHA256, hashlib.sha256(b"other content").hexdigest()]
+    )
+    for url in (first, second):
+        assert client.get(url, headers=auth_headers).content == CONTENT
+
+
+def test_deleting_files_releases_references(db, client, auth_headers, upload):
+    first, second = upload("resume.pdf"), upload("resume-copy.pdf")
+
+    assert client.delete(first, headers=auth_headers).status_code == 200
+    assert ref_count(db) == 1
+    assert client.get(second, headers=auth_headers).content == CONTENT
+
+    assert client.delete(second, headers=auth_headers).status_code == 200
+    assert ref_count(db) == 0
+
+
+def test_garbage_collection_waits_for_the_grace_period(db, client, auth_headers, upload, monkeypatch):
+    monkeypatch.setattr(settings, "BLOB_GC_GRACE_SECONDS", 3600)
+    kept = upload("kept.pdf", b"still referenced")
+    client.delete(upload("resume.pdf"), headers=auth_headers)
+
+    # Unreferenced, but only just
+    assert collect_garbage()["removed"] == 0
+    assert ref_count(db) == 0
+
+    result = collect_garbage(now=datetime.now(timezone.utc) + timedelta(hours=2))
+
+    assert result["released"] == result["removed"] == 1
+    assert ref_count(db) is None
+    with pytest.raises(FileNotFoundError):
+        open(blob_path(SHA256), "rb")
+    assert client.get(kept, headers=auth_headers).content == b"still referenced"
+
+
+def test_recording_a_blob_again_protects_it_from_collection(db, client, auth_headers, upload, monkeypatch):
+    monkeypatch.setattr(settings, "BLOB_GC_GRACE_SECONDS", 3600)
+    client.delete(upload("resume.pdf"), headers=auth_headers)
+    age_blob(db, hours=2)
+
+    # What an upload of the same content does before its File row is committed
+    ensure_blob(db, SHA256, len(CONTENT))
+    db.commit()
+
+    assert collect_garbage()["released"] == 0
+    assert ref_count(db) == 0
+
+
+def test_unreferenced_blob_is_uploaded_again_after_collection(db, client, auth_headers, upload, monkeypatch):
+    monkeypatch.setattr(settings, "BLOB_GC_GRACE_SECONDS", 0)
+    client.delete(upload("resume.pdf"), headers=auth_headers)
+    age_blob(db, hours=1)
+    assert collect_garbage(now=datetime.now(timezone.utc) + timedelta(seconds=1))["removed"] == 1
+
+    url = upload("resume.pdf")
+
+    assert ref_count(db) == 1
+    assert client.get(url, headers=auth_headers).content == CONTENT
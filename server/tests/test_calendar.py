@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import pytest
+
+DUE = date.today() + timedelta(days=3)
+
+
+@pytest.fixture
+def application_id(client, auth_headers):
+    response = client.post(
+        "/api/v1/applications",
+        json={"role_title": "Engineer", "company": "Acme", "next_action": "Follow up", "next_action_due": DUE.isoformat()},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def feed_url(client, auth_headers, application_id):
+    response = client.post("/api/v1/calendar/token", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["calendar_url"]
+
+
+def test_feed_lists_pending_actions(client, feed_url):
+    response = client.get(feed_url)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/calendar; charset=utf-8"
+    assert response.headers["etag"]
+    assert "SUMMARY:Follow up - Acme" in response.text
+    assert f"DTSTART;VALUE=DATE:{DUE.strftime('%Y%m%d')}" in response.text
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"other", {etag}', "*"])
+def test_matching_etag_gets_304(client, feed_url, if_none_match):
+    etag = client.get(feed_url).headers["etag"]
+
+    response = client.get(feed_url, headers={"If-None-Match": if_none_match.format(etag=etag)})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_application_change_invalidates_the_etag(client, auth_headers, application_id, feed_url):
+    etag = client.get(feed_url).headers["etag"]
+
+    response = client.put(
+        f"/api/v1/applications/{application_id}", json={"next_action": "Send portfolio"}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get(feed_url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "SUMMARY:Send portfolio - Acme" in response.text
+
+
+def test_new_and_deleted_applications_invalidate_the_etag(client, auth_headers, application_id, feed_url):
+    etags = [client.get(feed_url).headers["etag"]]
+
+    response = client.post("/api/v1/applications", json={"role_title": "Designer", "company": "Globex"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    etags.append(client.get(feed_url).headers["etag"])
+    assert client.delete(f"/api/v1/applications/{application_id}", headers=auth_headers).status_code == 200
+    response = client.get(feed_url)
+    etags.append(response.headers["etag"])
+
+    assert len(set(etags)) == 3
+    assert "SUMMARY" not in response.text
+
+
+def test_notes_leave_the_etag_alone(client, auth_headers, application_id, feed_url):
+    etag = client.get(feed_url).headers["etag"]
+
+    response = client.post(f"/api/v1/applications/{application_id}/notes", json={"content": "Call went well"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    assert client.get(feed_url, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_rotating_the_token_disables_the_old_url(client, auth_headers, feed_url):
+    response = client.post("/api/v1/calendar/token", headers=auth_headers)
+    new_url = response.json()["calendar_url"]
+
+    assert new_url != feed_url
+    assert client.get(feed_url).status_code == 404
+    assert client.get(new_url).status_code == 200
+
+
+def test_revoked_token_disables_the_feed(client, auth_headers, feed_url):
+    assert client.delete("/api/v1/calendar/token", headers=auth_headers).status_code == 200
+
+    assert client.get(feed_url).status_code == 404
+
+
+def test_token_endpoints_need_a_login(client):
+    assert client.post("/api/v1/calendar/token").status_code in (401, 403)
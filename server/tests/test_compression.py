@@ -0,0 +1,186 @@
+import asyncio
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.config import settings
+from app.middleware.compression import CompressionMiddleware, no_compression
+from app.utils import compression
+from app.utils.compression import negotiate_encoding
+
+TEXT = "application,company,stage\n" * 200  # 5200 bytes
+CHUNKS = [f"row {i}," * 100 + "\n" for i in range(5)]
+
+
+@pytest.fixture
+def all_codecs_available(monkeypatch):
+    monkeypatch.setattr(compression, "codec_available", lambda codec: True)
+    negotiate_encoding.cache_clear()
+    yield
+    negotiate_encoding.cache_clear()
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, br, zstd", "zstd"),
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+    ("br;q=0.8, gzip;q=0.9", "gzip"),
+    ("zstd;q=0, br;q=0, gzip", "gzip"),
+    ("*", "zstd"),
+    ("zstd;q=0, *;q=0.5", "br"),
+    ("gzip;q=0", None),
+    ("*;q=0", None),
+    ("gzip;q=invalid", None),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiation_order(all_codecs_available, accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, ("zstd", "br", "gzip")) == expected
+
+
+def test_negotiation_skips_codecs_not_installed(monkeypatch):
+    monkeypatch.setattr(compression, "codec_available", lambda codec: codec != "br")
+    negotiate_encoding.cache_clear()
+    try:
+        assert negotiate_encoding("br, gzip;q=0.5", ("zstd", "br", "gzip")) == "gzip"
+    finally:
+        negotiate_encoding.cache_clear()
+
+
+def text(request):
+    return PlainTextResponse(request.query_params.get("body", TEXT))
+
+
+def stream(request):
+    # A Content-Length set by the endpoint no longer holds once compressed
+    total = sum(len(chunk) for chunk in CHUNKS)
+    return StreamingResponse(iter(CHUNKS), media_type="text/csv", headers={"content-length": str(total)})
+
+
+@no_compression
+def download(request):
+    return PlainTextResponse(TEXT)
+
+
+def image(request):
+    return Response(b"\x89PNG" + b"\x00" * 5000, media_type="image/png")
+
+
+def no_transform(request):
+    return PlainTextResponse(TEXT, headers={"cache-control": "no-transform"})
+
+
+@pytest.fixture
+def demo_app(monkeypatch):
+    monkeypatch.setattr(settings, "COMPRESSION_CODECS", ["zstd", "gzip"])
+    monkeypatch.setattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+    app = Starlette(routes=[
+        Route(f"/{endpoint.__name__}", endpoint) for endpoint in (text, stream, download, image, no_transform)
+    ])
+    app.add_middleware(CompressionMiddleware)
+    return app
+
+
+@pytest.fixture
+def demo_client(demo_app):
+    return TestClient(demo_app)
+
+
+def get(client, path, accept_encoding="gzip", **params):
+    return client.get(path, params=params, headers={"Accept-Encoding": accept_encoding})
+
+
+def test_complete_response_is_compressed(demo_client):
+    response = get(demo_client, "/text")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == response.num_bytes_downloaded < len(TEXT)
+    assert response.text == TEXT
+
+
+def test_preferred_codec_is_used(demo_client):
+    zstandard = pytest.importorskip("zstandard")
+    response = demo_client.get("/text", headers={"Accept-Encoding": "gzip, zstd"})
+
+    assert response.headers["content-encoding"] == "zstd"
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(response.content) == TEXT.encode()
+
+
+@pytest.mark.parametrize("accept_encoding", ["gzip;q=0", "identity", "br"])
+def test_unacceptable_codecs_get_identity(demo_client, accept_encoding):
+    response = get(demo_client, "/text", accept_encoding=accept_encoding)
+
+    assert "content-encoding" not in response.headers
+    assert response.text == TEXT
+
+
+def test_small_response_is_sent_as_is(demo_client):
+    response = get(demo_client, "/text", body="x" * 1023)
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == "1023"
+    # Still varies: a client sending another Accept-Encoding may get a different body
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("path", ["/download", "/image", "/no_transform"])
+def test_excluded_responses_are_sent_as_is(demo_client, path):
+    response = get(demo_client, path)
+
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) > 5000
+
+
+def test_streaming_response_is_compressed_chunk_by_chunk(demo_app):
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "root_path": "",
+        "scheme": "http", "query_string": b"", "headers": [(b"accept-encoding", b"gzip")],
+        "server": ("testserver", 80), "client": ("testclient", 50000), "http_version": "1.1",
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # The client stays connected; the response cancels this wait when it is done
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(demo_app(scope, receive, send))
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    # Sent as it was produced rather than buffered into one message
+    assert len(bodies) > 1
+    assert [body.get("more_body", False) for body in bodies][-1] is False
+    assert gzip.decompress(b"".join(body["body"] for body in bodies)) == "".join(CHUNKS).encode()
+
+
+def test_file_downloads_and_ranges_are_not_compressed(client, auth_headers):
+    application = client.post("/api/v1/applications", json={"role_title": "Engineer", "company": "Acme"}, headers=auth_headers).json()
+    response = client.post(
+        f"/api/v1/applications/{application['id']}/files", params={"filename": "notes.txt"}, content=TEXT.encode(),
+        headers={**auth_headers, "Content-Type": "text/plain"},
+    )
+    url = f"/api/v1/applications/{application['id']}/files/{response.json()['id']}"
+    headers = {**auth_headers, "Accept-Encoding": "gzip"}
+
+    response = client.get(url, headers=headers)
+    assert "content-encoding" not in response.headers
+    assert response.content == TEXT.encode()
+
+    response = client.get(url, headers={**headers, "Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-range"] == f"bytes 10-19/{len(TEXT)}"
+    assert response.content == TEXT.encode()[10:20]
@@ -0,0 +1,133 @@
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.utils.files import TEMP_SUFFIX, parse_range
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=500-", (500, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-2000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+    ("BYTES = 1-1", (1, 1)),
+    # Ignored: the whole file is sent
+    ("bytes=5-2", None),
+    ("items=0-99", None),
+    ("bytes=0-1,5-6", None),
+    ("bytes=a-b", None),
+    ("bytes=-", None),
+    ("bytes", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", 1000),
+    ("bytes=2000-3000", 1000),
+    ("bytes=-0", 1000),
+    ("bytes=-5", 0),
+])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+@pytest.fixture
+def application_id(client, auth_headers):
+    response = client.post("/api/v1/applications", json={"role_title": "Engineer", "company": "Acme"}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def file_url(client, auth_headers, application_id):
+    response = client.post(
+        f"/api/v1/applications/{application_id}/files", params={"filename": "resume.pdf"}, content=CONTENT,
+        headers={**auth_headers, "Content-Type": "application/pdf"},
+    )
+    assert response.status_code == 200, response.text
+    return f"/api/v1/applications/{application_id}/files/{response.json()['id']}"
+
+
+def partial_uploads(upload_dir) -> list:
+    temp_dir = upload_dir / ".tmp"
+    return [name for name in os.listdir(temp_dir) if name.endswith(TEMP_SUFFIX)] if temp_dir.is_dir() else []
+
+
+def test_download_whole_file(client, auth_headers, file_url):
+    response = client.get(file_url, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["etag"]
+
+
+def test_download_range(client, auth_headers, file_url):
+    response = client.get(file_url, headers={**auth_headers, "Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+    assert response.headers["content-length"] == "100"
+
+
+def test_if_range_mismatch_sends_whole_file(client, auth_headers, file_url):
+    etag = client.get(file_url, headers=auth_headers).headers["etag"]
+
+    response = client.get(file_url, headers={**auth_headers, "Range": "bytes=0-9", "If-Range": etag})
+    assert response.status_code == 206
+    response = client.get(file_url, headers={**auth_headers, "Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_unsatisfiable_range(client, auth_headers, file_url):
+    response = client.get(file_url, headers={**auth_headers, "Range": f"bytes={len(CONTENT)}-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+    assert response.content == b""
+
+
+def test_upload_over_declared_limit(client, auth_headers, application_id, upload_dir, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1000)
+
+    response = client.post(
+        f"/api/v1/applications/{application_id}/files", params={"filename": "big.bin"}, content=CONTENT,
+        headers=auth_headers,
+    )
+    assert response.status_code == 413
+    assert partial_uploads(upload_dir) == []
+
+
+def test_streamed_upload_over_limit_leaves_no_temp_file(client, auth_headers, application_id, upload_dir, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 1000)
+
+    def chunks():
+        # No Content-Length: the limit is only hit while streaming
+        for offset in range(0, len(CONTENT), 512):
+            yield CONTENT[offset:offset + 512]
+
+    response = client.post(
+        f"/api/v1/applications/{application_id}/files", params={"filename": "big.bin"}, content=chunks(),
+        headers=auth_headers,
+    )
+    assert response.status_code == 413
+    assert (upload_dir / ".tmp").is_dir()
+    assert partial_uploads(upload_dir) == []
+    assert not (upload_dir / "blobs").exists()
+
+    files = client.get(f"/api/v1/applications/{application_id}/files", headers=auth_headers).json()
+    assert files["total"] == 0
+
+
+def test_successful_upload_leaves_no_temp_file(upload_dir, file_url):
+    assert partial_uploads(upload_dir) == []
@@ -0,0 +1,85 @@
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import MetricsRegistry
+
+
+def sample(exposition: str, series: str) -> float:
+    """The value of one series (name plus labels, as rendered) in an exposition, 0 if absent."""
+    for line in exposition.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    requests.inc(("/a",))
+    requests.inc(('say "hi"\\\n',), amount=2)
+    in_flight.set(3)
+    for value in (0.05, 0.1, 0.5, 7.25):
+        latency.observe(value, ("/a",))
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a"} 1',
+        'requests_total{route="say \\"hi\\"\\\\\\n"} 2',
+        "# HELP in_flight In flight.",
+        "# TYPE in_flight gauge",
+        "in_flight 3",
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 7.9',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_requests_are_labelled_by_route_template(client, auth_headers):
+    ids = [
+        client.post("/api/v1/applications", json={"role_title": "Engineer", "company": company}, headers=auth_headers).json()["id"]
+        for company in ("Acme", "Globex")
+    ]
+    series = 'http_requests_total{method="GET",route="/api/v1/applications/{application_id}",status="200"}'
+    unmatched = 'http_requests_total{method="GET",route="<unmatched>",status="404"}'
+    before = client.get("/metrics").text
+
+    for application_id in ids:
+        assert client.get(f"/api/v1/applications/{application_id}", headers=auth_headers).status_code == 200
+    assert client.get("/no/such/path").status_code == 404
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    after = response.text
+    assert sample(after, series) - sample(before, series) == 2
+    assert sample(after, unmatched) - sample(before, unmatched) == 1
+    assert not any(application_id in after for application_id in ids)
+    assert "/no/such/path" not in after
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/applications/{application_id}"}' in after
+    assert 'http_requests_in_progress{method="GET"} 1' in after
+
+
+@pytest.mark.parametrize("authorization, status_code", [
+    (None, 401),
+    ("Bearer wrong", 401),
+    ("Basic scrape-secret", 401),
+    ("Bearer scrape-secret", 200),
+    ("bearer scrape-secret", 200),
+])
+def test_metrics_token_is_required_when_set(client, monkeypatch, authorization, status_code):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+
+    response = client.get("/metrics", headers={"Authorization": authorization} if authorization else {})
+
+    assert response.status_code == status_code
+    if status_code == 401:
+        assert response.headers["www-authenticate"] == "Bearer"
+    else:
+        assert "http_requests_total" in response.text
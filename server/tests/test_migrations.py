@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import MetaData, create_engine, text
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.sharding import DirectoryBase
+
+SCRIPT_LOCATION = Path(__file__).resolve().parents[1] / "alembic"
+INITIAL_REVISION = "0b9a1e6c2d47"
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    return url
+
+
+@pytest.fixture
+def alembic_config(database_url):
+    config = Config()
+    config.set_main_option("script_location", str(SCRIPT_LOCATION))
+    return config
+
+
+def schema_differences(url: str) -> list:
+    metadata = MetaData()
+    for table in (*Base.metadata.tables.values(), *DirectoryBase.metadata.tables.values()):
+        table.to_metadata(metadata)
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        differences = compare_metadata(MigrationContext.configure(connection), metadata)
+    engine.dispose()
+    return differences
+
+
+def test_upgrade_creates_the_models_schema(alembic_config, database_url):
+    command.upgrade(alembic_config, "head")
+
+    assert schema_differences(database_url) == []
+
+
+def test_upgrade_brings_a_pre_migration_database_up_to_date(alembic_config, database_url):
+    # A database made before migrations were kept: baseline tables, no alembic_version
+    command.upgrade(alembic_config, INITIAL_REVISION)
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(text(
+            "INSERT INTO users (id, name, email, password_hash, reminder_time)"
+            " VALUES ('0123456789abcdef0123456789abcdef', 'User', 'user@example.com', 'x', '7:30')"
+        ))
+
+    command.upgrade(alembic_config, "head")
+
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT reminder_time, timezone, reminder_policy, data_version FROM users")).one()
+    engine.dispose()
+    assert tuple(row) == ("07:30", "UTC", "ALWAYS", 0)
+    assert schema_differences(database_url) == []
+
+
+def test_downgrade_to_base_removes_everything(alembic_config, database_url):
+    command.upgrade(alembic_config, "head")
+    command.downgrade(alembic_config, "base")
+
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        tables = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars().all()
+    engine.dispose()
+    assert tables == ["alembic_version"]
@@ -0,0 +1,167 @@
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from operator import attrgetter
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.email_outbox import EmailOutbox, EmailOutboxStatus
+from app.models.user import ReminderPolicy, User
+from app.services import outbox
+from app.services.delivery import DeliveryEngine
+from app.services.outbox import _send_batch, claim_batch, enqueue_emails, purge_sent_messages, release_stale_claims
+from app.services.reminders import reminder_idempotency_key
+
+
+def message(key):
+    return {
+        "idempotency_key": key, "to_email": f"{key}@example.com",
+        "subject": "Subject", "html_body": "<p>Body</p>", "text_body": "Body",
+    }
+
+
+def test_slow_batch_keeps_its_claim_and_records_progress(tmp_path, monkeypatch):
+    monkeypatch.setattr(outbox.settings, "OUTBOX_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(outbox.settings, "OUTBOX_CLAIM_TIMEOUT_SECONDS", 60)
+    # A file database, so the heartbeat and the checks below use their own connections
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    Base.metadata.create_all(engine)
+    make_session = sessionmaker(bind=engine)
+
+    db = make_session()
+    enqueue_emails(db, [message("first"), message("second"), message("last")])
+    db.commit()
+    batch = claim_batch(db, 10)
+    # The claim is about to go stale when sending starts
+    db.execute(update(EmailOutbox).values(locked_at=datetime.now(timezone.utc) - timedelta(seconds=59)))
+    db.commit()
+
+    seen = {}
+
+    def send(job):
+        if job.idempotency_key != "last":
+            return
+        # A slow relay: by now the claim would be stale without the heartbeat
+        time.sleep(1.2)
+        with make_session() as check:
+            seen["released"] = release_stale_claims(check)
+            seen["statuses"] = dict(check.execute(select(EmailOutbox.idempotency_key, EmailOutbox.status)).all())
+
+    delivery = DeliveryEngine(send=send, recipient=attrgetter("to_email"), concurrency=1, max_retries=0)
+    stats = _send_batch(make_session, db, delivery, batch)
+
+    assert stats.sent == 3
+    assert seen["released"] == 0
+    assert seen["statuses"] == {
+        "first": EmailOutboxStatus.SENT, "second": EmailOutboxStatus.SENT, "last": EmailOutboxStatus.SENDING,
+    }
+    rows = db.execute(select(EmailOutbox.status, EmailOutbox.claim_token)).all()
+    assert rows == [(EmailOutboxStatus.SENT, None)] * 3
+    db.close()
+    engine.dispose()
+
+
+def test_purge_deletes_only_old_sent_messages(db, monkeypatch):
+    monkeypatch.setattr(outbox, "PURGE_BATCH_SIZE", 2)
+    monkeypatch.setattr(outbox.settings, "OUTBOX_SENT_RETENTION_DAYS", 7)
+    now = datetime.now(timezone.utc)
+
+    def add(key, status, sent_days_ago=None):
+        db.add(EmailOutbox(
+            id=uuid.uuid4(), status=status, **message(key),
+            sent_at=now - timedelta(days=sent_days_ago) if sent_days_ago is not None else None,
+        ))
+
+    for i in range(5):
+        add(f"old-{i}", EmailOutboxStatus.SENT, sent_days_ago=10)
+    add("recent", EmailOutboxStatus.SENT, sent_days_ago=1)
+    add("pending", EmailOutboxStatus.PENDING)
+    add("dead", EmailOutboxStatus.DEAD)
+    db.commit()
+
+    assert purge_sent_messages(db, now=now) == 5
+    remaining = set(db.scalars(select(EmailOutbox.idempotency_key)))
+    assert remaining == {"recent", "pending", "dead"}
+
+
+def test_dead_lettered_reminder_is_not_treated_as_sent(db, monkeypatch):
+    monkeypatch.setattr(outbox.settings, "OUTBOX_MAX_ATTEMPTS", 1)
+    today = date(2024, 3, 5)
+    user = User(
+        id=uuid.uuid4(), name="User", email="user@example.com", password_hash="x",
+        reminder_policy=ReminderPolicy.ON_CHANGE, last_digest_hash="a" * 64, last_digest_date=today,
+    )
+    db.add(user)
+    db.commit()
+    key = reminder_idempotency_key({"user_id": user.id, "today": today})
+    enqueue_emails(db, [{**message("reminder"), "idempotency_key": key, "user_id": user.id}])
+    db.commit()
+
+    def send(job):
+        raise ConnectionError("relay unreachable")
+
+    delivery = DeliveryEngine(send=send, recipient=attrgetter("to_email"), max_retries=0)
+    _send_batch(sessionmaker(bind=db.get_bind()), db, delivery, claim_batch(db, 10))
+
+    db.expire_all()
+    assert db.scalar(select(EmailOutbox.status)) == EmailOutboxStatus.DEAD
+    assert (user.last_digest_hash, user.last_digest_date) == (None, None)
+
+
+def test_stale_claim_is_released_and_claimed_again(db, monkeypatch):
+    monkeypatch.setattr(outbox.settings, "OUTBOX_CLAIM_TIMEOUT_SECONDS", 60)
+    enqueue_emails(db, [message("crashed"), message("working")])
+    db.commit()
+    first = claim_batch(db, 1)
+    second = claim_batch(db, 1)
+    assert claim_batch(db, 10) == []
+
+    # The first worker died: its claim is older than the timeout
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.claim_token == first[0].claim_token)
+        .values(locked_at=datetime.now(timezone.utc) - timedelta(seconds=61))
+    )
+    db.commit()
+
+    assert release_stale_claims(db) == 1
+    reclaimed = claim_batch(db, 10)
+    assert [row.idempotency_key for row in reclaimed] == [first[0].idempotency_key]
+    assert reclaimed[0].claim_token not in (first[0].claim_token, second[0].claim_token)
+    assert db.scalar(select(EmailOutbox.status).where(EmailOutbox.id == second[0].id)) == EmailOutboxStatus.SENDING
+
+
+def test_failed_send_is_rescheduled_until_dead_lettered(db, monkeypatch):
+    monkeypatch.setattr(outbox.settings, "OUTBOX_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(outbox.settings, "OUTBOX_RETRY_BACKOFF_SECONDS", 60)
+    enqueue_emails(db, [message("flaky")])
+    db.commit()
+    make_session = sessionmaker(bind=db.get_bind())
+
+    def send(job):
+        raise ConnectionError("relay unreachable")
+
+    delivery = DeliveryEngine(send=send, recipient=attrgetter("to_email"), max_retries=0)
+    delays = []
+    for attempt in range(1, 4):
+        before = datetime.now(timezone.utc)
+        stats = _send_batch(make_session, db, delivery, claim_batch(db, 10))
+        assert (stats.failed, stats.retried) == (1, 1 if attempt < 3 else 0)
+
+        db.expire_all()
+        row = db.scalar(select(EmailOutbox))
+        assert (row.attempts, row.last_error, row.claim_token) == (attempt, "relay unreachable", None)
+        if attempt < 3:
+            assert row.status == EmailOutboxStatus.PENDING
+            # Not due yet, so not claimed again until the backoff passes
+            assert claim_batch(db, 10) == []
+            delays.append(row.next_attempt_at.replace(tzinfo=timezone.utc) - before)
+            db.execute(update(EmailOutbox).values(next_attempt_at=datetime.now(timezone.utc)))
+            db.commit()
+
+    assert row.status == EmailOutboxStatus.DEAD
+    assert claim_batch(db, 10) == []
+    # Exponential backoff between attempts
+    assert [round(delay.total_seconds(), -1) for delay in delays] == [60, 120]
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.instrumentation import QueryBudgetExceeded, query_budget
+from app.models.application import Application
+
+# Queries per request, however many rows are listed: no N+1
+BUDGETS = {
+    "/api/v1/applications": 3,
+    "/api/v1/applications/{id}": 2,
+    "/api/v1/applications/{id}/notes": 4,
+    "/api/v1/applications/{id}/timeline": 3,
+}
+
+
+@pytest.fixture
+def application_id(client, auth_headers):
+    """An application with notes (and timeline events), among several others."""
+    ids = []
+    for i in range(10):
+        response = client.post(
+            "/api/v1/applications", json={"role_title": "Engineer", "company": f"Company {i}"}, headers=auth_headers
+        )
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    for i in range(10):
+        response = client.post(f"/api/v1/applications/{ids[0]}/notes", json={"content": f"Note {i}"}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+    return ids[0]
+
+
+@pytest.mark.parametrize("route", BUDGETS)
+def test_read_routes_stay_within_query_budget(client, auth_headers, application_id, route):
+    with query_budget(max_queries=BUDGETS[route], max_repeats=1) as finished:
+        response = client.get(route.format(id=application_id), headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    assert [stats.name for stats in finished if stats.count] == [f"GET {route.replace('{id}', '{application_id}')}"]
+
+
+def test_budget_overrun_raises(client, auth_headers, application_id):
+    with pytest.raises(QueryBudgetExceeded, match="queries \\(budget 1\\)"):
+        with query_budget(max_queries=1):
+            client.get("/api/v1/applications", headers=auth_headers)
+
+
+def test_repeated_statement_raises(db, client, auth_headers, application_id):
+    with pytest.raises(QueryBudgetExceeded, match="10x SELECT"):
+        with query_budget(max_repeats=2):
+            # One query per row, the N+1 pattern the budget exists to catch
+            for app_id in db.scalars(select(Application.id)).all():
+                db.execute(select(Application).where(Application.id == app_id)).one()
@@ -0,0 +1,117 @@
+import importlib.util
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import select
+
+from app.models.application import Application
+from app.models.email_outbox import EmailOutbox
+from app.models.scheduler_checkpoint import SchedulerCheckpoint
+from app.models.user import User
+from app.services.reminders import REMINDER_BUCKETS_JOB_ID, iter_bucket_digests, queue_reminder_buckets
+
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "4f1d2c8a9b36_pad_reminder_time.py"
+
+TODAY = date(2024, 3, 5)
+
+
+def add_user(db, reminder_time, tz="UTC"):
+    user = User(
+        id=uuid.uuid4(), name="User", email=f"{uuid.uuid4().hex}@example.com", password_hash="x",
+        reminder_time=reminder_time, timezone=tz, email_reminders_enabled=True,
+    )
+    db.add(user)
+    db.add(Application(
+        user_id=user.id, role_title="Engineer", company="Acme",
+        next_action="Follow up", next_action_due=TODAY,
+    ))
+    db.commit()
+    return user.id
+
+
+def run_migration(engine):
+    spec = importlib.util.spec_from_file_location("pad_reminder_time", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with engine.begin() as connection, Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
+
+
+def bucket_user_ids(db, start, end):
+    return [(digest["user_id"], digest["today"]) for digest in iter_bucket_digests(db, start, end)]
+
+
+def test_migration_pads_reminder_times(engine, db):
+    unpadded = add_user(db, "7:30")
+    padded = add_user(db, "19:05")
+    midnight = add_user(db, "0:05")
+
+    run_migration(engine)
+
+    db.expire_all()
+    assert db.get(User, unpadded).reminder_time == "07:30"
+    assert db.get(User, padded).reminder_time == "19:05"
+    assert db.get(User, midnight).reminder_time == "00:05"
+
+
+def test_unpadded_time_only_matches_midnight_bucket_until_migrated(engine, db):
+    user_id = add_user(db, "7:30")
+    morning = (datetime(2024, 3, 5, 7, 30, tzinfo=timezone.utc), datetime(2024, 3, 5, 7, 45, tzinfo=timezone.utc))
+    midnight = (datetime(2024, 3, 4, 23, 45, tzinfo=timezone.utc), datetime(2024, 3, 5, 0, 0, tzinfo=timezone.utc))
+
+    assert bucket_user_ids(db, *morning) == []
+
+    run_migration(engine)
+
+    assert bucket_user_ids(db, *morning) == [(user_id, TODAY)]
+    assert bucket_user_ids(db, *midnight) == []
+
+
+def test_local_time_zone_buckets(db):
+    # 07:30 in New York (UTC-5 in March before DST) is 12:30 UTC
+    user_id = add_user(db, "07:30", tz="America/New_York")
+    start = datetime(2024, 3, 5, 12, 30, tzinfo=timezone.utc)
+
+    assert bucket_user_ids(db, start, datetime(2024, 3, 5, 12, 45, tzinfo=timezone.utc)) == [(user_id, TODAY)]
+    assert bucket_user_ids(db, datetime(2024, 3, 5, 7, 30, tzinfo=timezone.utc), start) == []
+
+
+@pytest.fixture
+def render(monkeypatch):
+    monkeypatch.setattr(
+        "app.services.email.EmailService.render_daily_reminders",
+        lambda self, name, items: ("Reminders", "<p>Reminders</p>", "Reminders"),
+    )
+
+
+def test_buckets_are_queued_only_once_they_end(db, render):
+    add_user(db, "07:14")
+    db.add(SchedulerCheckpoint(
+        job_id=REMINDER_BUCKETS_JOB_ID, processed_until=datetime(2024, 3, 5, 7, 0, tzinfo=timezone.utc)
+    ))
+    db.commit()
+
+    queue_reminder_buckets(datetime(2024, 3, 5, 7, 14, 59, tzinfo=timezone.utc))
+    assert db.scalars(select(EmailOutbox)).all() == []
+
+    queue_reminder_buckets(datetime(2024, 3, 5, 7, 15, 0, tzinfo=timezone.utc))
+    assert len(db.scalars(select(EmailOutbox)).all()) == 1
+    checkpoint = db.get(SchedulerCheckpoint, REMINDER_BUCKETS_JOB_ID)
+    db.refresh(checkpoint)
+    assert checkpoint.processed_until.replace(tzinfo=timezone.utc) == datetime(2024, 3, 5, 7, 15, tzinfo=timezone.utc)
+
+
+def test_first_run_without_checkpoint_starts_from_the_current_bucket(db, render):
+    add_user(db, "07:14")
+
+    queue_reminder_buckets(datetime(2024, 3, 5, 7, 5, tzinfo=timezone.utc))
+    checkpoint = db.get(SchedulerCheckpoint, REMINDER_BUCKETS_JOB_ID)
+    assert checkpoint is not None
+    assert checkpoint.processed_until.replace(tzinfo=timezone.utc) == datetime(2024, 3, 5, 7, 0, tzinfo=timezone.utc)
+
+    queue_reminder_buckets(datetime(2024, 3, 5, 7, 16, tzinfo=timezone.utc))
+    assert len(db.scalars(select(EmailOutbox)).all()) == 1
@@ -0,0 +1,157 @@
+"""Sharding against two SQLite shard files plus a directory database."""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.api.v1 import auth
+from app.db import sharding
+from app.db.session import create_engines
+from app.main import create_app
+from app.models.application import Application
+from app.models.user import User
+from app.tools import shards as shard_tools
+
+from .conftest import use_engine
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch, upload_dir):
+    directory_url = f"sqlite:///{tmp_path / 'directory.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", directory_url)
+    monkeypatch.setattr(settings, "SHARDS", {
+        "a": f"sqlite:///{tmp_path / 'a.db'}",
+        "b": f"sqlite:///{tmp_path / 'b.db'}",
+    })
+    # Directory changes are seen at once, so moves need no waiting
+    monkeypatch.setattr(settings, "SHARD_DIRECTORY_CACHE_SECONDS", 0)
+    monkeypatch.setattr(sharding, "_router", None)
+
+    directory_engines = create_engines(directory_url)
+    use_engine(*directory_engines)
+    shard_tools.init()
+    router = sharding.get_router()
+    yield router
+
+    use_engine(None)
+    for engine in (*directory_engines, *(engine for engines in router._engines.values() for engine in engines)):
+        engine.dispose()
+
+
+@pytest.fixture
+def client(router):
+    with TestClient(create_app()) as client:
+        yield client
+
+
+def user_id_on(router, shard: str) -> uuid.UUID:
+    """A new user id that the hash ring places on shard."""
+    return next(user_id for user_id in iter(uuid.uuid4, None) if router.ring.get(str(user_id)) == shard)
+
+
+@pytest.fixture
+def signup(router, client, monkeypatch):
+    """Sign up and log in a user placed on a given shard; returns their id and auth headers."""
+    def signup(email: str, shard: str) -> dict:
+        user_id = user_id_on(router, shard)
+        monkeypatch.setattr(auth, "uuid4", lambda: user_id)
+        return sign_up_and_log_in(client, email)
+    return signup
+
+
+def sign_up_and_log_in(client, email: str) -> dict:
+    response = client.post("/api/v1/auth/signup", json={"email": email, "password": "password123", "name": "User"})
+    assert response.status_code == 200, response.text
+    user_id = response.json()["id"]
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert response.status_code == 200, response.text
+    return {"id": uuid.UUID(user_id), "headers": {"Authorization": f"Bearer {response.json()['access_token']}"}}
+
+
+def users_on(router, shard: str) -> set:
+    with router.session(shard) as db:
+        return set(db.scalars(select(User.id)))
+
+
+def test_signup_and_login_route_to_the_users_shard(router, client, signup):
+    users = {shard: signup(f"{shard}@example.com", shard) for shard in router.names}
+
+    for shard, user in users.items():
+        assert router.locate(user["id"]) == {"shard": shard, "moving": False}
+        assert users_on(router, shard) == {user["id"]}
+
+        response = client.get("/api/v1/me", headers=user["headers"])
+        assert response.status_code == 200, response.text
+        assert response.json()["id"] == str(user["id"])
+
+
+def test_duplicate_email_is_refused_across_shards(router, client, signup):
+    signup("taken@example.com", "a")
+
+    # The second sign-up's id hashes to the other shard
+    user_id = user_id_on(router, "b")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(auth, "uuid4", lambda: user_id)
+        response = client.post(
+            "/api/v1/auth/signup", json={"email": "taken@example.com", "password": "password123", "name": "Other"}
+        )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+    assert sum(len(users_on(router, shard)) for shard in router.names) == 1
+    with sharding.SessionLocal() as directory:
+        assert directory.scalar(select(func.count()).select_from(sharding.UserShard)) == 1
+
+
+def test_moved_user_reads_and_writes_on_the_new_shard(router, client, signup):
+    source, target = "a", "b"
+    user = signup("mover@example.com", source)
+    response = client.post("/api/v1/applications", json={"role_title": "Engineer", "company": "Acme"}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+
+    shard_tools.move(user["id"], target, wait_seconds=0)
+
+    assert router.locate(user["id"]) == {"shard": target, "moving": False}
+    assert user["id"] not in users_on(router, source)
+    response = client.get("/api/v1/applications", headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert [app["company"] for app in response.json()["applications"]] == ["Acme"]
+
+    response = client.post("/api/v1/applications", json={"role_title": "Engineer", "company": "Globex"}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    with router.session(target) as db:
+        companies = db.scalars(select(Application.company).where(Application.user_id == user["id"]))
+        assert sorted(companies) == ["Acme", "Globex"]
+    with router.session(source) as db:
+        assert db.scalar(select(func.count()).select_from(Application)) == 0
+
+
+def test_writes_get_503_while_moving(router, client, signup):
+    shard = "a"
+    user = signup("busy@example.com", shard)
+    router.set_location(user["id"], shard, moving=True)
+
+    assert client.get("/api/v1/applications", headers=user["headers"]).status_code == 200
+    response = client.post("/api/v1/applications", json={"role_title": "Engineer", "company": "Acme"}, headers=user["headers"])
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+    router.set_location(user["id"], shard, moving=False)
+    response = client.post("/api/v1/applications", json={"role_title": "Engineer", "company": "Acme"}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+
+
+def test_calendar_feed_is_found_by_token_on_any_shard(router, client, signup):
+    for shard in router.names:
+        user = signup(f"calendar-{shard}@example.com", shard)
+        response = client.post("/api/v1/calendar/token", headers=user["headers"])
+        assert response.status_code == 200, response.text
+
+        # No bearer token: the shard is found by looking the feed token up on each
+        response = client.get(response.json()["calendar_url"])
+        assert response.status_code == 200, response.text
+        assert response.text.startswith("BEGIN:VCALENDAR")
+
+    assert client.get("/api/v1/calendar/unknown.ics").status_code == 404
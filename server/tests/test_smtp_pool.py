@@ -0,0 +1,111 @@
+"""SMTPConnectionPool against the in-process SMTP sink."""
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+import pytest
+
+from app.services.smtp_pool import SMTPConnectionPool
+from app.tools.smtp_sink import SMTPSink
+
+
+def email(i: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "jobtracker@example.com"
+    msg["To"] = f"user{i}@example.com"
+    msg["Subject"] = f"Message {i}"
+    msg.set_content(f"Body {i}")
+    return msg
+
+
+@pytest.fixture
+def sink():
+    with SMTPSink(keep_messages=True) as sink:
+        yield sink
+
+
+@pytest.fixture
+def make_pool(sink):
+    pools = []
+
+    def make_pool(**options) -> SMTPConnectionPool:
+        pool = SMTPConnectionPool(sink.host, sink.port, use_tls=False, timeout=5, **options)
+        pools.append(pool)
+        return pool
+
+    yield make_pool
+    for pool in pools:
+        pool.close()
+
+
+def send_all(pool, count: int):
+    for i in range(count):
+        pool.send_message(email(i))
+
+
+def test_connection_is_reused_across_messages(sink, make_pool):
+    pool = make_pool(size=1, username="user", password="secret")
+
+    send_all(pool, 5)
+
+    assert sink.message_count == 5
+    assert sink.connection_count == pool.connections_opened == 1
+    assert [b"Subject: Message %d" % i in data for i, data in enumerate(sink.messages)] == [True] * 5
+
+
+def test_connection_is_retired_at_the_message_cap(sink, make_pool):
+    pool = make_pool(max_messages_per_connection=2)
+
+    send_all(pool, 5)
+
+    assert sink.message_count == 5
+    # 2 + 2 + 1
+    assert sink.connection_count == pool.connections_opened == 3
+
+
+def test_reconnects_after_421(sink, make_pool):
+    sink.disconnect_after = 2
+    pool = make_pool()
+
+    send_all(pool, 5)
+
+    # Each connection carries 2 messages, then the third MAIL gets 421 and is resent on a new one
+    assert sink.message_count == 5
+    assert sink.connection_count == pool.connections_opened == 3
+
+
+def test_reconnects_after_the_session_dropped(sink, make_pool):
+    pool = make_pool()
+    pool.send_message(email(0))
+    # The server side went away while the session sat idle
+    with pool.connection() as connection:
+        connection.smtp.close()
+
+    pool.send_message(email(1))
+
+    assert sink.message_count == 2
+    assert pool.connections_opened == 2
+
+
+def test_rejected_message_does_not_reconnect(sink, make_pool):
+    pool = make_pool()
+    msg = email(0)
+    del msg["To"]
+
+    # No recipients: refused without a 421, so the session is kept
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.send_message(msg)
+    pool.send_message(email(1))
+
+    assert sink.message_count == 1
+    assert pool.connections_opened == 1
+
+
+def test_concurrent_sends_stay_within_the_pool_size(sink, make_pool):
+    pool = make_pool(size=2)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(pool.send_message, [email(i) for i in range(20)]))
+
+    assert sink.message_count == 20
+    assert sink.connection_count == pool.connections_opened <= 2
@@ -0,0 +1,97 @@
+"""RoutingSession on a SQLite file: query_only readers and one writer."""
+import uuid
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.sqlite import RoutingSession, create_sqlite_engines
+from app.models.user import User
+
+
+@pytest.fixture
+def engines(tmp_path):
+    writer, reader = create_sqlite_engines(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(writer)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+@pytest.fixture
+def make_session(engines):
+    writer, reader = engines
+    return sessionmaker(bind=writer, class_=RoutingSession, info={"read_bind": reader})
+
+
+def new_user(email: str = "user@example.com") -> User:
+    return User(id=uuid.uuid4(), name="User", email=email, password_hash="x")
+
+
+def test_reader_connections_refuse_writes(engines):
+    _, reader = engines
+
+    with reader.connect() as connection:
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(text("INSERT INTO scheduler_checkpoints (job_id, processed_until) VALUES ('job', '2024-01-01')"))
+
+
+def test_reads_go_to_the_reader_until_the_first_write(engines, make_session):
+    writer, reader = engines
+    with make_session() as db:
+        assert db.get_bind(clause=select(User)) is reader
+        db.scalars(select(User)).all()
+
+        db.add(new_user())
+        db.flush()
+
+        assert db.get_bind(clause=select(User)) is writer
+        db.commit()
+        # A new transaction starts on the reader again
+        assert db.get_bind(clause=select(User)) is reader
+
+
+@pytest.mark.parametrize("statement", [
+    update(User).values(name="Renamed"),
+    text("SELECT 1"),
+    select(User).with_for_update(),
+])
+def test_writing_statements_go_to_the_writer(engines, make_session, statement):
+    writer, _ = engines
+    with make_session() as db:
+        db.execute(statement)
+
+        assert db.get_bind(clause=select(User)) is writer
+
+
+def test_session_reads_its_own_uncommitted_writes(make_session):
+    with make_session() as db, make_session() as other:
+        db.add(new_user())
+        db.flush()
+
+        assert db.scalars(select(User.email)).all() == ["user@example.com"]
+        # Readers see committed data only
+        assert other.scalars(select(User.email)).all() == []
+        other.rollback()
+
+        db.commit()
+        assert other.scalars(select(User.email)).all() == ["user@example.com"]
+
+
+def test_read_then_write_in_one_session(make_session):
+    with make_session() as db:
+        db.add(new_user())
+        db.commit()
+
+    with make_session() as db:
+        user = db.scalars(select(User)).one()
+        user.name = "Renamed"
+        db.flush()
+        # The flush moved the session to the writer, which sees the change
+        assert db.scalar(select(User.name)) == "Renamed"
+        db.commit()
+
+    with make_session() as db:
+        assert db.scalar(select(User.name)) == "Renamed"
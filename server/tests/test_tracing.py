@@ -0,0 +1,155 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import SPAN_KIND_CLIENT, SPAN_KIND_SERVER, STATUS_ERROR, record_span, span, start_trace
+from app.main import create_app
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces" / "spans.jsonl"
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "TRACE_FILE", str(path))
+    monkeypatch.setattr(settings, "TRACE_SERVICE_NAME", "test-service")
+    tracing.shutdown_tracing()
+    yield path
+    tracing.shutdown_tracing()
+
+
+def read_requests(path) -> list:
+    """The ExportTraceServiceRequests written so far, one per line."""
+    tracing.get_exporter().flush()
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def read_spans(path) -> list:
+    return [
+        span
+        for request in read_requests(path)
+        for resource_spans in request["resourceSpans"]
+        for scope_spans in resource_spans["scopeSpans"]
+        for span in scope_spans["spans"]
+    ]
+
+
+def test_spans_are_written_as_otlp_json_lines(trace_file):
+    with start_trace("job", attributes={"job.id": "reminders"}) as root:
+        with span("smtp send", kind=SPAN_KIND_CLIENT, attributes={"retries": 2, "ok": True, "ratio": 0.5}):
+            pass
+        record_span("SELECT users", 1_000, 2_000)
+
+    [request] = read_requests(trace_file)
+    [resource_spans] = request["resourceSpans"]
+    resource = {attribute["key"]: attribute["value"] for attribute in resource_spans["resource"]["attributes"]}
+    assert resource["service.name"] == {"stringValue": "test-service"}
+    [scope_spans] = resource_spans["scopeSpans"]
+    assert scope_spans["scope"] == {"name": "app.core.tracing"}
+
+    child, sql, written_root = scope_spans["spans"]
+    assert written_root["traceId"] == child["traceId"] == sql["traceId"] == root.trace_id
+    assert len(root.trace_id) == 32 and len(written_root["spanId"]) == 16
+    assert "parentSpanId" not in written_root
+    assert child["parentSpanId"] == sql["parentSpanId"] == written_root["spanId"]
+    assert child["kind"] == SPAN_KIND_CLIENT
+    assert child["attributes"] == [
+        {"key": "retries", "value": {"intValue": "2"}},
+        {"key": "ok", "value": {"boolValue": True}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+    ]
+    assert (sql["startTimeUnixNano"], sql["endTimeUnixNano"]) == ("1000", "2000")
+    assert int(written_root["startTimeUnixNano"]) <= int(child["startTimeUnixNano"])
+    assert int(child["endTimeUnixNano"]) <= int(written_root["endTimeUnixNano"])
+
+
+def test_errors_are_recorded_on_the_span(trace_file):
+    with pytest.raises(RuntimeError):
+        with start_trace("job"):
+            with span("step"):
+                raise RuntimeError("boom")
+
+    statuses = [span.get("status") for span in read_spans(trace_file)]
+    assert statuses == [{"code": STATUS_ERROR, "message": "RuntimeError: boom"}] * 2
+
+
+@pytest.mark.parametrize("flags, sample_rate, written", [
+    ("01", 0.0, True),
+    ("00", 1.0, False),
+])
+def test_traceparent_is_continued_and_its_sampled_flag_wins(trace_file, monkeypatch, flags, sample_rate, written):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", sample_rate)
+
+    with start_trace("GET /", traceparent=f"00-{TRACE_ID}-{PARENT_SPAN_ID}-{flags}") as root:
+        with span("child"):
+            pass
+
+    assert root.trace_id == TRACE_ID
+    spans = read_spans(trace_file)
+    if written:
+        assert [(span["traceId"], span.get("parentSpanId")) for span in spans][-1] == (TRACE_ID, PARENT_SPAN_ID)
+        assert len(spans) == 2
+    else:
+        assert spans == []
+
+
+@pytest.mark.parametrize("traceparent", [
+    "garbage",
+    f"00-{'0' * 32}-{PARENT_SPAN_ID}-01",
+    f"00-{TRACE_ID}-{'0' * 16}-01",
+    f"00-{TRACE_ID}-xyz0000000000000-01",
+])
+def test_invalid_traceparent_starts_a_new_trace(trace_file, traceparent):
+    with start_trace("GET /", traceparent=traceparent) as root:
+        pass
+
+    assert root.trace_id != TRACE_ID
+    [written] = read_spans(trace_file)
+    assert "parentSpanId" not in written
+
+
+def test_buffered_spans_are_written_on_flush_and_close(trace_file):
+    with start_trace("job"):
+        # Ended children wait in the buffer for the root, or a full batch
+        with span("first"):
+            pass
+        assert trace_file.read_text() == ""
+        tracing.get_exporter().flush()
+        assert [span["name"] for span in read_spans(trace_file)] == ["first"]
+
+        for i in range(3):
+            with span(f"more {i}"):
+                pass
+        # Closing writes whatever is still buffered
+        tracing.shutdown_tracing()
+
+    assert [span["name"] for span in read_spans(trace_file)] == ["first", "more 0", "more 1", "more 2", "job"]
+
+
+def test_request_continues_the_callers_trace(engine, trace_file):
+    with TestClient(create_app()) as client:
+        response = client.get("/health", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01"})
+        unsampled = client.get("/health", headers={"traceparent": f"00-{'a' * 32}-{PARENT_SPAN_ID}-00"})
+        new_trace = client.get("/health")
+
+    assert response.headers["x-trace-id"] == TRACE_ID
+    # Unsampled traces still return their id, for log correlation
+    assert unsampled.headers["x-trace-id"] == "a" * 32
+    assert len(new_trace.headers["x-trace-id"]) == 32
+
+    servers = {span["traceId"]: span for span in read_spans(trace_file) if span["kind"] == SPAN_KIND_SERVER}
+    assert set(servers) == {TRACE_ID, new_trace.headers["x-trace-id"]}
+    server = servers[TRACE_ID]
+    assert server["name"] == "GET /health"
+    assert server["parentSpanId"] == PARENT_SPAN_ID
+    attributes = {attribute["key"]: attribute["value"] for attribute in server["attributes"]}
+    assert attributes["http.route"] == {"stringValue": "/health"}
+    assert attributes["http.response.status_code"] == {"intValue": "200"}